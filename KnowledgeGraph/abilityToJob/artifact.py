@@ -0,0 +1,262 @@
+"""
+岗位×技能快照的离线编译产物
+
+构建图谱时把 SkillJobSnapshot 编译为单个二进制文件，服务启动时直接内存映射，
+不再需要启动时访问 Neo4j、也不需要重新计算派生数组。文件布局：
+
+  - 8 字节魔数 b"KGSNAP01"；
+  - 8 字节小端 uint64：头部长度；
+  - UTF-8 JSON 头部：元数据（meta）以及每个数组的 dtype / shape / offset；
+  - 数组数据区：每个数组按 64 字节对齐依次存放。
+
+岗位名称、技能名称两张字符串表以「UTF-8 字节串 + int64 偏移数组」的形式保存。
+保存时快照已计算相似岗位表（job_similarity）的，近邻表的三个数组一并写入，
+头部 similarity 记录其参数，加载后直接使用，不需要重新计算。
+meta["schema"] 记录产物对应的图谱数据模型（Domain：领域 模型；Page：Page 模型），
+加载时可要求与服务使用的模型一致，避免岗位 / 技能目录与其他接口来自不同的模型。
+头部 content_hash 为名称表与 CSR 数组的内容哈希；构建脚本写入的产物在 meta["build_stamp"]
+记录构建时间戳，服务以 artifact_version() 判断产物是否更新（内容未变化时构建脚本不重写文件）。
+加载时数值数组直接是 mmap 上的只读 np.frombuffer 视图，零拷贝；
+同一文件被多个进程加载时共享操作系统的页缓存。
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .similarity import JobSimilarity
+from .snapshot import CSR_ARRAYS, DERIVED_ARRAYS, SkillJobSnapshot
+
+MAGIC = b"KGSNAP01"
+FORMAT_VERSION = 1
+
+# 产物的图谱数据模型（名称与 common.schema_adapter 一致）：构建脚本编译 领域 模型（app.py 使用），
+# main.py 的共享快照发布 Page 模型；早期产物没有 schema 字段，都由构建脚本生成，按 领域 模型处理
+SCHEMA_DOMAIN = "Domain"
+SCHEMA_PAGE = "Page"
+
+_ALIGN = 64
+_LENGTH = struct.Struct("<Q")
+
+# 相似岗位近邻表的数组（见 similarity.JobSimilarity）
+_SIMILARITY_ARRAYS = ("neighbor_indptr", "neighbor_ids", "neighbor_scores")
+
+# 字符串表：名称 -> (字节串数组名, 偏移数组名)
+_STRING_TABLES = {
+    "job_names": ("job_names_blob", "job_names_offsets"),
+    "skill_names": ("skill_names_blob", "skill_names_offsets"),
+}
+
+
+def _encode_strings(names: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    encoded = [name.encode("utf-8") for name in names]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return blob, offsets
+
+
+def _decode_strings(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(bounds) - 1)]
+
+
+def _name_ranks(names: List[str]) -> Tuple[List[str], np.ndarray]:
+    """(按名称排序后的名称表, 原 ID -> 排序后的位置)"""
+    order = sorted(range(len(names)), key=names.__getitem__)
+    ranks = np.empty(len(names), dtype=np.int64)
+    ranks[order] = np.arange(len(names))
+    return [names[i] for i in order], ranks
+
+
+def content_hash(snapshot: SkillJobSnapshot) -> str:
+    """
+    快照内容的哈希：岗位 / 技能名称与全部 (岗位, 技能, 权重, 类别) 边。
+
+    名称与边按名称排序后计算，与岗位 / 技能 ID 的分配顺序（即数据源中的行序）、
+    派生数组以及相似岗位表都无关。
+    """
+    job_names, job_ranks = _name_ranks(snapshot.job_names)
+    skill_names, skill_ranks = _name_ranks(snapshot.skill_names)
+    rows = job_ranks[snapshot.entry_rows]
+    skills = skill_ranks[snapshot.indices]
+    order = np.lexsort((skills, rows))
+
+    digest = hashlib.sha1()
+    for names in (job_names, skill_names):
+        for part in _encode_strings(names):
+            digest.update(part.tobytes())
+    for array, dtype in ((rows, np.int64), (skills, np.int64),
+                         (snapshot.weights, CSR_ARRAYS["weights"]),
+                         (snapshot.categories, CSR_ARRAYS["categories"])):
+        digest.update(np.ascontiguousarray(array[order], dtype=dtype).tobytes())
+    return digest.hexdigest()
+
+
+def artifact_version(header: Mapping[str, Any]) -> int:
+    """
+    产物的版本：构建时间戳（build_stamp，纳秒），没有时间戳的早期产物为头部记录的图谱版本号。
+
+    构建脚本每次写入内容不同的产物时时间戳递增，服务据此发现产物被替换
+    （只编译产物、不连接 Neo4j 时图谱版本号恒为 0，不能用来判断）。
+    """
+    meta = header.get("meta") or {}
+    return int(meta.get("build_stamp") or meta.get("graph_version") or 0)
+
+
+def _padding(offset: int) -> int:
+    return (-offset) % _ALIGN
+
+
+def save_snapshot(snapshot: SkillJobSnapshot,
+                  path: str,
+                  meta: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """
+    把快照写入编译产物文件。
+
+    先写入同目录下的临时文件再原子替换，正在映射旧文件的进程不受影响。
+
+    Returns
+    -------
+    dict
+        写入的头部。
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    for name, (blob_name, offsets_name) in _STRING_TABLES.items():
+        arrays[blob_name], arrays[offsets_name] = _encode_strings(getattr(snapshot, name))
+    for name, array in snapshot.to_arrays().items():
+        dtype = CSR_ARRAYS.get(name) or DERIVED_ARRAYS[name]
+        arrays[name] = np.ascontiguousarray(array, dtype=dtype)
+    similarity = snapshot._job_similarity
+    if similarity is not None:
+        for name in _SIMILARITY_ARRAYS:
+            arrays[name] = np.ascontiguousarray(getattr(similarity, name))
+
+    # 数据区偏移相对于数据区起点，头部长度不影响布局
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset += _padding(offset)
+        layout[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset += array.nbytes
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "meta": dict(meta or {}),
+        "num_jobs": snapshot.num_jobs,
+        "num_skills": snapshot.num_skills,
+        "nnz": snapshot.nnz,
+        "content_hash": content_hash(snapshot),
+        "arrays": layout,
+    }
+    if similarity is not None:
+        header["similarity"] = {
+            "top_n": similarity.top_n,
+            "method": similarity.method,
+            "build_seconds": similarity.build_seconds,
+            "candidate_pairs": similarity.candidate_pairs,
+        }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    prefix_len = len(MAGIC) + _LENGTH.size + len(header_bytes)
+
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_LENGTH.pack(len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * _padding(prefix_len))
+        written = 0
+        for name, array in arrays.items():
+            f.write(b"\0" * (layout[name]["offset"] - written))
+            f.write(array.tobytes())
+            written = layout[name]["offset"] + array.nbytes
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return header
+
+
+def _read_prefix(f) -> Tuple[Dict[str, Any], int]:
+    magic = f.read(len(MAGIC))
+    if magic != MAGIC:
+        raise ValueError("不是有效的快照产物文件（魔数不匹配）")
+    (header_len,) = _LENGTH.unpack(f.read(_LENGTH.size))
+    header = json.loads(f.read(header_len).decode("utf-8"))
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"不支持的快照产物版本: {header.get('format_version')}")
+    prefix_len = len(MAGIC) + _LENGTH.size + header_len
+    return header, prefix_len + _padding(prefix_len)
+
+
+def artifact_schema(header: Mapping[str, Any]) -> str:
+    """产物头部记录的图谱数据模型。"""
+    return (header.get("meta") or {}).get("schema") or SCHEMA_DOMAIN
+
+
+def check_schema(header: Mapping[str, Any], schema: Optional[str], path: str = ""):
+    """schema 不为空且与产物的数据模型不一致时抛出 ValueError。"""
+    if schema is not None and artifact_schema(header) != schema:
+        raise ValueError(
+            f"快照产物 {path} 的数据模型为 {artifact_schema(header)}，当前服务需要 {schema} 模型的产物"
+        )
+
+
+def read_header(path: str, schema: Optional[str] = None) -> Dict[str, Any]:
+    """只读取产物头部（元数据与数组布局），不映射数据区；给出 schema 时检查数据模型。"""
+    with open(path, "rb") as f:
+        header, _ = _read_prefix(f)
+    check_schema(header, schema, path)
+    return header
+
+
+def load_snapshot(path: str, schema: Optional[str] = None) -> Tuple[SkillJobSnapshot, Dict[str, Any]]:
+    """
+    内存映射编译产物并构建快照。
+
+    给出 schema 时先检查产物的数据模型，不一致则抛出 ValueError（不映射数据区）。
+
+    Returns
+    -------
+    tuple
+        (快照, 头部)。快照的数值数组为 mmap 上的只读视图，
+        快照对象持有 mmap 引用，随快照一起释放。
+    """
+    with open(path, "rb") as f:
+        header, data_start = _read_prefix(f)
+        check_schema(header, schema, path)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    arrays: Dict[str, np.ndarray] = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(
+            mapped, dtype=dtype, count=count, offset=data_start + spec["offset"]
+        ).reshape(spec["shape"])
+
+    names = {
+        name: _decode_strings(arrays.pop(blob_name), arrays.pop(offsets_name))
+        for name, (blob_name, offsets_name) in _STRING_TABLES.items()
+    }
+    snapshot = SkillJobSnapshot(
+        job_names=names["job_names"],
+        skill_names=names["skill_names"],
+        derived={name: arrays[name] for name in DERIVED_ARRAYS},
+        **{name: arrays[name] for name in CSR_ARRAYS},
+    )
+    if "similarity" in header:
+        snapshot._job_similarity = JobSimilarity(
+            *(arrays[name] for name in _SIMILARITY_ARRAYS), **header["similarity"]
+        )
+    snapshot._mmap = mapped
+    return snapshot, header
@@ -9,9 +9,13 @@
 3. 匹配度 m_k = 相似度得分 × 熟练度：
    - 完全相同：相似度 = 1
    - 大小写差异 / 前后空格忽略
-   - 其余情况暂按 0（如需“近似 0.7”可在此扩展同义词映射）；
+   - 图谱中没有同名技能时，通过字符三元组索引查找近似技能（见 trigram.py），
+     以三元组 Jaccard 相似度（阈值 0.3，典型近似匹配约 0.4~0.8）作为相似度；
 4. 推荐分数 Score = 100 × Σ (w_k_norm × m_k)，其中 w_k_norm 为对该岗位所有技能权重归一化后结果。
 
+岗位×技能权重图通过 load_snapshot 一次性加载为稀疏矩阵快照（见 snapshot.py），
+每次请求只做一次「用户能力稀疏向量 × 矩阵」的乘法，不再访问 Neo4j。
+
 返回结构与现有后端保持一致：
   - job_name
   - match_count
@@ -21,17 +25,153 @@
   - hard_skills_count / soft_skills_count
 """
 
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .ranking import top_k_candidates
+from .artifact import SCHEMA_DOMAIN, load_snapshot as load_artifact
+from .snapshot import (
+    CATEGORY_HARD,
+    CATEGORY_LABELS,
+    CATEGORY_SOFT,
+    SkillJobSnapshot,
+    SnapshotMatch,
+    normalize_skill_name,
+)
+
+# 从岗位→能力图谱中取出全部 岗位 - 技能 - 权重 边
+SNAPSHOT_CYPHER = """
+MATCH (d:领域)-[:包含]->(c:一级分类)-[r:包含]->(s:二级分类)
+RETURN d.name as job_name,
+       s.name as skill,
+       coalesce(r.weight, 0.0) as weight,
+       c.name as category
+"""
+
+# main.py 使用的 Page 模型中的全部 岗位 - 技能 - 权重 边（构建脚本据此导出 Page 模型的编译产物）
+PAGE_SNAPSHOT_CYPHER = """
+MATCH (p:Page)-[:HAS_CATEGORY]->(c:Category)-[r:HAS_SKILL]->(s:Skill)
+RETURN coalesce(p.pageName, p.name) AS job_name,
+       s.name AS skill,
+       coalesce(r.weight, 0.0) AS weight,
+       coalesce(c.type, '') AS category
+"""
 
 
 def _normalize_skill_name(name: str) -> str:
     """规范化技能名称，用于简单的字符串相似度匹配。"""
-    if not isinstance(name, str):
-        return ""
-    return name.strip().lower()
+    return normalize_skill_name(name)
+
+
+def load_snapshot(graph, artifact_path: Optional[str] = None) -> SkillJobSnapshot:
+    """
+    从 Neo4j 一次性加载岗位×技能权重矩阵快照。
+
+    服务进程应在启动时（或图谱重建后）调用一次并复用返回的快照，
+    之后的匹配请求不再访问数据库。
+    给出 artifact_path 时改为内存映射构建脚本输出的编译产物，不访问 Neo4j（graph 可为 None）；
+    产物必须是 领域 模型（与 SNAPSHOT_CYPHER 一致），否则抛出 ValueError。
+    """
+    if artifact_path:
+        return load_artifact(artifact_path, schema=SCHEMA_DOMAIN)[0]
+
+    records = graph.run(SNAPSHOT_CYPHER).data()
+    return SkillJobSnapshot.from_edges(
+        (row.get("job_name"), row.get("skill"), row.get("weight"), row.get("category"))
+        for row in records
+    )
+
+
+def _build_query(snapshot: SkillJobSnapshot,
+                 normalized_input: List[str],
+                 skill_levels: Optional[Dict[str, float]] = None
+                 ) -> Tuple[Dict[int, float], Dict[int, float]]:
+    """
+    构造用户能力稀疏向量：技能 ID -> m_k = 相似度 × 熟练度 s_j（默认1）。
+
+    输入技能在图谱中有同名技能时相似度为 1；否则通过三元组索引查找近似技能，
+    以其相似度作为 m_k 的相似度部分。同一技能被多个输入命中时取最大值。
+    返回 (m_k 向量, 技能 ID -> 相似度)。
+    """
+    levels = {_normalize_skill_name(k): v for k, v in (skill_levels or {}).items()}
+    query: Dict[int, float] = {}
+    similarities: Dict[int, float] = {}
+    for name in normalized_input:
+        sid = snapshot.skill_id(name)
+        candidates = [(sid, 1.0)] if sid is not None else snapshot.trigram_index.lookup(name)
+        level = float(levels.get(name, 1.0))
+        for cid, similarity in candidates:
+            if similarity * level > query.get(cid, 0.0):
+                query[cid] = similarity * level
+            similarities[cid] = max(similarities.get(cid, 0.0), similarity)
+    return query, similarities
+
+
+def _jobs_from_match(snapshot: SkillJobSnapshot,
+                     result: SnapshotMatch,
+                     similarities: Dict[int, float],
+                     top_k: Optional[int] = None,
+                     offset: int = 0,
+                     min_score: float = 0) -> List[Dict[str, Any]]:
+    """
+    把快照匹配结果组装为接口返回的岗位列表（已排序）。
+
+    分数先对全部命中岗位向量化计算，再用部分选择取出第 offset ~ offset+top_k 名，
+    只为这些岗位构造返回字典。
+    """
+    totals = snapshot.job_total_weights[result.jobs]
+    # 没有有效权重的岗位直接跳过
+    valid = totals > 0
+
+    # Score = 100 × Σ (w_k_norm × m_k) = 100 × Σ(w_k × m_k) / 全部权重之和
+    scores = np.zeros(len(result))
+    scores[valid] = np.clip(np.round(100 * result.scores[valid] / totals[valid]), 0, 100)
+
+    candidates = np.flatnonzero(valid & (scores >= min_score))
+    limit = None if top_k is None else offset + top_k
+    picked = candidates[top_k_candidates(scores[candidates], limit)]
+
+    # 按匹配度从高到低排序，其次按匹配权重和排序（同分保持图谱中的岗位顺序）
+    ranked = sorted(picked.tolist(), key=lambda p: (-scores[p], -result.matched_weights[p]))
+    ranked = ranked[offset:limit]
 
+    jobs: List[Dict[str, Any]] = []
+    for pos in ranked:
+        jid = int(result.jobs[pos])
+        entries = result.job_entries(pos)
+        categories = result.entry_categories[entries]
+        matched_skills = [
+            {
+                "skill": snapshot.skill_names[int(result.entry_skills[i])],
+                "weight": float(result.entry_weights[i]),
+                "category": CATEGORY_LABELS.get(int(result.entry_categories[i]), ""),
+                "similarity": round(similarities.get(int(result.entry_skills[i]), 1.0), 4),
+            }
+            for i in entries
+        ]
+
+        jobs.append({
+            "job_name": snapshot.job_names[jid],
+            "match_count": int(result.match_counts[pos]),
+            "match_percentage": int(scores[pos]),
+            "total_weight": float(result.matched_weights[pos]),
+            "matched_skills": matched_skills,
+            "hard_skills_count": int(np.count_nonzero(categories == CATEGORY_HARD)),
+            "soft_skills_count": int(np.count_nonzero(categories == CATEGORY_SOFT)),
+        })
+
+    return jobs
 
-def match_skills_to_jobs(graph, skills: List[str]) -> Tuple[List[Dict[str, Any]], int, List[str]]:
+
+def match_skills_to_jobs(graph,
+                         skills: List[str],
+                         snapshot: Optional[SkillJobSnapshot] = None,
+                         skill_levels: Optional[Dict[str, float]] = None,
+                         top_k: Optional[int] = None,
+                         offset: int = 0,
+                         min_score: float = 0
+                         ) -> Tuple[List[Dict[str, Any]], int, List[str]]:
     """
     使用岗位→能力知识图谱进行能力→岗位匹配。
 
@@ -39,8 +179,19 @@ def match_skills_to_jobs(graph, skills: List[str]) -> Tuple[List[Dict[str, Any]]
     ----------
     graph : py2neo.Graph
         已连接的 Neo4j 图数据库实例（同 app.py 中的全局 graph）。
+        仅在未提供 snapshot 时用于临时加载快照。
     skills : list[str]
         用户输入的技能名称列表。
+    snapshot : SkillJobSnapshot, optional
+        预先加载的岗位×技能矩阵快照（见 load_snapshot）。
+    skill_levels : dict[str, float], optional
+        技能名称 -> 熟练度 s_j（0~1，默认1）。
+    top_k : int, optional
+        只返回排序后的前 top_k 个岗位（默认返回全部）。
+    offset : int
+        分页偏移量：跳过排序后的前 offset 个岗位。
+    min_score : float
+        只返回匹配度不低于该值的岗位。
 
     Returns
     -------
@@ -59,101 +210,76 @@ def match_skills_to_jobs(graph, skills: List[str]) -> Tuple[List[Dict[str, Any]]
     if not normalized_input:
         return [], 0, []
 
-    # 从岗位→能力图谱中获取每个岗位的技能及权重
-    cypher = """
-    MATCH (d:领域)-[:包含]->(c:一级分类)-[r:包含]->(s:二级分类)
-    RETURN d.name as job_name,
-           collect({
-               skill: s.name,
-               weight: coalesce(r.weight, 0.0),
-               category: c.name
-           }) as skills
-    """
-
-    records = graph.run(cypher).data()
-
-    jobs: List[Dict[str, Any]] = []
+    if snapshot is None:
+        snapshot = load_snapshot(graph)
 
-    for row in records:
-        job_name = row.get("job_name")
-        all_skills = row.get("skills", []) or []
-
-        # 计算该岗位所有技能权重之和，用作归一化分母
-        total_weight_all = 0.0
-        for info in all_skills:
-            try:
-                total_weight_all += float(info.get("weight") or 0.0)
-            except (TypeError, ValueError):
-                continue
-
-        if total_weight_all <= 0:
-            # 没有有效权重，跳过该岗位
-            continue
-
-        matched_skills = []
-        total_weight_matched = 0.0
-
-        hard_count = 0
-        soft_count = 0
-
-        for info in all_skills:
-            skill_name = info.get("skill")
-            norm_skill_name = _normalize_skill_name(skill_name)
-            if not norm_skill_name:
-                continue
-
-            # 简单相似度：字符串相同视为完全匹配
-            if norm_skill_name in normalized_input:
-                w = 0.0
-                try:
-                    w = float(info.get("weight") or 0.0)
-                except (TypeError, ValueError):
-                    w = 0.0
-
-                if w <= 0:
-                    continue
-
-                # m_k = 相似度(1) × 熟练度(默认1) = 1
-                # Score 后面通过归一化 Σ(w_k_norm × m_k) 计算
-                total_weight_matched += w
-
-                category = info.get("category") or ""
-                if category == "硬实力":
-                    hard_count += 1
-                elif category == "软实力":
-                    soft_count += 1
-
-                matched_skills.append({
-                    "skill": skill_name,
-                    "weight": w,
-                    "category": category
-                })
-
-        match_count = len(matched_skills)
-        if match_count == 0:
-            # 没有匹配到任何技能，跳过该岗位
-            continue
-
-        # Score = 100 × Σ (w_k_norm × m_k)，这里 m_k = 1，因此等效为：
-        # Score = 100 × (匹配到的权重之和 / 全部权重之和)
-        score = 0
-        if total_weight_all > 0:
-            score = int(round(100 * total_weight_matched / total_weight_all))
-
-        jobs.append({
-            "job_name": job_name,
-            "match_count": match_count,
-            "match_percentage": score,
-            "total_weight": float(total_weight_matched),
-            "matched_skills": matched_skills,
-            "hard_skills_count": hard_count,
-            "soft_skills_count": soft_count,
-        })
-
-    # 按匹配度从高到低排序，其次按匹配权重和排序
-    jobs.sort(key=lambda x: (x["match_percentage"], x["total_weight"]), reverse=True)
+    query, similarities = _build_query(snapshot, normalized_input, skill_levels)
+    if not query:
+        return [], len(normalized_input), skills
 
+    jobs = _jobs_from_match(snapshot, snapshot.match(query), similarities, top_k, offset, min_score)
     return jobs, len(normalized_input), skills
 
 
+def match_skills_to_jobs_batch(graph,
+                               skill_sets: Sequence[List[str]],
+                               skill_levels: Optional[Sequence[Optional[Dict[str, float]]]] = None,
+                               snapshot: Optional[SkillJobSnapshot] = None,
+                               top_k: Optional[int] = None,
+                               min_score: float = 0,
+                               offset: int = 0
+                               ) -> Iterator[Tuple[List[Dict[str, Any]], int, List[str]]]:
+    """
+    批量能力→岗位匹配：N 组技能一次性组成 画像×技能 矩阵，与 技能×岗位 矩阵相乘。
 
+    Parameters
+    ----------
+    graph : py2neo.Graph
+        仅在未提供 snapshot 时用于加载快照。
+    skill_sets : list[list[str]]
+        每个用户画像的技能名称列表。
+    skill_levels : list[dict[str, float] | None], optional
+        与 skill_sets 一一对应的熟练度映射（含义同 match_skills_to_jobs）。
+    snapshot : SkillJobSnapshot, optional
+        预先加载的岗位×技能矩阵快照。
+    top_k, min_score, offset
+        对每个画像分别生效，含义同 match_skills_to_jobs。
+
+    Yields
+    ------
+    按输入顺序逐个产出与 match_skills_to_jobs 相同的 (jobs, input_skills_count, skills) 三元组。
+
+    Raises
+    ------
+    ValueError
+        skill_levels 与 skill_sets 长度不一致（调用时立即抛出，而不是在迭代中途）。
+    """
+    levels = list(skill_levels) if skill_levels is not None else [None] * len(skill_sets)
+    if len(levels) != len(skill_sets):
+        raise ValueError(f"skill_levels 的长度（{len(levels)}）与 skill_sets 的长度（{len(skill_sets)}）不一致")
+    if snapshot is None:
+        snapshot = load_snapshot(graph)
+    return _match_batch(snapshot, skill_sets, levels, top_k, min_score, offset)
+
+
+def _match_batch(snapshot: SkillJobSnapshot,
+                 skill_sets: Sequence[List[str]],
+                 levels: List[Optional[Dict[str, float]]],
+                 top_k: Optional[int],
+                 min_score: float,
+                 offset: int) -> Iterator[Tuple[List[Dict[str, Any]], int, List[str]]]:
+    normalized = [
+        [_normalize_skill_name(s) for s in (skills or []) if _normalize_skill_name(s)]
+        for skills in skill_sets
+    ]
+    built = [
+        _build_query(snapshot, names, level) for names, level in zip(normalized, levels)
+    ]
+
+    results = snapshot.match_many([query for query, _ in built])
+    for skills, names, (_, similarities), result in zip(skill_sets, normalized, built, results):
+        if not names:
+            yield [], 0, []
+        else:
+            jobs = _jobs_from_match(snapshot, result, similarities, top_k, offset, min_score)
+            yield jobs, len(names), skills
@@ -0,0 +1,62 @@
+"""
+名称前缀补全索引
+
+前端输入技能 / 岗位名称时的自动补全。索引为按规范化名称排序的数组：
+
+  - 前缀查找：二分查找得到以该前缀开头的名称区间 [lo, hi)，O(log n)；
+  - 排序：每个名称带一个分数（技能为被多少个岗位要求，岗位为技能权重总和），
+    区间内用 top_k_candidates 部分选择分数最高的 limit 个，再按 (分数降序, 名称) 排序；
+  - 空前缀返回全局分数最高的名称（热门技能 / 岗位）。
+
+索引在快照构建后一次生成，只读，可被多个线程同时查询。
+"""
+
+from bisect import bisect_left
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .ranking import top_k_candidates
+from .snapshot import normalize_skill_name
+
+# 大于所有字符的哨兵，前缀 p 的区间上界为 p + _MAX_CHAR
+_MAX_CHAR = "\U0010ffff"
+
+
+class PrefixIndex:
+    """按规范化名称排序的前缀索引。"""
+
+    def __init__(self, names: Sequence[str], scores: np.ndarray):
+        keys = [normalize_skill_name(name) for name in names]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys: List[str] = [keys[i] for i in order]
+        # ids[i]：排序后第 i 个名称在原序列中的下标
+        self.ids = np.asarray(order, dtype=np.int64)
+        self.scores = np.asarray(scores, dtype=np.float64)[self.ids]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """以 prefix（规范化后）开头的名称在排序数组中的区间 [lo, hi)。"""
+        key = normalize_skill_name(prefix)
+        lo = bisect_left(self.keys, key)
+        hi = bisect_left(self.keys, key + _MAX_CHAR, lo)
+        return lo, hi
+
+    def suggest(self, prefix: str, limit: int = 10) -> Tuple[List[int], int]:
+        """
+        返回以 prefix 开头、分数最高的 limit 个名称。
+
+        Returns
+        -------
+        tuple
+            (原序列中的下标列表（按分数降序、名称升序）, 匹配的名称总数)。
+        """
+        lo, hi = self.prefix_range(prefix)
+        if hi <= lo or limit <= 0:
+            return [], max(hi - lo, 0)
+        scores = self.scores[lo:hi]
+        candidates = top_k_candidates(scores, limit)
+        candidates = sorted(candidates.tolist(), key=lambda i: (-scores[i], self.keys[lo + i]))[:limit]
+        return [int(self.ids[lo + i]) for i in candidates], hi - lo
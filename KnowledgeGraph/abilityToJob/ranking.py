@@ -0,0 +1,26 @@
+"""
+Top-K 部分选择
+
+匹配结果往往命中大量岗位，而调用方只展示前几个。这里先用 np.argpartition
+在 O(n) 内选出候选，再只对候选做完整排序，避免对长尾做全量排序与序列化。
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+def top_k_candidates(scores: np.ndarray, k: Optional[int]) -> np.ndarray:
+    """
+    返回 scores 中最大的 k 个元素的下标（未排序）。
+
+    与第 k 名同分的元素全部保留，调用方对候选按完整排序键排序后再截断，
+    结果与对全部元素排序后取前 k 个完全一致。k 为 None 时返回全部下标。
+    """
+    n = int(scores.shape[0])
+    if k is None or k >= n:
+        return np.arange(n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    kth = scores[np.argpartition(scores, n - k)[n - k]]
+    return np.flatnonzero(scores >= kth)
@@ -0,0 +1,195 @@
+"""
+多 worker 进程共享的只读快照
+
+uvicorn / gunicorn 以多个 worker 运行时，每个进程各自加载一份快照，内存随 worker 数线性增长。
+SharedSnapshotStore 把快照以编译产物格式（见 artifact）发布到共享目录（建议使用 tmpfs，
+如 /dev/shm/kg_snapshot），各 worker 内存映射同一个文件：
+
+  - 每次发布生成一个新的「代」：gen-<代号>.kgsnap，文件写完后才通过原子替换
+    CURRENT 指针文件（JSON：代号、文件名、图谱版本号、数据模型）对外可见；
+    指针的数据模型与本进程不一致（如 main.py 与 app.py 误配了同一目录）时视为未发布；
+  - worker 发现图谱版本变化时先读指针：其他 worker 已发布该版本则直接映射，
+    否则在文件锁内（同一时刻只有一个 worker）从数据源重建并发布新一代；
+  - get(force=True)（管理接口的强制重载）不复用已发布的代，总是重建并发布新一代；
+    其他 worker 通过 has_newer_generation() 发现版本号未变但代号更新的发布并切换；
+  - 进程内切换只是一次引用赋值，正在处理的请求继续使用旧快照；
+    旧代文件在发布后被删除，已映射它的进程不受影响，映射在快照释放后回收。
+
+跨 worker 共享的只有产物中的数值数组（CSR / 倒排表 / 派生数组，以及发布前已计算的相似岗位表），
+它们是 mmap 上的只读视图，占用同一份物理页。名称列表与名称→ID 字典（加载时从字符串表解码）、
+补全前缀索引、三元组索引等仍由每个 worker 各自构建，这部分内存随 worker 数增长。
+
+没有 fcntl 的平台（Windows）不做跨进程互斥，最坏情况是多个 worker 各自重建一次。
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .artifact import load_snapshot as load_artifact, save_snapshot
+from .snapshot import SkillJobSnapshot
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+POINTER_FILE = "CURRENT"
+LOCK_FILE = "publish.lock"
+
+# 除当前代之外保留的旧代文件数（给刚读到旧指针、尚未完成映射的进程留出余量）
+KEEP_GENERATIONS = 1
+
+
+class SharedSnapshotStore:
+    """共享目录中按代发布的快照；每个进程持有一个实例。"""
+
+    def __init__(self, directory: str, schema: Optional[str] = None, check_interval: float = 5.0):
+        self.directory = directory
+        # 发布的快照对应的图谱数据模型（artifact.SCHEMA_*），写入产物头部与指针
+        self.schema = schema
+        os.makedirs(directory, exist_ok=True)
+        self._pointer_path = os.path.join(directory, POINTER_FILE)
+        self._lock_path = os.path.join(directory, LOCK_FILE)
+        self._lock = threading.Lock()
+        # has_newer_generation() 读取指针文件的最小间隔（秒）
+        self.check_interval = check_interval
+        self._checked_at = float("-inf")
+
+        # 本进程当前映射的代
+        self.generation: Optional[int] = None
+        self.graph_version: Optional[int] = None
+        self.snapshot: Optional[SkillJobSnapshot] = None
+
+        self.attaches = 0
+        self.publishes = 0
+
+    # ---------------------------------------------------------------- 指针
+
+    def read_pointer(self) -> Optional[Dict[str, Any]]:
+        """读取 CURRENT 指针，尚未发布过时返回 None。"""
+        try:
+            with open(self._pointer_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_pointer(self, pointer: Dict[str, Any]):
+        tmp_path = f"{self._pointer_path}.tmp.{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(pointer, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._pointer_path)
+
+    # ---------------------------------------------------------------- 发布 / 映射
+
+    def _attach(self, pointer: Dict[str, Any]) -> SkillJobSnapshot:
+        if pointer["generation"] != self.generation:
+            snapshot, _ = load_artifact(os.path.join(self.directory, pointer["file"]))
+            # 先完整构建再一次性替换引用，读者看到的要么是旧快照要么是新快照
+            self.snapshot = snapshot
+            self.generation = pointer["generation"]
+            self.attaches += 1
+        self.graph_version = pointer["graph_version"]
+        return self.snapshot
+
+    def publish(self, snapshot: SkillJobSnapshot, graph_version: int) -> Dict[str, Any]:
+        """把快照发布为新的一代（调用方负责持有发布锁），返回新的指针。"""
+        previous = self.read_pointer()
+        generation = (previous["generation"] + 1) if previous else 1
+        name = f"gen-{generation}.kgsnap"
+        meta = {"graph_version": graph_version, "generation": generation}
+        if self.schema is not None:
+            meta["schema"] = self.schema
+        save_snapshot(snapshot, os.path.join(self.directory, name), meta=meta)
+        pointer = {"generation": generation, "file": name, "graph_version": graph_version,
+                   "schema": self.schema}
+        self._write_pointer(pointer)
+        self.publishes += 1
+        self._remove_old_generations(generation)
+        return pointer
+
+    def _remove_old_generations(self, current: int):
+        for name in os.listdir(self.directory):
+            if not (name.startswith("gen-") and name.endswith(".kgsnap")):
+                continue
+            try:
+                generation = int(name[len("gen-"):-len(".kgsnap")])
+            except ValueError:
+                continue
+            if generation < current - KEEP_GENERATIONS:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    # Windows 上仍被映射的文件无法删除，下次发布时再清理
+                    pass
+
+    def _usable(self, pointer: Optional[Dict[str, Any]], graph_version: int) -> bool:
+        return (pointer is not None
+                and pointer.get("schema") == self.schema
+                and pointer["graph_version"] >= graph_version)
+
+    def has_newer_generation(self) -> bool:
+        """
+        其他 worker 是否发布了与本进程映射的代不同的一代（如强制重载后版本号不变的新一代）。
+
+        每 check_interval 秒最多读取一次指针文件，其余调用直接返回 False。
+        """
+        now = time.monotonic()
+        if self.generation is None or now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        pointer = self.read_pointer()
+        return (pointer is not None
+                and pointer.get("schema") == self.schema
+                and pointer["generation"] != self.generation)
+
+    def get(self,
+            graph_version: int,
+            build: Callable[[], SkillJobSnapshot],
+            force: bool = False) -> Tuple[SkillJobSnapshot, bool]:
+        """
+        返回不旧于 graph_version 的共享快照。
+
+        已发布的代满足版本要求时直接映射；否则在跨进程文件锁内再检查一次，
+        仍不满足才调用 build() 从数据源重建并发布。
+        force=True 时不复用调用前已发布的代：只接受等锁期间其他 worker 新发布的代，
+        否则重建。
+
+        Returns
+        -------
+        tuple
+            (快照, 是否由本进程重建)。
+        """
+        with self._lock:
+            pointer = self.read_pointer()
+            if not force and self._usable(pointer, graph_version):
+                return self._attach(pointer), False
+            seen = pointer["generation"] if pointer is not None else None
+
+            with open(self._lock_path, "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    # 等锁期间其他 worker 可能已经发布了该版本
+                    pointer = self.read_pointer()
+                    if self._usable(pointer, graph_version) and not (force and pointer["generation"] == seen):
+                        return self._attach(pointer), False
+                    pointer = self.publish(build(), graph_version)
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            return self._attach(pointer), True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "schema": self.schema,
+            "generation": self.generation,
+            "graph_version": self.graph_version,
+            "attaches": self.attaches,
+            "publishes": self.publishes,
+        }
@@ -0,0 +1,484 @@
+"""
+岗位×技能 稀疏矩阵快照
+
+把岗位→能力知识图谱中的全部「岗位 - 技能 - 权重」边一次性加载到内存，
+以紧凑的 CSR 稀疏矩阵保存：
+
+  - 技能名称规范化后驻留为整数 ID（skill_index: 规范化名称 -> ID）；
+  - 每个岗位一行，indptr / indices / weights / categories 为 CSR 的列数组；
+  - 预先计算每个岗位的权重总和、技能数以及硬实力 / 软实力数量。
+
+一次匹配请求只需构造用户能力的稀疏向量 m（技能 ID -> m_k），
+再与矩阵相乘即可得到每个岗位的 Σ(w_k × m_k)，不再需要访问 Neo4j，
+也不再在 Python 中逐条遍历所有边。
+
+同时维护按技能分组的倒排表（posting_indptr / posting_entries，即矩阵的 CSC 视图）：
+规范化技能名 -> 包含该技能的全部边（岗位, 权重, 类别）。匹配时只访问输入技能的
+倒排表及其命中的岗位，开销与命中边数成正比，与图谱规模无关。
+"""
+
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 技能类别编码（categories 数组中的取值）
+CATEGORY_UNKNOWN = 0
+CATEGORY_HARD = 1
+CATEGORY_SOFT = 2
+
+# 类别编码 -> 一级分类名称（与 岗位→能力 图谱中 c.name 一致）
+CATEGORY_LABELS = {CATEGORY_HARD: "硬实力", CATEGORY_SOFT: "软实力"}
+
+# CSR 数组及预计算的派生数组：名称 -> dtype
+CSR_ARRAYS = {
+    "indptr": np.int64,
+    "indices": np.int32,
+    "weights": np.float64,
+    "categories": np.int8,
+}
+DERIVED_ARRAYS = {
+    "entry_rows": np.int32,
+    "job_total_weights": np.float64,
+    "job_hard_counts": np.int64,
+    "job_soft_counts": np.int64,
+    "posting_entries": np.int64,
+    "posting_indptr": np.int64,
+}
+
+_CATEGORY_CODES = {
+    "硬实力": CATEGORY_HARD,
+    "hard": CATEGORY_HARD,
+    "软实力": CATEGORY_SOFT,
+    "soft": CATEGORY_SOFT,
+}
+
+
+def normalize_skill_name(name: Any) -> str:
+    """规范化技能名称：去除前后空格并转小写。"""
+    if not isinstance(name, str):
+        return ""
+    return name.strip().lower()
+
+
+# 权重取值不超过该数量时按取值逐个计数，否则按等宽区间计数
+_WEIGHT_DISTINCT_LIMIT = 20
+_WEIGHT_BINS = 10
+
+
+def _distribution(values: np.ndarray) -> Dict[str, float]:
+    """最小 / 最大 / 平均值与 p50 / p90 / p99 分位数"""
+    if values.size == 0:
+        return {"min": 0, "max": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {
+        "min": int(values.min()),
+        "max": int(values.max()),
+        "mean": round(float(values.mean()), 3),
+        "p50": float(p50),
+        "p90": float(p90),
+        "p99": float(p99),
+    }
+
+
+def _log2_histogram(values: np.ndarray) -> List[Dict[str, int]]:
+    """按 0、1、2-3、4-7、8-15 … 的对数区间计数（只列出非空区间）"""
+    if values.size == 0:
+        return []
+    buckets = np.zeros(values.shape, dtype=np.int64)
+    positive = values > 0
+    buckets[positive] = np.floor(np.log2(values[positive])).astype(np.int64) + 1
+    counts = np.bincount(buckets)
+    histogram = []
+    for bucket in np.nonzero(counts)[0]:
+        low, high = (0, 0) if bucket == 0 else (1 << (bucket - 1), (1 << bucket) - 1)
+        histogram.append({"from": int(low), "to": int(high), "count": int(counts[bucket])})
+    return histogram
+
+
+def _weight_histogram(weights: np.ndarray) -> List[Dict[str, float]]:
+    """
+    边权重的分布。
+
+    取值较少（如 1-5 级熟练度）时逐个取值计数：[{weight, count}]；
+    否则按等宽区间计数：[{from, to, count}]。
+    """
+    if weights.size == 0:
+        return []
+    values, counts = np.unique(weights, return_counts=True)
+    if values.size <= _WEIGHT_DISTINCT_LIMIT:
+        return [{"weight": float(v), "count": int(c)} for v, c in zip(values, counts)]
+    counts, edges = np.histogram(weights, bins=_WEIGHT_BINS)
+    return [
+        {"from": round(float(edges[i]), 4), "to": round(float(edges[i + 1]), 4), "count": int(counts[i])}
+        for i in range(len(counts))
+    ]
+
+
+def category_code(category: Any) -> int:
+    """把 '硬实力' / '软实力' / 'hard' / 'soft' 映射为类别编码。"""
+    if not isinstance(category, str):
+        return CATEGORY_UNKNOWN
+    return _CATEGORY_CODES.get(category.strip().lower(), CATEGORY_UNKNOWN)
+
+
+class SnapshotMatch:
+    """
+    一次匹配的结果（只包含至少命中一条边的岗位）。
+
+    岗位级数组（长度 = 命中岗位数）：
+      - jobs: 岗位 ID
+      - match_counts: 命中的边数 k
+      - scores: Σ(w_k × m_k)
+      - matched_weights: 命中边的原始权重之和 Σw_k
+
+    边级数组（长度 = 命中边数），用于组装 matched_skills：
+      - entry_job_pos: 该边所属岗位在 jobs 中的下标
+      - entry_skills / entry_weights / entry_categories
+    """
+
+    __slots__ = (
+        "jobs", "match_counts", "scores", "matched_weights",
+        "entry_job_pos", "entry_skills", "entry_weights", "entry_categories",
+        "_order", "_bounds",
+    )
+
+    def __init__(self, jobs, match_counts, scores, matched_weights,
+                 entry_job_pos, entry_skills, entry_weights, entry_categories):
+        self.jobs = jobs
+        self.match_counts = match_counts
+        self.scores = scores
+        self.matched_weights = matched_weights
+        self.entry_job_pos = entry_job_pos
+        self.entry_skills = entry_skills
+        self.entry_weights = entry_weights
+        self.entry_categories = entry_categories
+        self._order = None
+        self._bounds = None
+
+    def __len__(self) -> int:
+        return int(self.jobs.shape[0])
+
+    def job_entries(self, pos: int) -> np.ndarray:
+        """返回第 pos 个命中岗位的命中边下标。"""
+        if self._order is None:
+            self._order = np.argsort(self.entry_job_pos, kind="stable")
+            self._bounds = np.searchsorted(self.entry_job_pos[self._order], np.arange(len(self) + 1))
+        return self._order[self._bounds[pos]:self._bounds[pos + 1]]
+
+
+class SkillJobSnapshot:
+    """岗位×技能权重图的只读内存快照（CSR 稀疏矩阵）。"""
+
+    def __init__(self,
+                 job_names: List[str],
+                 skill_names: List[str],
+                 indptr: np.ndarray,
+                 indices: np.ndarray,
+                 weights: np.ndarray,
+                 categories: np.ndarray,
+                 derived: Optional[Mapping[str, np.ndarray]] = None):
+        self.job_names = job_names
+        # skill_names 保存每个技能 ID 首次出现时的原始名称（用于展示）
+        self.skill_names = skill_names
+        self.skill_index: Dict[str, int] = {
+            normalize_skill_name(name): sid for sid, name in enumerate(skill_names)
+        }
+        self.job_index: Dict[str, int] = {name: jid for jid, name in enumerate(job_names)}
+        # 岗位名称同样按去空格、小写规范化，用于大小写不敏感的岗位查找
+        self.job_key_index: Dict[str, int] = {}
+        for jid, name in enumerate(job_names):
+            self.job_key_index.setdefault(normalize_skill_name(name), jid)
+
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.categories = np.asarray(categories, dtype=np.int8)
+        self.job_skill_counts = np.diff(self.indptr)
+
+        if derived is not None:
+            # 派生数组已预先算好（如来自编译产物的内存映射），直接引用，不复制
+            for name, dtype in DERIVED_ARRAYS.items():
+                setattr(self, name, np.asarray(derived[name], dtype=dtype))
+        else:
+            self._compute_derived()
+
+        self._trigram_index = None
+        self._skill_prefix_index = None
+        self._job_prefix_index = None
+        self._job_similarity = None
+        self._similarity_lock = threading.Lock()
+
+    def _compute_derived(self):
+        num_jobs = len(self.job_names)
+        num_skills = len(self.skill_names)
+
+        # 每条边所属的岗位（行号），用于向量化的按行归约
+        self.entry_rows = np.repeat(np.arange(num_jobs, dtype=np.int32), self.job_skill_counts)
+
+        # 预计算的岗位级统计量
+        self.job_total_weights = np.bincount(
+            self.entry_rows, weights=self.weights, minlength=num_jobs
+        )
+        self.job_hard_counts = np.bincount(
+            self.entry_rows, weights=(self.categories == CATEGORY_HARD), minlength=num_jobs
+        ).astype(np.int64)
+        self.job_soft_counts = np.bincount(
+            self.entry_rows, weights=(self.categories == CATEGORY_SOFT), minlength=num_jobs
+        ).astype(np.int64)
+
+        # 倒排表：技能 ID -> 边下标（按技能分组，组内保持 CSR 顺序）
+        self.posting_entries = np.argsort(self.indices, kind="stable").astype(np.int64)
+        self.posting_indptr = np.zeros(num_skills + 1, dtype=np.int64)
+        self.posting_indptr[1:] = np.cumsum(np.bincount(self.indices, minlength=num_skills))
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """返回快照的全部数值数组（CSR 数组 + 派生数组），用于序列化。"""
+        arrays = {name: getattr(self, name) for name in CSR_ARRAYS}
+        arrays.update({name: getattr(self, name) for name in DERIVED_ARRAYS})
+        return arrays
+
+    def edges(self) -> Iterator[Tuple[str, str, float, str]]:
+        """按 CSR 顺序逐条返回 (job_name, skill_name, weight, category) 边。"""
+        for jid, job_name in enumerate(self.job_names):
+            for i in range(self.indptr[jid], self.indptr[jid + 1]):
+                yield (
+                    job_name,
+                    self.skill_names[int(self.indices[i])],
+                    float(self.weights[i]),
+                    CATEGORY_LABELS.get(int(self.categories[i]), ""),
+                )
+
+    def catalog_stats(self) -> Dict[str, Any]:
+        """
+        容量规划用的目录统计：
+
+          - edges_per_job：每个岗位的技能边数分布；
+          - skill_degree：每个技能被多少个岗位要求的分布及其对数区间直方图；
+          - weight_histogram：边权重的分布。
+        """
+        skill_degrees = np.diff(self.posting_indptr)
+        return {
+            "jobs": self.num_jobs,
+            "skills": self.num_skills,
+            "edges": self.nnz,
+            "hard_edges": int(np.count_nonzero(self.categories == CATEGORY_HARD)),
+            "soft_edges": int(np.count_nonzero(self.categories == CATEGORY_SOFT)),
+            "edges_per_job": _distribution(self.job_skill_counts),
+            "skill_degree": {
+                **_distribution(skill_degrees),
+                "histogram": _log2_histogram(skill_degrees),
+            },
+            "weight_histogram": _weight_histogram(self.weights),
+        }
+
+    def has_duplicate_entries(self) -> bool:
+        """同一岗位下是否存在同名技能的多条边。"""
+        keys = self.entry_rows.astype(np.int64) * max(self.num_skills, 1) + self.indices
+        return int(np.unique(keys).shape[0]) != self.nnz
+
+    def deduplicated(self) -> "SkillJobSnapshot":
+        """返回同一岗位下同名技能只保留一条（权重取最大值）的新快照。"""
+        return SkillJobSnapshot.from_edges(self.edges(), dedupe=True)
+
+    # ---------------------------------------------------------------- 构建
+
+    @classmethod
+    def from_edges(cls,
+                   edges: Iterable[Tuple[str, str, Any, Any]],
+                   dedupe: bool = False) -> "SkillJobSnapshot":
+        """
+        由 (job_name, skill_name, weight, category) 边列表构建快照。
+
+        边按岗位分组为 CSR 行，岗位顺序为首次出现的顺序；
+        技能名称规范化后去重驻留，空名称或无法解析的权重会被跳过。
+        dedupe=True 时同一岗位下的同名技能只保留一条（类别取首次出现，权重取最大值）。
+        """
+        job_index: Dict[str, int] = {}
+        skill_index: Dict[str, int] = {}
+        skill_names: List[str] = []
+        rows: List[List[Tuple[int, float, int]]] = []
+
+        for job_name, skill_name, weight, category in edges:
+            if not job_name:
+                continue
+            key = normalize_skill_name(skill_name)
+            if not key:
+                continue
+            try:
+                w = float(weight or 0.0)
+            except (TypeError, ValueError):
+                continue
+
+            jid = job_index.get(job_name)
+            if jid is None:
+                jid = job_index[job_name] = len(rows)
+                rows.append([])
+            sid = skill_index.get(key)
+            if sid is None:
+                sid = skill_index[key] = len(skill_names)
+                skill_names.append(skill_name.strip())
+            rows[jid].append((sid, w, category_code(category)))
+
+        if dedupe:
+            for jid, row in enumerate(rows):
+                merged: Dict[int, Tuple[int, float, int]] = {}
+                for sid, w, code in row:
+                    prev = merged.get(sid)
+                    if prev is None:
+                        merged[sid] = (sid, w, code)
+                    elif w > prev[1]:
+                        merged[sid] = (sid, w, prev[2])
+                rows[jid] = list(merged.values())
+
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(r) for r in rows])
+        flat = [entry for r in rows for entry in r]
+
+        return cls(
+            job_names=list(job_index),
+            skill_names=skill_names,
+            indptr=indptr,
+            indices=np.fromiter((e[0] for e in flat), dtype=np.int32, count=len(flat)),
+            weights=np.fromiter((e[1] for e in flat), dtype=np.float64, count=len(flat)),
+            categories=np.fromiter((e[2] for e in flat), dtype=np.int8, count=len(flat)),
+        )
+
+    # ---------------------------------------------------------------- 查询
+
+    @property
+    def num_jobs(self) -> int:
+        return len(self.job_names)
+
+    @property
+    def num_skills(self) -> int:
+        return len(self.skill_names)
+
+    @property
+    def nnz(self) -> int:
+        return int(self.indices.shape[0])
+
+    def skill_id(self, name: Any) -> Optional[int]:
+        """返回技能名称对应的 ID，未收录时返回 None。"""
+        return self.skill_index.get(normalize_skill_name(name))
+
+    def job_id(self, name: Any) -> Optional[int]:
+        """按规范化名称（忽略大小写与前后空格）返回岗位 ID，未收录时返回 None。"""
+        return self.job_key_index.get(normalize_skill_name(name))
+
+    @property
+    def trigram_index(self):
+        """技能名称的三元组索引（首次访问时构建），用于容错查找。"""
+        if self._trigram_index is None:
+            from .trigram import TrigramIndex
+            self._trigram_index = TrigramIndex(self.skill_names)
+        return self._trigram_index
+
+    @property
+    def skill_prefix_index(self):
+        """技能名称的前缀补全索引（首次访问时构建），按被多少个岗位要求排序。"""
+        if self._skill_prefix_index is None:
+            from .prefix_index import PrefixIndex
+            self._skill_prefix_index = PrefixIndex(self.skill_names, np.diff(self.posting_indptr))
+        return self._skill_prefix_index
+
+    @property
+    def job_prefix_index(self):
+        """岗位名称的前缀补全索引（首次访问时构建），按技能权重总和排序。"""
+        if self._job_prefix_index is None:
+            from .prefix_index import PrefixIndex
+            self._job_prefix_index = PrefixIndex(self.job_names, self.job_total_weights)
+        return self._job_prefix_index
+
+    def job_similarity(self, top_n: int = 20):
+        """
+        岗位×岗位加权余弦相似度的近邻表（见 similarity.py）。
+
+        首次调用时按参数构建并缓存，之后的调用直接返回缓存的表（参数不再生效）；
+        多个线程同时首次调用时只构建一次，其余线程等待构建完成。
+        """
+        if self._job_similarity is None:
+            with self._similarity_lock:
+                if self._job_similarity is None:
+                    from .similarity import JobSimilarity
+                    self._job_similarity = JobSimilarity.build(self, top_n)
+        return self._job_similarity
+
+    def postings(self, skill_id: int) -> np.ndarray:
+        """返回包含该技能的全部边下标（倒排表）。"""
+        return self.posting_entries[self.posting_indptr[skill_id]:self.posting_indptr[skill_id + 1]]
+
+    def match(self, skills: Mapping[int, float], positive_only: bool = True) -> SnapshotMatch:
+        """
+        计算稀疏向量 m 与岗位×技能矩阵的乘积。
+
+        只读取输入技能的倒排表，命中的边即为矩阵中与 m 的非零分量相交的元素。
+
+        Parameters
+        ----------
+        skills : dict[int, float]
+            技能 ID -> m_k（相似度 × 熟练度）。
+        positive_only : bool
+            为 True 时忽略权重 <= 0 的边（与原匹配逻辑一致）。
+        """
+        return next(self.match_many([skills], positive_only=positive_only))
+
+    def match_many(self,
+                   queries: Sequence[Mapping[int, float]],
+                   positive_only: bool = True,
+                   chunk_size: int = 512) -> Iterator[SnapshotMatch]:
+        """
+        批量匹配：把 N 个用户能力向量组成 画像×技能 稀疏矩阵，与 技能×岗位 矩阵相乘。
+
+        每 chunk_size 个画像为一块做一次向量化的稀疏乘法（按 画像×岗位 键归约），
+        逐个画像产出 SnapshotMatch，内存占用只与单块命中的边数相关。
+        """
+        num_jobs = max(self.num_jobs, 1)
+        for start in range(0, len(queries), chunk_size):
+            chunk = queries[start:start + chunk_size]
+
+            # 画像×技能 矩阵的非零元 (p, s, m) -> 技能 s 的倒排表
+            lists: List[np.ndarray] = []
+            owners: List[int] = []
+            values: List[float] = []
+            for p, skills in enumerate(chunk):
+                for sid, m in skills.items():
+                    lists.append(self.postings(sid))
+                    owners.append(p)
+                    values.append(float(m))
+
+            lengths = [len(lst) for lst in lists]
+            entries = np.concatenate(lists) if lists else np.empty(0, dtype=np.int64)
+            profiles = np.repeat(np.asarray(owners, dtype=np.int64), lengths)
+            m = np.repeat(np.asarray(values, dtype=np.float64), lengths)
+            if positive_only:
+                keep = self.weights[entries] > 0
+                entries, profiles, m = entries[keep], profiles[keep], m[keep]
+
+            # 按 (画像, 边下标) 排序，使每个岗位的命中边保持图谱中的原始顺序
+            order = np.lexsort((entries, profiles))
+            entries, profiles, m = entries[order], profiles[order], m[order]
+
+            # 以 画像×岗位 为键归约，得到乘积矩阵的非零元
+            weights = self.weights[entries]
+            keys = profiles * num_jobs + self.entry_rows[entries]
+            cells, cell_pos = np.unique(keys, return_inverse=True)
+            counts = np.bincount(cell_pos, minlength=len(cells))
+            scores = np.bincount(cell_pos, weights=weights * m, minlength=len(cells))
+            matched = np.bincount(cell_pos, weights=weights, minlength=len(cells))
+
+            cell_bounds = np.searchsorted(cells // num_jobs, np.arange(len(chunk) + 1))
+            entry_bounds = np.searchsorted(profiles, np.arange(len(chunk) + 1))
+            for p in range(len(chunk)):
+                cs = slice(cell_bounds[p], cell_bounds[p + 1])
+                es = slice(entry_bounds[p], entry_bounds[p + 1])
+                yield SnapshotMatch(
+                    jobs=cells[cs] % num_jobs,
+                    match_counts=counts[cs],
+                    scores=scores[cs],
+                    matched_weights=matched[cs],
+                    entry_job_pos=cell_pos[es] - cell_bounds[p],
+                    entry_skills=self.indices[entries[es]],
+                    entry_weights=weights[es],
+                    entry_categories=self.categories[entries[es]],
+                )
@@ -0,0 +1,74 @@
+"""
+技能名称字符三元组（trigram）索引
+
+用于容错匹配（错别字、多字 / 少字、大小写差异等）：
+
+  - 名称规范化后首部补两个空格、尾部补一个空格，再切分为字符三元组
+    （与 PostgreSQL pg_trgm 的做法一致，保证两个字的中文技能也有三元组）；
+  - 倒排表：三元组 -> 包含它的技能 ID；
+  - 相似度为三元组集合的 Jaccard 系数：共有 / (|A| + |B| - 共有)。
+
+查询时只遍历输入名称各三元组的倒排表，开销与命中的候选数成正比，
+不随技能词表规模线性增长。
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+from .snapshot import normalize_skill_name
+
+# 默认相似度阈值（同 pg_trgm）：低于该值的候选不返回
+DEFAULT_THRESHOLD = 0.3
+
+
+def trigrams(name: str) -> List[str]:
+    """返回规范化名称的去重字符三元组列表。"""
+    key = normalize_skill_name(name)
+    if not key:
+        return []
+    padded = "  " + key + " "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+class TrigramIndex:
+    """技能名称的三元组倒排索引。"""
+
+    def __init__(self, names: Iterable[str]):
+        self.postings: Dict[str, List[int]] = {}
+        self.sizes: List[int] = []
+        for sid, name in enumerate(names):
+            grams = trigrams(name)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(sid)
+
+    def lookup(self,
+               name: str,
+               threshold: float = DEFAULT_THRESHOLD,
+               limit: int = 5) -> List[Tuple[int, float]]:
+        """
+        返回与 name 相似度不低于 threshold 的技能，按相似度降序取前 limit 个。
+
+        Returns
+        -------
+        list[tuple[int, float]]
+            (技能 ID, 相似度) 列表。
+        """
+        grams = trigrams(name)
+        if not grams:
+            return []
+
+        # 只统计与输入共享至少一个三元组的候选
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for sid in self.postings.get(gram, ()):
+                shared[sid] = shared.get(sid, 0) + 1
+
+        size = len(grams)
+        scored = []
+        for sid, common in shared.items():
+            score = common / (size + self.sizes[sid] - common)
+            if score >= threshold:
+                scored.append((sid, score))
+
+        scored.sort(key=lambda x: (-x[1], x[0]))
+        return scored[:limit]
@@ -2,14 +2,25 @@
 知识图谱数据库服务 - Flask应用
 提供职位技能查询的RESTful API接口
 """
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from py2neo import Graph, NodeMatcher
+import json
 import logging
+import os
 import sys
 
 # 能力→岗位匹配算法（复用岗位→能力知识图谱）
-from abilityToJob.matcher import match_skills_to_jobs
+from abilityToJob import artifact
+from abilityToJob.matcher import load_snapshot, match_skills_to_jobs, match_skills_to_jobs_batch
+from abilityToJob.shared_snapshot import SharedSnapshotStore
+from abilityToJob.snapshot import normalize_skill_name
+from common.graph_version import GRAPH_VERSION_NAME, READ_VERSION_QUERY, GraphVersionTracker
+from common.hot_reload import SnapshotReloader
+from common.http_cache import JSON_MEDIA_TYPE, CatalogCache
+from common.result_cache import ResultCache
+from common.schema_adapter import SCHEMA_PAGE, SCHEMA_POSITION, SchemaAdapter
+from common.single_flight import SingleFlight
 
 # 配置日志
 logging.basicConfig(
@@ -31,6 +42,96 @@ except Exception as e:
     graph = None
     matcher = None
 
+# 构建脚本输出的编译产物（.kgsnap）路径；配置后技能→岗位匹配直接使用内存映射的产物，不依赖 Neo4j
+ARTIFACT_PATH = os.getenv('KG_ARTIFACT_PATH') or None
+
+
+def _fetch_graph_version():
+    """读取构建脚本写入的图谱版本号"""
+    if ARTIFACT_PATH:
+        # 构建时间戳：构建脚本替换为内容不同的产物后递增（只编译产物时图谱版本号恒为 0）
+        return artifact.artifact_version(artifact.read_header(ARTIFACT_PATH, schema=artifact.SCHEMA_DOMAIN))
+    result = graph.run(READ_VERSION_QUERY, name=GRAPH_VERSION_NAME).data()
+    if result and result[0].get('building'):
+        # 构建脚本正在重建图谱：沿用旧版本号，继续使用旧快照
+        return None
+    return (result[0].get('version') or 0) if result else 0
+
+
+# 图谱版本号（构建脚本每次导入后递增），快照重载以它判断是否过期
+graph_version = GraphVersionTracker(
+    _fetch_graph_version, float(os.getenv('KG_VERSION_CHECK_INTERVAL', '5'))
+)
+
+# 数据模型适配：启动时以及图谱版本号变化后检测存在 Position / 领域 / Page 中的哪些模型，
+# 请求直接使用对应的查询，不再逐个试探
+schema_adapter = SchemaAdapter(
+    lambda query, params: graph.run(query, **params).data(), graph_version.current
+)
+if graph:
+    try:
+        logger.info(f"检测到的数据模型: {', '.join(schema_adapter.detect()) or '无'}")
+    except Exception as e:
+        logger.warning(f"检测数据模型失败，将在首次请求时重试: {str(e)}")
+
+# 多 worker 共享快照的目录（如 /dev/shm/kg_snapshot），配置后各 worker 映射同一份快照
+_shared_dir = os.getenv('KG_SHARED_SNAPSHOT_DIR')
+shared_snapshots = SharedSnapshotStore(
+    _shared_dir, artifact.SCHEMA_DOMAIN, float(os.getenv('KG_VERSION_CHECK_INTERVAL', '5'))
+) if _shared_dir else None
+
+# 管理接口（/api/admin/*）的访问令牌，通过请求头 X-Admin-Token 传入；未设置时不校验
+ADMIN_TOKEN = os.getenv('KG_ADMIN_TOKEN') or None
+
+
+def _load_generation(version, rebuild=False):
+    """构建一代岗位×技能矩阵快照（从 Neo4j、编译产物或共享目录；rebuild=True 时强制重建并发布新一代）"""
+    if shared_snapshots is not None:
+        snap, _ = shared_snapshots.get(version, lambda: load_snapshot(graph, ARTIFACT_PATH), force=rebuild)
+    else:
+        snap = load_snapshot(graph, ARTIFACT_PATH)
+    logger.info(
+        f"岗位×技能快照加载完成（图谱版本 {version}）: {snap.num_jobs} 个岗位, "
+        f"{snap.num_skills} 个技能, {snap.nnz} 条边"
+    )
+    return snap
+
+
+# 岗位×技能矩阵快照（首次匹配请求时加载，图谱版本变化后在后台重建并原子切换）
+snapshot_reloader = SnapshotReloader(_load_generation, graph_version.current)
+
+# 技能→岗位查询结果缓存（LRU + TTL，提供服务的快照切换时整体失效）
+result_cache = ResultCache(
+    int(os.getenv('KG_CACHE_SIZE', '2048')),
+    float(os.getenv('KG_CACHE_TTL', '600')),
+    lambda: snapshot_reloader.version,
+)
+
+
+# 合并同时到达的相同请求（职位 / 技能列表、相同的技能匹配），只向 Neo4j 执行一次
+flights = SingleFlight()
+
+# 领域 / 职位 / 技能列表按图谱版本预编码的响应体（含 gzip / brotli 版本与 ETag）
+catalog_cache = CatalogCache(graph_version.current, float(os.getenv('KG_CACHE_TTL', '600')))
+
+
+def _catalog_response(key, build):
+    """目录类接口的响应：命中时直接返回预编码的响应体，If-None-Match 一致时返回 304"""
+    entry = catalog_cache.get_or_build(key, lambda: flights.do(('catalog', key), build))
+    status, body, headers = entry.respond(
+        request.headers.get('If-None-Match'), request.headers.get('Accept-Encoding')
+    )
+    catalog_cache.record(status, entry, body)
+    return Response(body, status=status, headers=headers, mimetype=JSON_MEDIA_TYPE)
+
+
+def get_snapshot():
+    """返回岗位×技能矩阵快照，首次调用时同步加载，之后版本变化时在后台重建"""
+    if shared_snapshots is not None and shared_snapshots.has_newer_generation():
+        # 其他 worker 强制重载发布了新一代（版本号不变），后台切换过去，不重建
+        snapshot_reloader.trigger(force=True, rebuild=False)
+    return snapshot_reloader.get()
+
 @app.route('/')
 def index():
     """主页"""
@@ -80,37 +181,9 @@ def get_domains():
         }), 503
     
     try:
-        # 首先尝试新数据库结构（Position节点）
-        query_new = "MATCH (p:Position) RETURN p.name as name ORDER BY p.name"
-        result_new = graph.run(query_new).data()
-        
-        if result_new:
-            domains = [row['name'] for row in result_new]
-            return jsonify({
-                'success': True,
-                'domains': domains,
-                'type': 'Position'  # 标识使用的是新结构
-            })
-        
-        # 如果新结构查询不到，尝试旧结构（领域节点）
-        query_old = "MATCH (d:领域) RETURN d.name as name ORDER BY d.name"
-        result_old = graph.run(query_old).data()
-        
-        if result_old:
-            domains = [row['name'] for row in result_old]
-            return jsonify({
-                'success': True,
-                'domains': domains,
-                'type': 'Domain'  # 标识使用的是旧结构
-            })
-        
-        # 如果都查询不到，返回空列表
-        return jsonify({
-            'success': True,
-            'domains': [],
-            'message': '数据库中没有找到岗位或领域数据'
-        })
-        
+        return _catalog_response(
+            'domains', lambda: _job_names_payload('domains', '数据库中没有找到岗位或领域数据')
+        )
     except Exception as e:
         logger.error(f"查询领域失败: {str(e)}")
         return jsonify({
@@ -157,6 +230,50 @@ def get_skills(domain_name):
             'message': f'查询失败: {str(e)}'
         }), 500
 
+# Page 结构中 Category.type 与前端类别名称的对应
+_PAGE_CATEGORY_LABELS = {'hard': '硬实力', 'soft': '软实力'}
+
+
+def _display_level(weight):
+    """Position / 领域 结构的权重（0-1 或 1-10）映射为前端使用的 1-5 级"""
+    # 将0-1范围的权重映射到1-10的等级，然后映射到1-5级显示
+    if weight < 1:
+        level = int(weight * 10)  # 0-1映射到0-10
+    else:
+        level = min(int(weight), 10)  # ≥1映射到1-10
+    level = max(level, 1)  # 至少为1
+    if level <= 2:
+        return 1
+    elif level <= 4:
+        return 2
+    elif level <= 6:
+        return 3
+    elif level <= 8:
+        return 4
+    return 5
+
+
+def _format_job_skill(schema, row):
+    """把各数据模型的岗位技能行统一为 {skill, level, category}"""
+    weight = float(row['weight']) if row['weight'] is not None else 3.0
+    category = row.get('category') or ''
+    if schema == SCHEMA_PAGE:
+        # Page 结构的权重即 1-5 级熟练度
+        return {
+            'skill': row['skill'],
+            'level': min(max(int(round(weight)), 1), 5),
+            'category': _PAGE_CATEGORY_LABELS.get(category.strip().lower(), '硬实力')
+        }
+    if schema == SCHEMA_POSITION and category not in ['硬实力', '软实力']:
+        # 确保category是"硬实力"或"软实力"
+        category = '软实力'
+    return {
+        'skill': row['skill'],
+        'level': _display_level(weight),
+        'category': category  # 硬实力 或 软实力
+    }
+
+
 @app.route('/api/query-job-skills', methods=['POST'])
 def query_job_skills():
     """根据职位名称查询所需技能 - 兼容新旧数据库结构"""
@@ -176,101 +293,15 @@ def query_job_skills():
                 'message': '请提供职位名称'
             }), 400
         
-        # 首先尝试新的数据库结构（Skill->Position）
-        # 查询：给定岗位名称，查找所有连接到该岗位的技能
-        query_new = """
-        MATCH (s:Skill)-[r:RELATES_TO]->(p:Position {name: $job_title})
-        RETURN s.name as skill, r.weight as weight, s.type as category
-        ORDER BY r.weight DESC, s.name
-        """
-        result_new = graph.run(query_new, job_title=job_title).data()
-        
-        if result_new:
-            # 使用新数据库结构
-            skills = []
-            for row in result_new:
-                if row['skill']:
-                    weight = float(row['weight']) if row['weight'] is not None else 3.0
-                    # 将0-1范围的权重映射到1-10的等级，然后映射到1-5级显示
-                    if weight < 1:
-                        level = int(weight * 10)  # 0-1映射到0-10
-                    else:
-                        level = min(int(weight), 10)  # ≥1映射到1-10
-                    level = max(level, 1)  # 至少为1
-                    # 映射到1-5级显示（前端使用）
-                    if level <= 2:
-                        display_level = 1
-                    elif level <= 4:
-                        display_level = 2
-                    elif level <= 6:
-                        display_level = 3
-                    elif level <= 8:
-                        display_level = 4
-                    else:
-                        display_level = 5
-                    
-                    category = row.get('category', '')
-                    if category is None:
-                        category = ''
-                    # 确保category是"硬实力"或"软实力"
-                    if category not in ['硬实力', '软实力']:
-                        category = '硬实力' if category == '硬实力' else '软实力'
-                    
-                    skills.append({
-                        'skill': row['skill'],
-                        'level': display_level,
-                        'category': category  # 硬实力 或 软实力
-                    })
-            
-            return jsonify({
-                'success': True,
-                'skills': skills
-            })
-        
-        # 如果新结构查询失败，尝试旧结构（领域->一级分类->二级分类）
-        query_old = """
-        MATCH (d:领域 {name: $job_title})-[:包含]->(c:一级分类)
-        MATCH (c)-[r:包含]->(s:二级分类)
-        RETURN s.name as skill, r.weight as weight, c.name as category
-        ORDER BY r.weight DESC, s.name
-        """
-        result_old = graph.run(query_old, job_title=job_title).data()
-        
-        if result_old:
-            skills = []
-            for row in result_old:
-                if row['skill']:
-                    weight = float(row['weight']) if row['weight'] is not None else 3.0
-                    # 将0-1范围的权重映射到1-10的等级
-                    level = int(weight * 10) if weight < 1 else min(int(weight), 10)
-                    level = max(level, 1)  # 至少为1
-                    # 映射到1-5级显示
-                    if level <= 2:
-                        display_level = 1
-                    elif level <= 4:
-                        display_level = 2
-                    elif level <= 6:
-                        display_level = 3
-                    elif level <= 8:
-                        display_level = 4
-                    else:
-                        display_level = 5
-                    
-                    category = row.get('category', '')
-                    if category is None:
-                        category = ''
-                    skills.append({
-                        'skill': row['skill'],
-                        'level': display_level,
-                        'category': category  # 硬实力 或 软实力
-                    })
-            
+        schema, rows = schema_adapter.query('job_skills', job_title=job_title)
+        if schema:
+            skills = [_format_job_skill(schema, row) for row in rows if row['skill']]
             return jsonify({
                 'success': True,
                 'skills': skills
             })
         
-        # 如果两种结构都查询不到，返回空结果
+        # 如果各结构都查询不到，返回空结果
         return jsonify({
             'success': True,
             'skills': [],
@@ -286,6 +317,23 @@ def query_job_skills():
             'message': f'查询失败: {str(e)}'
         }), 500
 
+def _job_names_payload(field, empty_message):
+    """/api/domains、/api/jobs 的响应内容：名称列表放在 field 字段下"""
+    schema, rows = schema_adapter.query('job_names')
+    if schema:
+        return {
+            'success': True,
+            field: [row['name'] for row in rows],
+            'type': schema  # 标识使用的数据结构：Position / Domain / Page
+        }
+    
+    # 如果都查询不到，返回空列表
+    return {
+        'success': True,
+        field: [],
+        'message': empty_message
+    }
+
 @app.route('/api/jobs', methods=['GET'])
 def get_jobs():
     """获取所有职位列表 - 兼容新旧数据库结构"""
@@ -296,37 +344,7 @@ def get_jobs():
         }), 503
     
     try:
-        # 首先尝试新数据库结构（Position节点）
-        query_new = "MATCH (p:Position) RETURN p.name as name ORDER BY p.name"
-        result_new = graph.run(query_new).data()
-        
-        if result_new:
-            jobs = [row['name'] for row in result_new]
-            return jsonify({
-                'success': True,
-                'jobs': jobs,
-                'type': 'Position'
-            })
-        
-        # 如果新结构查询不到，尝试旧结构（领域节点）
-        query_old = "MATCH (d:领域) RETURN d.name as name ORDER BY d.name"
-        result_old = graph.run(query_old).data()
-        
-        if result_old:
-            jobs = [row['name'] for row in result_old]
-            return jsonify({
-                'success': True,
-                'jobs': jobs,
-                'type': 'Domain'
-            })
-        
-        # 如果都查询不到，返回空列表
-        return jsonify({
-            'success': True,
-            'jobs': [],
-            'message': '数据库中没有找到职位数据'
-        })
-        
+        return _catalog_response('jobs', lambda: _job_names_payload('jobs', '数据库中没有找到职位数据'))
     except Exception as e:
         logger.error(f"查询职位列表失败: {str(e)}")
         return jsonify({
@@ -334,10 +352,42 @@ def get_jobs():
             'message': f'查询失败: {str(e)}'
         }), 500
 
+def _parse_paging(data):
+    """
+    从请求体解析 (top_k, offset, min_score)，top_k 缺省表示返回全部。
+
+    取值无法解析、top_k 不是正整数或 offset 为负数时抛出 ValueError（消息可直接返回给调用方）。
+    """
+    try:
+        top_k = data.get('top_k')
+        top_k = int(top_k) if top_k is not None else None
+        offset = int(data.get('offset') or 0)
+        min_score = float(data.get('min_score') or 0)
+    except (TypeError, ValueError):
+        raise ValueError('top_k、offset 必须为整数，min_score 必须为数字')
+    if top_k is not None and top_k < 1 or offset < 0:
+        raise ValueError('top_k 必须为正整数，offset 不能为负数')
+    return top_k, offset, min_score
+
+def _parse_skill_levels(levels):
+    """
+    解析 技能名称 -> 熟练度 映射，熟练度统一转为 float（缓存键与打分使用同一取值）。
+
+    不是对象或熟练度无法解析为数字时抛出 ValueError（消息可直接返回给调用方）。
+    """
+    if not levels:
+        return {}
+    if not isinstance(levels, dict):
+        raise ValueError('skill_levels 必须是 技能名称 -> 熟练度 的对象')
+    try:
+        return {str(k): float(v) for k, v in levels.items()}
+    except (TypeError, ValueError):
+        raise ValueError('skill_levels 中的熟练度必须为数字')
+
 @app.route('/api/query-skills-to-jobs', methods=['POST'])
 def query_skills_to_jobs():
     """根据技能列表查询匹配的岗位 - 使用岗位→能力知识图谱进行相似度计算"""
-    if not graph:
+    if not graph and not ARTIFACT_PATH:
         return jsonify({
             'success': False,
             'message': 'Neo4j数据库未连接'
@@ -357,13 +407,40 @@ def query_skills_to_jobs():
                 'message': '请提供至少一个技能'
             }), 400
 
-        jobs, input_count, normalized_skills = match_skills_to_jobs(graph, skills)
+        # 分页与截断参数：只返回排序后的第 offset ~ offset+top_k 个岗位
+        try:
+            top_k, offset, min_score = _parse_paging(data)
+            levels = _parse_skill_levels(data.get('skill_levels'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+
+        # 缓存键：排序后的规范化技能集合 + 熟练度 + 分页参数
+        normalized = [normalize_skill_name(s) for s in skills]
+        cache_key = (
+            tuple(sorted({s for s in normalized if s})),
+            tuple(sorted((normalize_skill_name(k), v) for k, v in levels.items())),
+            top_k, offset, min_score,
+        )
+        # 缓存未命中时，同时到达的相同查询只计算一次
+        jobs = result_cache.get_or_compute(
+            cache_key,
+            lambda: flights.do(cache_key, lambda: match_skills_to_jobs(
+                graph, skills, get_snapshot(), skill_levels=levels,
+                top_k=top_k, offset=offset, min_score=min_score
+            )[0])
+        )
+        input_count = sum(1 for s in normalized if s)
+        normalized_skills = skills if input_count else []
 
         return jsonify({
             'success': True,
             'jobs': jobs,
             'input_skills_count': input_count,
             'input_skills': normalized_skills,
+            'offset': offset,
             'message': f'找到 {len(jobs)} 个匹配的岗位' if jobs else '未找到匹配的岗位'
         })
         
@@ -377,6 +454,105 @@ def query_skills_to_jobs():
         }), 500
 
 
+@app.route('/api/batch/query-skills-to-jobs', methods=['POST'])
+def batch_query_skills_to_jobs():
+    """
+    批量匹配多个用户画像，按画像逐行（NDJSON）流式返回匹配结果。
+
+    top_k / offset / min_score 对每个画像分别生效，含义同 /api/query-skills-to-jobs。
+    """
+    if not graph and not ARTIFACT_PATH:
+        return jsonify({
+            'success': False,
+            'message': 'Neo4j数据库未连接'
+        }), 503
+
+    data = request.get_json() or {}
+    profiles = data.get('profiles', [])
+    if not isinstance(profiles, list) or not profiles:
+        return jsonify({
+            'success': False,
+            'message': '请提供至少一个画像'
+        }), 400
+
+    try:
+        top_k, offset, min_score = _parse_paging(data)
+        skill_levels = [
+            _parse_skill_levels(profile.get('skill_levels')) if isinstance(profile, dict) else None
+            for profile in profiles
+        ]
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+
+    try:
+        snap = get_snapshot()
+    except Exception as e:
+        logger.error(f"加载岗位×技能快照失败: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'查询失败: {str(e)}'
+        }), 500
+
+    skill_sets = []
+    for profile in profiles:
+        skills = profile.get('skills', []) if isinstance(profile, dict) else []
+        if isinstance(skills, str):
+            skills = [s.strip() for s in skills.split(',') if s.strip()]
+        skill_sets.append(skills)
+
+    def generate():
+        results = match_skills_to_jobs_batch(
+            graph, skill_sets, skill_levels, snap, top_k=top_k, min_score=min_score, offset=offset
+        )
+        for idx, (profile, (jobs, input_count, normalized_skills)) in enumerate(zip(profiles, results)):
+            yield json.dumps({
+                'index': idx,
+                'id': profile.get('id') if isinstance(profile, dict) else None,
+                'success': input_count > 0,
+                'jobs': jobs,
+                'input_skills_count': input_count,
+                'input_skills': normalized_skills,
+                'offset': offset,
+            }, ensure_ascii=False) + '\n'
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+
+def _all_skills_payload():
+    """/api/all-skills 的响应内容"""
+    query = """
+    MATCH (s:二级分类)
+    RETURN DISTINCT s.name as name, s.category_type as category
+    ORDER BY name
+    """
+    result = graph.run(query).data()
+
+    hard = []
+    soft = []
+    unknown = []
+
+    for row in result:
+        name = row.get('name')
+        cat = row.get('category') or ''
+        if not name:
+            continue
+        if cat == '硬实力':
+            hard.append(name)
+        elif cat == '软实力':
+            soft.append(name)
+        else:
+            unknown.append(name)
+
+    return {
+        'success': True,
+        'hard_skills': hard,
+        'soft_skills': soft,
+        'unknown_skills': unknown
+    }
+
 @app.route('/api/all-skills', methods=['GET'])
 def all_skills():
     """返回所有二级技能列表，并区分硬实力 / 软实力"""
@@ -387,35 +563,7 @@ def all_skills():
         }), 503
     
     try:
-        query = """
-        MATCH (s:二级分类)
-        RETURN DISTINCT s.name as name, s.category_type as category
-        ORDER BY name
-        """
-        result = graph.run(query).data()
-
-        hard = []
-        soft = []
-        unknown = []
-
-        for row in result:
-            name = row.get('name')
-            cat = row.get('category') or ''
-            if not name:
-                continue
-            if cat == '硬实力':
-                hard.append(name)
-            elif cat == '软实力':
-                soft.append(name)
-            else:
-                unknown.append(name)
-
-        return jsonify({
-            'success': True,
-            'hard_skills': hard,
-            'soft_skills': soft,
-            'unknown_skills': unknown
-        })
+        return _catalog_response('all_skills', _all_skills_payload)
     except Exception as e:
         logger.error(f"查询全部技能失败: {str(e)}")
         return jsonify({
@@ -423,9 +571,46 @@ def all_skills():
             'message': f'查询失败: {str(e)}'
         }), 500
 
+# 一次查询取得全部计数；每个子查询都是单标签 / 全图计数，由计数存储直接给出，不扫描节点
+STATS_QUERY = """
+CALL { MATCH (n) RETURN count(n) AS total_nodes }
+CALL { MATCH ()-[r]->() RETURN count(r) AS total_relationships }
+CALL { MATCH (d:领域) RETURN count(d) AS domains }
+CALL { MATCH (s:二级分类) RETURN count(s) AS skills }
+RETURN total_nodes, total_relationships, domains, skills
+"""
+
+# /api/stats 的结果（监控面板频繁轮询），图谱版本号或提供服务的快照变化时失效
+stats_cache = ResultCache(
+    1,
+    float(os.getenv('KG_CACHE_TTL', '600')),
+    lambda: (graph_version.current(), snapshot_reloader.version),
+)
+
+
+def _collect_stats():
+    counts = graph.run(STATS_QUERY).data()[0]
+    try:
+        catalog = get_snapshot().catalog_stats()
+    except Exception as e:
+        logger.warning(f"岗位×技能快照不可用，跳过目录统计: {str(e)}")
+        catalog = None
+    return {
+        'stats': {
+            'total_nodes': counts['total_nodes'],
+            'total_relationships': counts['total_relationships'],
+            'domains': counts['domains'],
+            'skills': counts['skills']
+        },
+        # 每个岗位的边数、技能被要求的岗位数分布、边权重直方图
+        'catalog': catalog,
+        'graph_version': graph_version.current()
+    }
+
+
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
-    """获取数据库统计信息"""
+    """获取数据库统计信息（按图谱版本缓存）、目录分布，以及数据模型检测结果与省去的试探查询"""
     if not graph:
         return jsonify({
             'success': False,
@@ -433,25 +618,11 @@ def get_stats():
         }), 503
     
     try:
-        # 统计节点数量
-        node_count_query = "MATCH (n) RETURN count(n) as count"
-        node_count = graph.run(node_count_query).data()[0]['count']
-        
-        # 统计领域数量
-        domain_count_query = "MATCH (d:领域) RETURN count(d) as count"
-        domain_count = graph.run(domain_count_query).data()[0]['count']
-        
-        # 统计技能数量（二级分类）
-        skill_count_query = "MATCH (s:二级分类) RETURN count(s) as count"
-        skill_count = graph.run(skill_count_query).data()[0]['count']
-        
+        result = stats_cache.get_or_compute('stats', lambda: flights.do(('stats',), _collect_stats))
         return jsonify({
             'success': True,
-            'stats': {
-                'total_nodes': node_count,
-                'domains': domain_count,
-                'skills': skill_count
-            }
+            **result,
+            'schema': schema_adapter.stats()
         })
     except Exception as e:
         logger.error(f"查询统计信息失败: {str(e)}")
@@ -460,6 +631,37 @@ def get_stats():
             'message': f'查询失败: {str(e)}'
         }), 500
 
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """技能→岗位结果缓存的命中 / 未命中 / 淘汰计数、共享快照的代信息、请求合并次数以及目录类接口的 304 次数"""
+    return jsonify({
+        'success': True,
+        'cache': result_cache.stats(),
+        'shared_snapshot': shared_snapshots.stats() if shared_snapshots is not None else None,
+        'reloader': snapshot_reloader.stats(),
+        'single_flight': flights.stats(),
+        'catalog': catalog_cache.stats()
+    })
+
+@app.route('/api/admin/reload', methods=['POST'])
+def admin_reload():
+    """立即检查图谱版本号并在后台重建快照（?force=true 时即使版本号未变化也重建）"""
+    if ADMIN_TOKEN and request.headers.get('X-Admin-Token') != ADMIN_TOKEN:
+        return jsonify({
+            'success': False,
+            'message': '管理令牌无效'
+        }), 403
+    version = graph_version.refresh()
+    if graph:
+        schema_adapter.detect()
+    started = snapshot_reloader.trigger(force=request.args.get('force', '').lower() in ('1', 'true'))
+    return jsonify({
+        'success': True,
+        'started': started,
+        'graph_version': version,
+        'reloader': snapshot_reloader.stats()
+    })
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """健康检查端点"""
@@ -0,0 +1,51 @@
+"""
+前缀补全（PrefixIndex.suggest）的查询耗时
+
+用法：python benchmarks/bench_suggest.py [--jobs 2000] [--skills 5000] [--limit 10]
+
+按前缀长度（1~4 个字符）分别统计：随机抽取已有名称的前缀作为查询，
+输出每次查询的平均耗时与平均命中数，以及索引的构建耗时。
+"""
+
+import argparse
+import random
+import time
+
+from synthetic import synthetic_snapshot
+
+
+def _bench(index, names, length, limit, rounds, rng):
+    prefixes = [name[:length] for name in rng.choices(names, k=rounds)]
+    matched = 0
+    started = time.perf_counter()
+    for prefix in prefixes:
+        matched += index.suggest(prefix, limit)[1]
+    elapsed = time.perf_counter() - started
+    return elapsed / rounds * 1e6, matched / rounds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="前缀补全查询耗时")
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--skills", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    snapshot = synthetic_snapshot(args.jobs, args.skills, args.seed)
+    rng = random.Random(args.seed)
+    for label, build, names in (
+        ("skills", lambda: snapshot.skill_prefix_index, snapshot.skill_names),
+        ("jobs", lambda: snapshot.job_prefix_index, snapshot.job_names),
+    ):
+        started = time.perf_counter()
+        index = build()
+        print(f"{label}: {len(index)} 个名称，索引构建 {(time.perf_counter() - started) * 1000:.1f} ms")
+        for length in range(1, 5):
+            per_query_us, avg_matched = _bench(index, names, length, args.limit, args.rounds, rng)
+            print(f"  前缀长度 {length}: {per_query_us:.1f} us/次，平均命中 {avg_matched:.0f} 个")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+基准测试用的合成岗位×技能图谱
+
+技能热度近似 Zipf 分布（少数通用技能被大量岗位要求），每个岗位要求的技能数在
+[min_skills, max_skills] 之间均匀分布，权重为 1~9 的整数，类别随机取硬实力 / 软实力。
+同一 seed 生成的图谱完全相同，便于对比不同实现或不同机器上的结果。
+"""
+
+import os
+import sys
+from typing import List, Tuple
+
+import numpy as np
+
+# 以脚本方式运行时导入 KnowledgeGraph 下的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from abilityToJob.snapshot import SkillJobSnapshot  # noqa: E402
+
+CATEGORIES = ("硬实力", "软实力")
+
+
+def synthetic_edges(num_jobs: int,
+                    num_skills: int,
+                    min_skills: int = 5,
+                    max_skills: int = 30,
+                    seed: int = 0) -> List[Tuple[str, str, int, str]]:
+    """生成 (岗位, 技能, 权重, 类别) 边列表"""
+    rng = np.random.RandomState(seed)
+    popularity = 1.0 / np.arange(1, num_skills + 1) ** 0.8
+    popularity /= popularity.sum()
+    edges = []
+    for j in range(num_jobs):
+        count = rng.randint(min_skills, max_skills + 1)
+        skills = rng.choice(num_skills, size=min(count, num_skills), replace=False, p=popularity)
+        weights = rng.randint(1, 10, size=len(skills))
+        categories = rng.randint(0, 2, size=len(skills))
+        edges.extend(
+            (f"岗位{j}", f"技能{s}", int(w), CATEGORIES[c])
+            for s, w, c in zip(skills, weights, categories)
+        )
+    return edges
+
+
+def synthetic_snapshot(num_jobs: int, num_skills: int, seed: int = 0) -> SkillJobSnapshot:
+    return SkillJobSnapshot.from_edges(synthetic_edges(num_jobs, num_skills, seed=seed), dedupe=True)
@@ -0,0 +1,103 @@
+"""
+图谱版本号
+
+构建脚本（jobToAbility/build_knowledge_graph.py）每次导入完成后都会把
+(:GraphVersion {name: 'knowledge_graph'}) 节点的 version 加一。
+服务进程读取该版本号来判断内存快照、结果缓存是否已经过期。
+
+版本号是构建脚本最后写入的标记：重建开始时先把节点的 building 置为 true，
+导入全部完成后才递增 version 并清除 building。重建期间服务读到的版本号保持不变
+（fetch 返回 None 时 GraphVersionTracker 沿用旧版本号），不会加载构建了一半的图谱。
+重建失败时构建脚本清除 building 但不递增 version，服务端继续使用失败前的快照。
+
+为避免每个请求都访问一次 Neo4j，GraphVersionTracker 在 check_interval 秒内
+复用上一次读到的版本号。
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+GRAPH_VERSION_NAME = "knowledge_graph"
+
+READ_VERSION_QUERY = """
+MATCH (v:GraphVersion {name: $name})
+RETURN v.version AS version, coalesce(v.building, false) AS building
+"""
+
+MARK_BUILDING_QUERY = """
+MERGE (v:GraphVersion {name: $name})
+SET v.building = true,
+    v.build_started_at = timestamp()
+RETURN coalesce(v.version, 0) AS version
+"""
+
+# 重建失败时清除 building 标记（版本号不变）：否则服务端一直读到 building，
+# 永远沿用旧版本号，之后成功的重建也要等到下一次递增才会被发现
+CLEAR_BUILDING_QUERY = """
+MATCH (v:GraphVersion {name: $name})
+SET v.building = false,
+    v.build_failed_at = timestamp()
+RETURN coalesce(v.version, 0) AS version
+"""
+
+BUMP_VERSION_QUERY = """
+MERGE (v:GraphVersion {name: $name})
+SET v.version = coalesce(v.version, 0) + 1,
+    v.building = false,
+    v.updated_at = timestamp()
+RETURN v.version AS version
+"""
+
+
+class GraphVersionTracker:
+    """
+    节流读取图谱版本号；从未导入过（没有版本节点）时版本为 0。
+
+    fetch 返回 None 表示暂时无法给出可用的版本号（如图谱正在重建），沿用旧版本号。
+    fetch 为 None 时不主动读取，版本号只由调用方通过 observe() 写入
+    （如异步服务在后台任务中用异步驱动读取）。
+    """
+
+    def __init__(self, fetch: Optional[Callable[[], Optional[int]]], check_interval: float = 5.0):
+        self._fetch = fetch
+        self.check_interval = check_interval
+        self._version = 0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> int:
+        """返回当前图谱版本号，距上次读取超过 check_interval 秒时重新读取"""
+        now = time.monotonic()
+        if self._fetch is None or now - self._checked_at < self.check_interval:
+            return self._version
+        with self._lock:
+            if now - self._checked_at >= self.check_interval:
+                self._refresh()
+        return self._version
+
+    def refresh(self) -> int:
+        """忽略 check_interval 立即重新读取版本号"""
+        with self._lock:
+            self._refresh()
+        return self._version
+
+    def observe(self, version: Optional[int]) -> int:
+        """写入在别处读取到的版本号（None 表示沿用旧版本号），返回当前版本号"""
+        with self._lock:
+            if version is not None:
+                self._version = int(version)
+            self._checked_at = time.monotonic()
+        return self._version
+
+    def _refresh(self):
+        if self._fetch is None:
+            return
+        try:
+            version = self._fetch()
+            if version is not None:
+                self._version = int(version)
+        except Exception:
+            # 读取失败时沿用旧版本号，避免数据库抖动导致缓存被整体清空
+            pass
+        self._checked_at = time.monotonic()
@@ -0,0 +1,165 @@
+"""
+快照热重载
+
+图谱重建后，服务进程需要换用新的内存快照。SnapshotReloader 负责：
+
+  - 读者无阻塞：get() 只读取当前代的引用，不加锁、不等待重建
+    （只有进程启动后尚无任何快照时，首个请求才会同步加载一次）；
+  - 后台重建：get() 发现图谱版本号变化（或调用 trigger()）时启动后台线程构建新快照，
+    构建完成后一次引用赋值原子切换，构建失败时继续使用旧快照；
+    load(version, rebuild) 的 rebuild 为 True 时要求从数据源重建（如管理接口的强制重载），
+    不复用其他进程已发布的共享快照；
+  - 旧代释放：正在处理的请求持有旧快照的引用，请求结束后旧快照随引用计数归零被释放
+    （内存映射的快照同时解除映射），stats() 中的 live_generations 反映尚未释放的代数。
+
+版本号由 GraphVersionTracker 提供；构建脚本重建期间版本号保持不变（见 graph_version），
+因此不会加载到构建了一半的图谱。
+"""
+
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Optional
+
+
+class _Generation:
+    """一代快照：快照对象 + 对应的图谱版本号。"""
+
+    __slots__ = ("number", "snapshot", "version", "loaded_at")
+
+    def __init__(self, number: int, snapshot: Any, version: int):
+        self.number = number
+        self.snapshot = snapshot
+        self.version = version
+        self.loaded_at = time.time()
+
+
+class SnapshotReloader:
+    """按图谱版本号在后台重建快照并原子切换。"""
+
+    def __init__(self,
+                 load: Callable[[int, bool], Any],
+                 version: Callable[[], int],
+                 retry_interval: float = 30.0):
+        self._load = load
+        self._version_fn = version
+        # 重建失败后，retry_interval 秒内不再因同一版本号自动重试（trigger(force=True) 不受限）
+        self.retry_interval = retry_interval
+        self._failed_version: Optional[int] = None
+        self._failed_at = 0.0
+        self._current: Optional[_Generation] = None
+        # _state_lock 保护 _reloading 标志；_build_lock 保证同一时刻只有一次构建
+        self._state_lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._reloading = False
+        self._live = weakref.WeakSet()
+
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_duration: Optional[float] = None
+
+    # ---------------------------------------------------------------- 读取
+
+    def get(self) -> Any:
+        """返回当前快照；版本号变化时在后台重建，不阻塞调用方。"""
+        current = self._current
+        if current is None:
+            return self._load_initial()
+        if self._version_fn() != current.version:
+            self.trigger()
+        return current.snapshot
+
+    @property
+    def version(self) -> Optional[int]:
+        """当前正在提供服务的快照对应的图谱版本号（尚未加载时为 None）"""
+        current = self._current
+        return current.version if current is not None else None
+
+    def _load_initial(self) -> Any:
+        with self._build_lock:
+            if self._current is None:
+                self._reload(self._version_fn(), False)
+        return self._current.snapshot
+
+    # ---------------------------------------------------------------- 重建
+
+    def trigger(self, force: bool = False, rebuild: Optional[bool] = None) -> bool:
+        """
+        启动一次后台重建。
+
+        force=False 时只有版本号与当前快照不同才重建；已有重建在进行时不重复启动。
+        rebuild 传给 load()，默认与 force 相同；force=True, rebuild=False 用于切换到
+        其他进程已发布的新一代共享快照（版本号不变，但不需要本进程重建）。
+
+        Returns
+        -------
+        bool
+            是否启动了新的后台重建。
+        """
+        with self._state_lock:
+            if self._reloading:
+                return False
+            version = self._version_fn()
+            current = self._current
+            if not force and current is not None and current.version == version:
+                return False
+            if (not force and self._failed_version == version
+                    and time.monotonic() - self._failed_at < self.retry_interval):
+                return False
+            self._reloading = True
+
+        thread = threading.Thread(
+            target=self._background_reload, args=(version, force if rebuild is None else rebuild),
+            name="snapshot-reload", daemon=True,
+        )
+        thread.start()
+        return True
+
+    def _background_reload(self, version: int, rebuild: bool):
+        try:
+            with self._build_lock:
+                self._reload(version, rebuild)
+        except Exception:
+            # 失败已记录在 last_error 中，继续使用旧快照
+            pass
+        finally:
+            with self._state_lock:
+                self._reloading = False
+
+    def _reload(self, version: int, rebuild: bool):
+        started = time.perf_counter()
+        try:
+            snapshot = self._load(version, rebuild)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            self._failed_version = version
+            self._failed_at = time.monotonic()
+            raise
+        number = (self._current.number + 1) if self._current is not None else 1
+        generation = _Generation(number, snapshot, version)
+        try:
+            self._live.add(snapshot)
+        except TypeError:
+            pass
+        # 新快照完整构建后才替换引用；读者看到的要么是旧代要么是新代
+        self._current = generation
+        self.reloads += 1
+        self.last_error = None
+        self._failed_version = None
+        self.last_duration = time.perf_counter() - started
+
+    def stats(self) -> Dict[str, Any]:
+        current = self._current
+        return {
+            "generation": current.number if current is not None else None,
+            "graph_version": current.version if current is not None else None,
+            "loaded_at": current.loaded_at if current is not None else None,
+            "reloading": self._reloading,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_duration_ms": round(self.last_duration * 1000, 1) if self.last_duration is not None else None,
+            "live_generations": len(self._live),
+        }
@@ -0,0 +1,223 @@
+"""
+目录类接口的预编码响应与 HTTP 条件请求
+
+岗位 / 技能 / Page 列表只在图谱重建后才会变化，CatalogCache 按图谱版本缓存这些接口
+序列化好的响应体，而不是每次请求都查询 Neo4j 再序列化：
+
+  - 每个条目保存 JSON 字节串及其 gzip / brotli 压缩版本（压缩只在写入时做一次）；
+  - 强 ETag 由响应体内容的哈希生成，同一内容在不同 worker、不同版本间保持不变，
+    图谱重建但列表未变化时客户端仍然得到 304；每种编码的 ETag 带有各自的后缀；
+  - 请求带 If-None-Match 且与当前内容一致时返回 304（无响应体）；
+  - 按 Accept-Encoding（含 q 值）在 br、gzip、原文之间选择，并返回 Vary: Accept-Encoding；
+  - 图谱版本号变化时整体失效；ttl 作为没有版本标记时的兜底。
+
+brotli 为可选依赖，未安装时只提供 gzip。
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 可选依赖
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+
+# 小于该字节数的响应体不压缩（压缩收益抵不过额外的编码头）
+MIN_COMPRESS_SIZE = 512
+
+# 客户端每次使用前都需要重新验证（命中时只返回 304），图谱重建后立即看到新数据
+CACHE_CONTROL = "no-cache"
+
+
+def _parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """解析 Accept-Encoding，返回 编码 -> q 值"""
+    accepted: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def _parse_if_none_match(header: Optional[str]) -> List[str]:
+    """解析 If-None-Match，返回去掉弱标记 W/ 的 ETag 列表（"*" 原样保留）"""
+    tags = []
+    for tag in (header or "").split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.append(tag)
+    return tags
+
+
+class EncodedBody:
+    """一个响应体的原文与压缩版本，以及各自的 ETag"""
+
+    def __init__(self, payload: Any):
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        # 编码 -> (字节串, ETag)；只保留确实更小的压缩版本
+        self.variants: Dict[str, Tuple[bytes, str]] = {}
+        if len(self.body) >= MIN_COMPRESS_SIZE:
+            # mtime=0：同一内容在不同进程中得到相同的 gzip 字节串
+            compressed = gzip.compress(self.body, compresslevel=9, mtime=0)
+            if len(compressed) < len(self.body):
+                self.variants["gzip"] = (compressed, f'"{digest}-gzip"')
+            if brotli is not None:
+                compressed = brotli.compress(self.body, quality=11)
+                if len(compressed) < len(self.body):
+                    self.variants["br"] = (compressed, f'"{digest}-br"')
+        self._etags = {self.etag} | {etag for _, etag in self.variants.values()}
+
+    def select(self, accept_encoding: Optional[str]) -> Tuple[Optional[str], bytes, str]:
+        """按 Accept-Encoding 选择编码，返回 (编码或 None, 字节串, ETag)"""
+        accepted = _parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        best = None
+        best_q = 0.0
+        # 同等 q 值时优先 br（压缩率更高）
+        for encoding in ("br", "gzip"):
+            if encoding not in self.variants:
+                continue
+            q = accepted.get(encoding, wildcard)
+            if q > best_q:
+                best, best_q = encoding, q
+        if best is None:
+            return None, self.body, self.etag
+        body, etag = self.variants[best]
+        return best, body, etag
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        """If-None-Match 是否与本内容的任一编码的 ETag 一致"""
+        tags = _parse_if_none_match(if_none_match)
+        return "*" in tags or any(tag in self._etags for tag in tags)
+
+    def respond(self,
+                if_none_match: Optional[str],
+                accept_encoding: Optional[str]) -> Tuple[int, bytes, Dict[str, str]]:
+        """
+        生成条件请求的响应。
+
+        Returns
+        -------
+        tuple
+            (状态码 200 / 304, 响应体, 响应头)。响应头不含 Content-Type，由调用方设置。
+        """
+        encoding, body, etag = self.select(accept_encoding)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+        if self.not_modified(if_none_match):
+            return 304, b"", headers
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return 200, body, headers
+
+
+class CatalogCache:
+    """按图谱版本缓存的预编码响应体（线程安全）"""
+
+    def __init__(self,
+                 version: Optional[Callable[[], Optional[int]]] = None,
+                 ttl: float = 600.0):
+        self._version_fn = version
+        self.ttl = ttl
+        self._version: Optional[int] = None
+        self._data: Dict[Hashable, Tuple[EncodedBody, float]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.builds = 0
+        self.not_modified = 0
+        self.invalidations = 0
+        self.bytes_saved = 0
+
+    def _current_version(self) -> Optional[int]:
+        return self._version_fn() if self._version_fn is not None else None
+
+    def _check_version(self, version: Optional[int]):
+        """版本号变化时清空缓存（需持有锁）"""
+        if version != self._version:
+            if self._data:
+                self.invalidations += 1
+                self._data.clear()
+            self._version = version
+
+    def get(self, key: Hashable) -> Optional[EncodedBody]:
+        version = self._current_version()
+        with self._lock:
+            self._check_version(version)
+            item = self._data.get(key)
+            if item is None:
+                return None
+            entry, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self.hits += 1
+            return entry
+
+    def _store(self, key: Hashable, version: Optional[int], payload: Any) -> EncodedBody:
+        entry = EncodedBody(payload)
+        with self._lock:
+            self.builds += 1
+            # 构建期间版本号变化（图谱已重建）时不写入，避免旧数据挂在新版本下
+            if version == self._current_version():
+                self._check_version(version)
+                self._data[key] = (entry, time.monotonic() + self.ttl)
+        return entry
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> EncodedBody:
+        """命中则返回缓存的响应体，否则调用 build() 得到 JSON 可序列化的内容并编码、写入"""
+        version = self._current_version()
+        entry = self.get(key)
+        if entry is None:
+            entry = self._store(key, version, build())
+        return entry
+
+    async def get_or_build_async(self, key: Hashable, build: Callable[[], Awaitable[Any]]) -> EncodedBody:
+        """get_or_build 的异步版本：未命中时 await build()"""
+        version = self._current_version()
+        entry = self.get(key)
+        if entry is None:
+            entry = self._store(key, version, await build())
+        return entry
+
+    def record(self, status: int, entry: EncodedBody, body: bytes):
+        """记录一次响应：304 计数，以及相对未压缩原文节省的字节数"""
+        with self._lock:
+            if status == 304:
+                self.not_modified += 1
+            self.bytes_saved += len(entry.body) - len(body)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "graph_version": self._version,
+                "hits": self.hits,
+                "builds": self.builds,
+                "not_modified": self.not_modified,
+                "invalidations": self.invalidations,
+                "bytes_saved": self.bytes_saved,
+                "encodings": ["br", "gzip"] if brotli is not None else ["gzip"],
+            }
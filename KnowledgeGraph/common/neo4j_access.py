@@ -0,0 +1,254 @@
+"""
+Neo4j 数据访问层
+
+统一图谱服务对 Neo4j 的读写方式：
+
+  - 托管事务：读查询走 session.execute_read（集群下路由到读副本），写查询走 execute_write；
+    遇到瞬时错误（TransientError、连接中断等）由驱动在 max_transaction_retry_time 内自动重试；
+  - 连接池：池大小、获取连接超时、建立连接超时、连接最大存活时间均可通过环境变量配置；
+  - fetch_size：每批从服务端拉取的记录数；
+  - 每个查询带服务端事务超时（事务函数以 neo4j.unit_of_work(timeout=...) 包装，随 BEGIN 发送；
+    托管事务中的 tx.run 只接受查询字符串，不接受 neo4j.Query），慢查询不会无限占用连接；
+  - 统计：查询数、重试次数、失败 / 超时数、正在使用 / 等待连接的会话数及其峰值、
+    获取连接的等待时间，用于在压测下确定连接池大小。
+
+驱动本身不公开连接池的内部计数，这里在会话层面统计：从开始执行到事务函数首次被调用
+之间的时间视为获取连接的等待时间，事务函数执行期间视为占用一个连接。
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from neo4j import READ_ACCESS, WRITE_ACCESS, unit_of_work
+from neo4j.exceptions import ClientError, ConnectionAcquisitionTimeoutError
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+class Neo4jSettings:
+    """连接池、重试、拉取批量与查询超时配置（默认值可被 KG_NEO4J_* 环境变量覆盖）"""
+
+    def __init__(self,
+                 pool_size: int = 32,
+                 acquisition_timeout: float = 10.0,
+                 connection_timeout: float = 5.0,
+                 max_connection_lifetime: float = 3600.0,
+                 max_retry_time: float = 15.0,
+                 fetch_size: int = 1000,
+                 query_timeout: float = 30.0,
+                 database: Optional[str] = None):
+        self.pool_size = pool_size
+        self.acquisition_timeout = acquisition_timeout
+        self.connection_timeout = connection_timeout
+        self.max_connection_lifetime = max_connection_lifetime
+        self.max_retry_time = max_retry_time
+        self.fetch_size = fetch_size
+        self.query_timeout = query_timeout
+        self.database = database
+
+    @classmethod
+    def from_env(cls) -> "Neo4jSettings":
+        return cls(
+            pool_size=int(os.getenv("KG_NEO4J_POOL_SIZE", "32")),
+            acquisition_timeout=_env_float("KG_NEO4J_ACQUISITION_TIMEOUT", 10.0),
+            connection_timeout=_env_float("KG_NEO4J_CONNECTION_TIMEOUT", 5.0),
+            max_connection_lifetime=_env_float("KG_NEO4J_MAX_CONNECTION_LIFETIME", 3600.0),
+            max_retry_time=_env_float("KG_NEO4J_MAX_RETRY_TIME", 15.0),
+            fetch_size=int(os.getenv("KG_NEO4J_FETCH_SIZE", "1000")),
+            query_timeout=_env_float("KG_NEO4J_QUERY_TIMEOUT", 30.0),
+            database=os.getenv("KG_NEO4J_DATABASE") or None,
+        )
+
+    def driver_kwargs(self) -> Dict[str, Any]:
+        """传给 GraphDatabase.driver / AsyncGraphDatabase.driver 的连接池与重试参数"""
+        return {
+            "max_connection_pool_size": self.pool_size,
+            "connection_acquisition_timeout": self.acquisition_timeout,
+            "connection_timeout": self.connection_timeout,
+            "max_connection_lifetime": self.max_connection_lifetime,
+            "max_transaction_retry_time": self.max_retry_time,
+            "fetch_size": self.fetch_size,
+        }
+
+    def session_kwargs(self, access_mode: str) -> Dict[str, Any]:
+        kwargs = {"default_access_mode": access_mode, "fetch_size": self.fetch_size}
+        if self.database:
+            kwargs["database"] = self.database
+        return kwargs
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class AccessStats:
+    """会话层面的连接使用统计（线程安全，同步 / 异步访问共用）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.acquisitions = 0
+        self.retries = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.acquisition_timeouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.acquire_wait_total = 0.0
+        self.acquire_wait_max = 0.0
+        self.query_time_total = 0.0
+
+    def begin_wait(self):
+        with self._lock:
+            self.waiting += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+
+    def acquired(self, wait: float):
+        with self._lock:
+            self.waiting -= 1
+            self.acquisitions += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.acquire_wait_total += wait
+            self.acquire_wait_max = max(self.acquire_wait_max, wait)
+
+    def retried(self):
+        with self._lock:
+            self.retries += 1
+
+    def released(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def finish(self, started: float, acquired: bool, error: Optional[BaseException]):
+        with self._lock:
+            if not acquired:
+                self.waiting -= 1
+            self.queries += 1
+            self.query_time_total += time.perf_counter() - started
+            if error is not None:
+                self.failures += 1
+                if isinstance(error, ConnectionAcquisitionTimeoutError):
+                    self.acquisition_timeouts += 1
+                elif isinstance(error, ClientError) and "TransactionTimedOut" in (error.code or ""):
+                    self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            acquired = max(self.acquisitions, 1)
+            return {
+                "queries": self.queries,
+                "retries": self.retries,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "acquisition_timeouts": self.acquisition_timeouts,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "waiting": self.waiting,
+                "peak_waiting": self.peak_waiting,
+                "avg_acquire_wait_ms": round(self.acquire_wait_total / acquired * 1000, 3),
+                "max_acquire_wait_ms": round(self.acquire_wait_max * 1000, 3),
+                "avg_query_ms": round(self.query_time_total / max(self.queries, 1) * 1000, 3),
+            }
+
+
+class _Work:
+    """事务函数：首次调用时记录获取连接的等待时间，再次调用即为驱动的重试"""
+
+    def __init__(self, stats: AccessStats, query: str, parameters: Dict[str, Any]):
+        self.stats = stats
+        self.query = query
+        self.parameters = parameters
+        self.started = time.perf_counter()
+        self.attempts = 0
+
+    def _enter(self):
+        if self.attempts == 0:
+            self.stats.acquired(time.perf_counter() - self.started)
+        else:
+            self.stats.retried()
+        self.attempts += 1
+
+    def __call__(self, tx) -> List[Dict[str, Any]]:
+        self._enter()
+        return [record.data() for record in tx.run(self.query, self.parameters)]
+
+    async def run_async(self, tx) -> List[Dict[str, Any]]:
+        self._enter()
+        result = await tx.run(self.query, self.parameters)
+        return [record.data() async for record in result]
+
+
+class GraphAccess:
+    """同步驱动上的托管读写事务"""
+
+    def __init__(self, driver, settings: Neo4jSettings, stats: Optional[AccessStats] = None):
+        self.driver = driver
+        self.settings = settings
+        self.stats = stats or AccessStats()
+
+    def _execute(self, access_mode: str, query: str,
+                 parameters: Optional[Dict[str, Any]], timeout: Optional[float]) -> List[Dict[str, Any]]:
+        work = _Work(self.stats, query, parameters or {})
+        transaction_function = unit_of_work(timeout=timeout or self.settings.query_timeout)(work)
+        self.stats.begin_wait()
+        error = None
+        try:
+            with self.driver.session(**self.settings.session_kwargs(access_mode)) as session:
+                execute = session.execute_read if access_mode == READ_ACCESS else session.execute_write
+                return execute(transaction_function)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if work.attempts:
+                self.stats.released()
+            self.stats.finish(work.started, work.attempts > 0, error)
+
+    def read(self, query: str, parameters: Optional[Dict[str, Any]] = None,
+             timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self._execute(READ_ACCESS, query, parameters, timeout)
+
+    def write(self, query: str, parameters: Optional[Dict[str, Any]] = None,
+              timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self._execute(WRITE_ACCESS, query, parameters, timeout)
+
+
+class AsyncGraphAccess:
+    """异步驱动上的托管读写事务"""
+
+    def __init__(self, driver, settings: Neo4jSettings, stats: Optional[AccessStats] = None):
+        self.driver = driver
+        self.settings = settings
+        self.stats = stats or AccessStats()
+
+    async def _execute(self, access_mode: str, query: str,
+                       parameters: Optional[Dict[str, Any]], timeout: Optional[float]) -> List[Dict[str, Any]]:
+        work = _Work(self.stats, query, parameters or {})
+        transaction_function = unit_of_work(timeout=timeout or self.settings.query_timeout)(work.run_async)
+        self.stats.begin_wait()
+        error = None
+        try:
+            async with self.driver.session(**self.settings.session_kwargs(access_mode)) as session:
+                execute = session.execute_read if access_mode == READ_ACCESS else session.execute_write
+                return await execute(transaction_function)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if work.attempts:
+                self.stats.released()
+            self.stats.finish(work.started, work.attempts > 0, error)
+
+    async def read(self, query: str, parameters: Optional[Dict[str, Any]] = None,
+                   timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return await self._execute(READ_ACCESS, query, parameters, timeout)
+
+    async def write(self, query: str, parameters: Optional[Dict[str, Any]] = None,
+                    timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return await self._execute(WRITE_ACCESS, query, parameters, timeout)
@@ -0,0 +1,123 @@
+"""
+版本化的查询结果缓存
+
+  - 键：调用方给出的可哈希规范化键（如排序、小写后的技能集合 + 熟练度）；
+  - LRU 淘汰：条目数超过 maxsize 时淘汰最久未使用的条目，内存有上界；
+  - TTL：条目写入超过 ttl 秒后视为过期；
+  - 图谱版本：版本号变化（构建脚本重新导入）时整体失效。
+
+命中 / 未命中 / 淘汰等计数通过 stats() 暴露。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class ResultCache:
+    """线程安全的 LRU + TTL 结果缓存，按图谱版本整体失效"""
+
+    def __init__(self,
+                 maxsize: int = 1024,
+                 ttl: float = 600.0,
+                 version: Optional[Callable[[], int]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._version_fn = version
+        self._version: Optional[int] = None
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _current_version(self) -> Optional[int]:
+        # 在锁外读取版本号，避免版本查询阻塞其他读者
+        return self._version_fn() if self._version_fn is not None else None
+
+    def _check_version(self, version: Optional[int]):
+        """版本号变化时清空缓存（需持有锁）"""
+        if version != self._version:
+            if self._data:
+                self.invalidations += 1
+                self._data.clear()
+            self._version = version
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        version = self._current_version()
+        with self._lock:
+            self._check_version(version)
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        version = self._current_version()
+        with self._lock:
+            self._check_version(version)
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        命中则返回缓存值，否则调用 compute() 计算并写入。
+
+        计算期间版本号发生变化（快照被切换）时结果不写入缓存，避免旧快照的结果挂在新版本下。
+        """
+        sentinel = object()
+        version = self._current_version()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            if self._current_version() == version:
+                self.put(key, value)
+        return value
+
+    async def get_or_compute_async(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """get_or_compute 的异步版本：未命中时 await compute()"""
+        sentinel = object()
+        version = self._current_version()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = await compute()
+            if self._current_version() == version:
+                self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "graph_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
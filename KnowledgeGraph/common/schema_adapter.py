@@ -0,0 +1,201 @@
+"""
+图谱数据模型适配
+
+Neo4j 中可能是三种数据模型之一（或迁移期间并存）：
+
+  - Position：(:Skill)-[:RELATES_TO {weight}]->(:Position)
+  - Domain（构建脚本 jobToAbility/build_knowledge_graph.py 写入的结构）：
+    (:领域)-[:包含]->(:一级分类)-[:包含 {weight}]->(:二级分类)
+  - Page（main.py 使用的结构）：(:Page)-[:HAS_CATEGORY]->(:Category)-[:HAS_SKILL {weight}]->(:Skill)
+
+旧实现在每个请求中依次试探 Position、领域 两套查询，旧结构的数据库上每个请求都多一次往返。
+SchemaAdapter 在启动时以及图谱版本号变化（重新导入）后用一条查询检测存在哪些模型，
+请求只发往存在的模型对应的查询；多种模型并存时仍按 Position、Domain、Page 的顺序
+取第一个有结果的模型，与旧实现一致。
+
+stats() 给出检测结果、各操作的查询次数与平均耗时，以及相对旧实现省去的试探查询数
+和据此估算的节省时间（省去的查询数 × 该操作的平均查询耗时）。
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SCHEMA_POSITION = "Position"
+SCHEMA_DOMAIN = "Domain"
+SCHEMA_PAGE = "Page"
+
+# 多种模型并存时的优先顺序
+SCHEMA_ORDER = (SCHEMA_POSITION, SCHEMA_DOMAIN, SCHEMA_PAGE)
+
+# 旧实现逐个试探的模型（不含 Page）
+LEGACY_ORDER = (SCHEMA_POSITION, SCHEMA_DOMAIN)
+
+# 每个标签单独计数（走计数存储，不扫描节点）
+DETECT_QUERY = """
+MATCH (p:Position) WITH count(p) AS positions
+MATCH (d:领域) WITH positions, count(d) AS domains
+MATCH (g:Page) RETURN positions, domains, count(g) AS pages
+"""
+
+_DETECT_FIELDS = {
+    SCHEMA_POSITION: "positions",
+    SCHEMA_DOMAIN: "domains",
+    SCHEMA_PAGE: "pages",
+}
+
+# 每个模型的查询集：操作名 -> Cypher
+QUERY_SETS: Dict[str, Dict[str, str]] = {
+    SCHEMA_POSITION: {
+        "job_names": "MATCH (p:Position) RETURN p.name as name ORDER BY p.name",
+        "job_skills": """
+        MATCH (s:Skill)-[r:RELATES_TO]->(p:Position {name: $job_title})
+        RETURN s.name as skill, r.weight as weight, s.type as category
+        ORDER BY r.weight DESC, s.name
+        """,
+    },
+    SCHEMA_DOMAIN: {
+        "job_names": "MATCH (d:领域) RETURN d.name as name ORDER BY d.name",
+        "job_skills": """
+        MATCH (d:领域 {name: $job_title})-[:包含]->(c:一级分类)
+        MATCH (c)-[r:包含]->(s:二级分类)
+        RETURN s.name as skill, r.weight as weight, c.name as category
+        ORDER BY r.weight DESC, s.name
+        """,
+    },
+    SCHEMA_PAGE: {
+        "job_names": """
+        MATCH (p:Page)
+        WITH coalesce(p.pageName, p.name) AS name
+        WHERE name IS NOT NULL AND name <> ''
+        RETURN DISTINCT name
+        ORDER BY name
+        """,
+        "job_skills": """
+        MATCH (p:Page)-[:HAS_CATEGORY]->(c:Category)-[r:HAS_SKILL]->(s:Skill)
+        WHERE toLower(coalesce(p.pageName, p.name)) = toLower($job_title)
+        RETURN s.name as skill, coalesce(r.weight, 3) as weight, coalesce(c.type, '') as category
+        ORDER BY weight DESC, skill
+        """,
+    },
+}
+
+
+class _OpStats:
+    __slots__ = ("queries", "total_time", "skipped", "saved_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.total_time = 0.0
+        self.skipped = 0
+        self.saved_time = 0.0
+
+    def avg_time(self) -> float:
+        return self.total_time / self.queries if self.queries else 0.0
+
+
+class SchemaAdapter:
+    """检测存在的数据模型，并把各操作直接发往对应的查询集（线程安全）"""
+
+    def __init__(self,
+                 run: Callable[[str, Dict[str, Any]], List[Dict[str, Any]]],
+                 version: Optional[Callable[[], Optional[int]]] = None):
+        self._run = run
+        self._version_fn = version
+        self._lock = threading.Lock()
+        # None 表示尚未检测（或上次检测没有发现任何模型，下次使用时重新检测）
+        self._schemas: Optional[Tuple[str, ...]] = None
+        self._detected_version: Optional[int] = None
+        self.counts: Dict[str, int] = {}
+        self.detected_at: Optional[float] = None
+        self.detections = 0
+        self.last_detect_ms: Optional[float] = None
+        self._ops: Dict[str, _OpStats] = {}
+
+    # ---------------------------------------------------------------- 检测
+
+    def detect(self) -> Tuple[str, ...]:
+        """立即重新检测存在的数据模型，返回按优先顺序排列的模型名"""
+        version = self._version_fn() if self._version_fn is not None else None
+        started = time.perf_counter()
+        rows = self._run(DETECT_QUERY, {})
+        row = rows[0] if rows else {}
+        counts = {schema: int(row.get(field) or 0) for schema, field in _DETECT_FIELDS.items()}
+        schemas = tuple(schema for schema in SCHEMA_ORDER if counts[schema] > 0)
+        with self._lock:
+            self.counts = counts
+            self._schemas = schemas if schemas else None
+            self._detected_version = version
+            self.detected_at = time.time()
+            self.detections += 1
+            self.last_detect_ms = round((time.perf_counter() - started) * 1000, 3)
+        return schemas
+
+    def schemas(self) -> Tuple[str, ...]:
+        """当前存在的数据模型；尚未检测或图谱版本号变化时重新检测"""
+        schemas = self._schemas
+        if schemas is None:
+            return self.detect()
+        if self._version_fn is not None and self._version_fn() != self._detected_version:
+            return self.detect()
+        return schemas
+
+    # ---------------------------------------------------------------- 查询
+
+    def query(self, operation: str, **params) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """
+        在存在的模型上依次执行 operation 对应的查询，返回第一个有结果的 (模型名, 结果行)。
+
+        所有模型都没有结果时返回 (None, [])。
+        """
+        schemas = self.schemas()
+        answered = None
+        rows: List[Dict[str, Any]] = []
+        elapsed = 0.0
+        executed = 0
+        for schema in schemas:
+            started = time.perf_counter()
+            rows = self._run(QUERY_SETS[schema][operation], params)
+            elapsed += time.perf_counter() - started
+            executed += 1
+            if rows:
+                answered = schema
+                break
+
+        # 旧实现会依次试探到 answered 为止（Page 不在其中时试探全部），不存在的模型上的查询即为省去的
+        if answered in LEGACY_ORDER:
+            legacy = LEGACY_ORDER[:LEGACY_ORDER.index(answered) + 1]
+        else:
+            legacy = LEGACY_ORDER
+        skipped = sum(1 for schema in legacy if schema not in schemas)
+
+        with self._lock:
+            stats = self._ops.setdefault(operation, _OpStats())
+            stats.queries += executed
+            stats.total_time += elapsed
+            stats.skipped += skipped
+            stats.saved_time += skipped * stats.avg_time()
+        return answered, rows if answered else []
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "schemas": list(self._schemas or ()),
+                "active": self._schemas[0] if self._schemas else None,
+                "counts": dict(self.counts),
+                "graph_version": self._detected_version,
+                "detected_at": self.detected_at,
+                "detections": self.detections,
+                "last_detect_ms": self.last_detect_ms,
+                "operations": {
+                    name: {
+                        "queries": op.queries,
+                        "avg_query_ms": round(op.avg_time() * 1000, 3),
+                        "skipped_queries": op.skipped,
+                        "estimated_saved_ms": round(op.saved_time * 1000, 3),
+                    }
+                    for name, op in self._ops.items()
+                },
+                "skipped_queries": sum(op.skipped for op in self._ops.values()),
+                "estimated_saved_ms": round(sum(op.saved_time for op in self._ops.values()) * 1000, 3),
+            }
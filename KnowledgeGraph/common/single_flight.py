@@ -0,0 +1,138 @@
+"""
+相同请求的合并执行（single-flight）
+
+前端并发加载同一页面时，/api/jobs、/api/all-skills 以及热门技能组合的匹配查询
+会在同一时刻被重复发往 Neo4j。SingleFlight 以调用方给出的键合并这些请求：
+
+  - 同一键上第一个到达的调用真正执行，执行期间到达的相同调用只等待它的结果；
+  - 执行结束后所有等待者得到同一个结果（或同一个异常），键随即释放，
+    之后的调用重新执行（结果的复用交给 ResultCache，这里只合并「同时」的请求）；
+  - asyncio 版中执行者被取消（如其客户端断开）时，等待者不会收到 CancelledError：
+    其中一个等待者重新执行，其余等待者等待它的结果；
+  - stats() 给出调用次数、实际执行次数与被合并的次数。
+
+SingleFlight 用于多线程服务（Flask），AsyncSingleFlight 用于 asyncio 服务（FastAPI）。
+调用方共享同一个结果对象，不应原地修改。
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Stats:
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+        self.deduplicated = 0
+        self.in_flight = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "deduplicated": self.deduplicated,
+            "dedup_rate": round(self.deduplicated / self.calls, 4) if self.calls else 0.0,
+            "in_flight": self.in_flight,
+        }
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """线程版：同一键上同时只执行一次 fn()"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = _Stats()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._stats.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self._stats.deduplicated += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._stats.executions += 1
+                self._stats.in_flight += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self._stats.in_flight -= 1
+            call.event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._stats.as_dict()
+
+
+class AsyncSingleFlight:
+    """asyncio 版：同一键上同时只执行一次 await fn()（只在事件循环线程中使用）"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._stats = _Stats()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self._stats.calls += 1
+        future = self._calls.get(key)
+        while future is not None:
+            self._stats.deduplicated += 1
+            try:
+                # shield：某个等待者被取消（如客户端断开）时不影响正在执行的调用
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    # 被取消的是等待者自己
+                    raise
+            # 执行者被取消（其请求被断开）：等待者不应随之失败，
+            # 最先醒来的等待者重新执行，其余等待者改为等待它的结果
+            self._stats.deduplicated -= 1
+            future = self._calls.get(key)
+
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        self._stats.executions += 1
+        self._stats.in_flight += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有等待者时也要取走异常，避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+            self._stats.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return self._stats.as_dict()
@@ -4,14 +4,204 @@
 从 Excel 文件中读取岗位及其硬实力 / 软实力权重信息，构建 Neo4j 知识图谱：
   领域(岗位) -> 一级分类(硬实力/软实力) -> 二级分类(具体技能)
 
-本脚本在导入前会**先清空当前 Neo4j 数据库中的所有节点和关系**，
-以保证与前端 / 后端调用的名称和结构保持一致。
+本脚本在导入前会**先清空当前 Neo4j 数据库中除版本号节点 (:GraphVersion) 之外的所有节点和关系**，
+以保证与前端 / 后端调用的名称和结构保持一致。清空按 --clear-batch-size 个节点一批分多个事务执行；
+--clear-owned-only 时只删除本脚本维护的 领域 / 一级分类 / 二级分类 节点，保留库中的其他数据。
+版本号节点始终保留，服务端据此判断图谱是否更新（见下文）。
+
+默认以 UNWIND 批量导入（--batch-size 控制每个事务的行数），
+--batch-size 0 时退回逐行 MERGE 导入。
+
+--incremental 时不清空数据库，而是按领域对比 Excel 与现有图谱，只写入差异
+（新增 / 删除 / 权重变化的技能边），内容哈希未变化的领域直接跳过。
+
+导入前创建 领域 / 一级分类 / 二级分类 的唯一约束与索引（ensure_schema），
+导入后检查其状态、典型查找的执行计划以及索引读取次数（verify_schema）。
+
+重建开始前先把 (:GraphVersion) 节点标记为 building，导入完成后最后一步才递增版本号并清除标记；
+图谱服务只在版本号变化时于后台加载新快照，重建期间继续使用旧快照，不会读到构建了一半的图谱。
+重建或增量同步中途失败时清除标记、不递增版本号，服务端继续使用失败前的快照。
+
+同时把 领域→技能 权重编译为二进制快照产物（--artifact，默认 KnowledgeGraph/knowledge_graph.kgsnap），
+app.py 配置 KG_ARTIFACT_PATH 后直接内存映射该文件，读取路径不再依赖 Neo4j；
+--artifact-only 时只编译产物，不连接 Neo4j。
+main.py 使用的是 Page 模型，--page-artifact 从 Neo4j 中现有的 Page 模型导出它使用的产物（不读取 Excel、不修改图谱）。
+产物头部记录内容哈希与构建时间戳：内容未变化时不重写文件，变化时时间戳递增，服务据此重新加载。
 """
 
+import argparse
+import hashlib
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
 import pandas as pd
 from neo4j import GraphDatabase
 import logging
 
+# 允许以脚本方式（python build_knowledge_graph.py）运行时导入 KnowledgeGraph 下的公共模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from abilityToJob.artifact import (  # noqa: E402
+    SCHEMA_DOMAIN,
+    SCHEMA_PAGE,
+    artifact_schema,
+    artifact_version,
+    content_hash,
+    read_header,
+    save_snapshot,
+)
+from abilityToJob.matcher import PAGE_SNAPSHOT_CYPHER  # noqa: E402
+from abilityToJob.snapshot import SkillJobSnapshot  # noqa: E402
+from common.graph_version import (  # noqa: E402
+    BUMP_VERSION_QUERY,
+    CLEAR_BUILDING_QUERY,
+    GRAPH_VERSION_NAME,
+    MARK_BUILDING_QUERY,
+    READ_VERSION_QUERY,
+)
+
+# 批量导入时每个事务包含的行数
+DEFAULT_BATCH_SIZE = 1000
+
+# 分批清空时每个事务删除的节点数
+DEFAULT_CLEAR_BATCH_SIZE = 10000
+
+# 编译产物的默认路径（与 main.py / app.py 同目录）
+DEFAULT_ARTIFACT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "knowledge_graph.kgsnap"
+)
+
+# 构建脚本负责维护的节点标签
+BUILDER_LABELS = ('领域', '一级分类', '二级分类')
+
+# 分批清空：每次删除至多 $batch_size 个节点，返回本批删除数
+CLEAR_ALL_BATCH_QUERY = """
+MATCH (n)
+WHERE NOT n:GraphVersion
+WITH n LIMIT $batch_size
+DETACH DELETE n
+RETURN count(*) AS deleted
+"""
+
+# 标签不能作为参数传递，按标签格式化后执行
+CLEAR_LABEL_BATCH_QUERY = """
+MATCH (n:`{label}`)
+WITH n LIMIT $batch_size
+DETACH DELETE n
+RETURN count(*) AS deleted
+"""
+
+# 批量导入：$rows 为参数列表，每行对应一个节点（及其关系）
+DOMAIN_BULK_QUERY = """
+UNWIND $rows AS row
+MERGE (d:领域 {name: row.domain})
+SET d.type = '根节点'
+"""
+
+FIRST_LEVEL_BULK_QUERY = """
+UNWIND $rows AS row
+MATCH (d:领域 {name: row.domain})
+MERGE (c:一级分类 {
+    name: row.category_type,
+    domain: row.domain,
+    category_type: row.category_type
+})
+ON CREATE SET c.created_at = timestamp()
+MERGE (d)-[:包含]->(c)
+"""
+
+SECOND_LEVEL_BULK_QUERY = """
+UNWIND $rows AS row
+MATCH (c:一级分类 {
+    name: row.category_type,
+    domain: row.domain,
+    category_type: row.category_type
+})
+MERGE (s:二级分类 {
+    name: row.skill,
+    domain: row.domain,
+    category_type: row.category_type
+})
+ON CREATE SET s.created_at = timestamp()
+MERGE (c)-[r:包含]->(s)
+SET r.weight = row.weight
+"""
+
+# 记录每个领域导入时的内容哈希，增量同步据此跳过未变化的工作表
+DOMAIN_HASH_QUERY = """
+UNWIND $rows AS row
+MATCH (d:领域 {name: row.domain})
+SET d.content_hash = row.hash
+"""
+
+# 增量同步：读取图谱中现有的领域哈希与技能边
+CURRENT_DOMAINS_QUERY = """
+MATCH (d:领域)
+RETURN d.name AS domain, d.content_hash AS hash
+"""
+
+CURRENT_SKILLS_QUERY = """
+MATCH (d:领域)-[:包含]->(c:一级分类)-[r:包含]->(s:二级分类)
+WHERE d.name IN $domains
+RETURN d.name AS domain, c.category_type AS category_type, s.name AS skill, r.weight AS weight
+"""
+
+REMOVE_SKILLS_QUERY = """
+UNWIND $rows AS row
+MATCH (s:二级分类 {name: row.skill, domain: row.domain, category_type: row.category_type})
+DETACH DELETE s
+"""
+
+REMOVE_DOMAINS_QUERY = """
+UNWIND $rows AS row
+MATCH (d:领域 {name: row.domain})
+OPTIONAL MATCH (d)-[:包含]->(c:一级分类)
+OPTIONAL MATCH (c)-[:包含]->(s:二级分类)
+DETACH DELETE s, c, d
+"""
+
+# 权重差异小于该值时视为未变化
+WEIGHT_TOLERANCE = 1e-9
+
+# 图谱模式：唯一约束（自带索引）与普通索引，导入前创建，使 MERGE / 服务端按名称查找走索引
+SCHEMA_STATEMENTS = [
+    ("domain_name_unique",
+     "CREATE CONSTRAINT domain_name_unique IF NOT EXISTS "
+     "FOR (d:领域) REQUIRE d.name IS UNIQUE"),
+    ("first_level_unique",
+     "CREATE CONSTRAINT first_level_unique IF NOT EXISTS "
+     "FOR (c:一级分类) REQUIRE (c.name, c.domain, c.category_type) IS UNIQUE"),
+    ("second_level_unique",
+     "CREATE CONSTRAINT second_level_unique IF NOT EXISTS "
+     "FOR (s:二级分类) REQUIRE (s.name, s.domain, s.category_type) IS UNIQUE"),
+    ("graph_version_name_unique",
+     "CREATE CONSTRAINT graph_version_name_unique IF NOT EXISTS "
+     "FOR (v:GraphVersion) REQUIRE v.name IS UNIQUE"),
+    ("second_level_name",
+     "CREATE INDEX second_level_name IF NOT EXISTS FOR (s:二级分类) ON (s.name)"),
+    ("first_level_domain",
+     "CREATE INDEX first_level_domain IF NOT EXISTS FOR (c:一级分类) ON (c.domain)"),
+]
+
+# 用 EXPLAIN 检查典型查找是否命中索引：(说明, 查询)
+SCHEMA_PROBES = [
+    ("按名称查找领域（app.get_skills / query_job_skills）",
+     "EXPLAIN MATCH (d:领域 {name: $name}) RETURN d"),
+    ("MERGE 一级分类（导入）",
+     "EXPLAIN MATCH (c:一级分类 {name: $name, domain: $name, category_type: $name}) RETURN c"),
+    ("MERGE 二级分类（导入）",
+     "EXPLAIN MATCH (s:二级分类 {name: $name, domain: $name, category_type: $name}) RETURN s"),
+]
+
+SHOW_INDEXES_QUERY = """
+SHOW INDEXES
+YIELD name, state, populationPercent, readCount, lastRead
+RETURN name, state, populationPercent, readCount, lastRead
+"""
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -24,6 +214,8 @@ class Neo4jKnowledgeGraph:
                  password: str = "20041028"):
         """初始化 Neo4j 连接"""
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        # 本进程是否设置了尚未清除的重建标记
+        self._building = False
         logger.info(f"成功连接到Neo4j: {uri}")
 
     def close(self):
@@ -31,11 +223,152 @@ class Neo4jKnowledgeGraph:
         self.driver.close()
         logger.info("数据库连接已关闭")
 
-    def clear_database(self):
-        """清空数据库（用于重新构建整个图谱）"""
+    def clear_database(self,
+                       batch_size: int = DEFAULT_CLEAR_BATCH_SIZE,
+                       labels: Optional[Tuple[str, ...]] = None) -> int:
+        """
+        清空数据库（用于重新构建整个图谱）。
+
+        按 batch_size 个节点一批分多个事务 DETACH DELETE，避免单个大事务耗尽
+        Neo4j 事务内存、长时间阻塞读者；每批输出进度与吞吐量。
+        labels 不为空时只删除这些标签的节点（如构建脚本自己的 BUILDER_LABELS），
+        否则删除除版本号节点 (:GraphVersion) 之外的所有节点。
+
+        Returns
+        -------
+        int
+            删除的节点总数。
+        """
+        if labels:
+            queries = [CLEAR_LABEL_BATCH_QUERY.format(label=label) for label in labels]
+        else:
+            queries = [CLEAR_ALL_BATCH_QUERY]
+
+        total = 0
+        started = time.monotonic()
+        with self.driver.session() as session:
+            for query in queries:
+                while True:
+                    deleted = session.execute_write(
+                        lambda tx: tx.run(query, batch_size=batch_size).single()["deleted"]
+                    )
+                    if not deleted:
+                        break
+                    total += deleted
+                    elapsed = max(time.monotonic() - started, 1e-6)
+                    logger.info(f"已删除 {total} 个节点（{total / elapsed:.0f} 节点/秒）")
+
+        elapsed = time.monotonic() - started
+        scope = "、".join(labels) if labels else "所有"
+        logger.info(f"数据库已清空（{scope}节点与关系已删除）：共 {total} 个节点，耗时 {elapsed:.2f} 秒")
+        return total
+
+    def ensure_schema(self):
+        """创建图谱所需的唯一约束与索引（已存在时跳过），并等待索引上线"""
+        with self.driver.session() as session:
+            for name, statement in SCHEMA_STATEMENTS:
+                try:
+                    session.run(statement).consume()
+                except Exception as e:
+                    # 已有重复数据时唯一约束会创建失败，不影响导入本身
+                    logger.warning(f"创建约束/索引 {name} 失败: {e}")
+            session.run("CALL db.awaitIndexes(300)").consume()
+        logger.info(f"图谱模式已就绪：{len(SCHEMA_STATEMENTS)} 个约束 / 索引")
+
+    def verify_schema(self) -> Dict[str, Any]:
+        """
+        导入后检查模式：约束 / 索引是否存在且已上线，典型查找的执行计划是否走索引，
+        以及各索引的读取次数（readCount），用于确认索引确实被使用。
+
+        missing 为缺失或未上线的约束 / 索引，unindexed 为执行计划中没有索引算子
+        （如 NodeByLabelScan 全标签扫描）的查找。
+        """
+        expected = {name for name, _ in SCHEMA_STATEMENTS}
+        report: Dict[str, Any] = {"indexes": {}, "missing": [], "probes": {}, "unindexed": []}
+
         with self.driver.session() as session:
-            session.run("MATCH (n) DETACH DELETE n")
-        logger.info("数据库已清空（所有节点与关系已删除）")
+            for r in session.run(SHOW_INDEXES_QUERY).data():
+                report["indexes"][r["name"]] = {
+                    "state": r["state"],
+                    "population": r["populationPercent"],
+                    "read_count": r["readCount"],
+                    "last_read": str(r["lastRead"]) if r["lastRead"] is not None else None,
+                }
+            # 唯一约束对应的索引与约束同名
+            report["missing"] = sorted(
+                name for name in expected
+                if report["indexes"].get(name, {}).get("state") != "ONLINE"
+            )
+
+            for description, probe in SCHEMA_PROBES:
+                plan = session.run(probe, name="").consume().plan
+                operators = _plan_operators(plan)
+                report["probes"][description] = {
+                    "uses_index": any("Index" in op for op in operators),
+                    "operators": operators,
+                }
+                if not report["probes"][description]["uses_index"]:
+                    report["unindexed"].append(description)
+
+        for name in sorted(expected):
+            info = report["indexes"].get(name)
+            if info:
+                logger.info(f"索引 {name}: {info['state']}, 读取次数 {info['read_count']}, 最近读取 {info['last_read']}")
+        for description, probe in report["probes"].items():
+            logger.info(f"{description}: {'走索引' if probe['uses_index'] else '全标签扫描'} {probe['operators']}")
+        if report["missing"]:
+            logger.warning(f"以下约束 / 索引缺失或未上线: {report['missing']}")
+        if report["unindexed"]:
+            logger.warning(f"以下查找未走索引（全标签扫描），请检查约束 / 索引: {report['unindexed']}")
+        return report
+
+    def mark_building(self):
+        """标记图谱正在重建：服务端在版本号递增前继续使用旧快照"""
+        with self.driver.session() as session:
+            session.run(MARK_BUILDING_QUERY, name=GRAPH_VERSION_NAME).consume()
+        self._building = True
+        logger.info("已标记图谱进入重建状态")
+
+    def clear_building(self):
+        """
+        重建失败时清除重建标记，版本号保持不变。
+
+        图谱可能停留在写入了一半的状态；已在运行的服务继续使用失败前的快照，
+        重新执行构建脚本成功后递增版本号才会切换。
+        """
+        with self.driver.session() as session:
+            session.run(CLEAR_BUILDING_QUERY, name=GRAPH_VERSION_NAME).consume()
+        self._building = False
+        logger.warning("重建未完成，已清除图谱重建标记（版本号未递增）")
+
+    def bump_graph_version(self) -> int:
+        """递增图谱版本号，通知各服务进程刷新快照与缓存"""
+        with self.driver.session() as session:
+            record = session.run(BUMP_VERSION_QUERY, name=GRAPH_VERSION_NAME).single()
+        self._building = False
+        version = record["version"] if record else 0
+        logger.info(f"图谱版本号已更新为: {version}")
+        return version
+
+    def current_graph_version(self) -> int:
+        """读取当前图谱版本号（尚未导入过时为 0）"""
+        with self.driver.session() as session:
+            record = session.run(READ_VERSION_QUERY, name=GRAPH_VERSION_NAME).single()
+        return (record["version"] or 0) if record else 0
+
+    def export_page_artifact(self, path: str) -> Dict[str, Any]:
+        """
+        从图谱中现有的 Page 模型导出 main.py 使用的编译产物（只读，不修改图谱）。
+
+        同一岗位下的同名技能只保留一条，权重取最大值（与 main.py 从 Neo4j 加载快照时一致）。
+        """
+        with self.driver.session() as session:
+            records = session.run(PAGE_SNAPSHOT_CYPHER).data()
+        snapshot = SkillJobSnapshot.from_edges(
+            ((r.get("job_name"), r.get("skill"), r.get("weight"), r.get("category")) for r in records),
+            dedupe=True,
+        )
+        return write_artifact(snapshot, path, SCHEMA_PAGE, self.current_graph_version(), source="neo4j")
 
     def create_domain_node(self, domain_name: str):
         """创建领域根节点（岗位大类）"""
@@ -101,77 +434,80 @@ class Neo4jKnowledgeGraph:
                 weight=float(weight)
             )
 
-    def process_excel_file(self, excel_path: str):
+    def _run_batched(self, query: str, rows: List[Dict[str, Any]], batch_size: int) -> int:
+        """把 rows 按 batch_size 切块，每块作为 $rows 参数在一个写事务中 UNWIND 执行"""
+        batches = 0
+        with self.driver.session() as session:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                session.execute_write(lambda tx: tx.run(query, rows=batch).consume())
+                batches += 1
+        return batches
+
+    def bulk_import(self,
+                    skills_by_domain: Dict[str, List[Tuple[str, str, float]]],
+                    batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        批量导入：整个工作簿的领域 / 一级分类 / 二级分类分别以参数列表 UNWIND，
+        每 batch_size 行一个事务，替代逐行 MERGE 的数千次往返。
+        """
+        domain_rows = [{"domain": domain} for domain in skills_by_domain]
+        category_rows = [
+            {"domain": domain, "category_type": category_type}
+            for domain in skills_by_domain
+            for category_type in ('硬实力', '软实力')
+        ]
+        skill_rows = [
+            {"domain": domain, "category_type": category_type, "skill": skill, "weight": float(weight)}
+            for domain, skills in skills_by_domain.items()
+            for category_type, skill, weight in skills
+        ]
+
+        batches = self._run_batched(DOMAIN_BULK_QUERY, domain_rows, batch_size)
+        batches += self._run_batched(FIRST_LEVEL_BULK_QUERY, category_rows, batch_size)
+        batches += self._run_batched(SECOND_LEVEL_BULK_QUERY, skill_rows, batch_size)
+        batches += self._run_batched(DOMAIN_HASH_QUERY, _hash_rows(skills_by_domain), batch_size)
+        logger.info(
+            f"批量导入完成：{len(domain_rows)} 个领域, {len(skill_rows)} 个技能, "
+            f"共 {batches} 个事务（batch_size={batch_size}）"
+        )
+
+    def import_row_by_row(self, skills_by_domain: Dict[str, List[Tuple[str, str, float]]]):
+        """逐行导入（每个节点一次 MERGE），用于排查批量导入问题"""
+        for domain, skills in skills_by_domain.items():
+            # 创建领域根节点及硬实力 / 软实力一级分类节点
+            self.create_domain_node(domain)
+            self.create_first_level_node(domain, '硬实力', '硬实力')
+            self.create_first_level_node(domain, '软实力', '软实力')
+
+            for category_type, skill_name, weight in skills:
+                self.create_second_level_node(domain, category_type, skill_name, weight)
+
+            hard_count = sum(1 for c, _, _ in skills if c == '硬实力')
+            logger.info(
+                f"领域 '{domain}' 处理完成！硬实力: {hard_count} 个, 软实力: {len(skills) - hard_count} 个"
+            )
+
+        self._run_batched(DOMAIN_HASH_QUERY, _hash_rows(skills_by_domain), DEFAULT_BATCH_SIZE)
+
+    def process_excel_file(self,
+                           excel_path: str,
+                           batch_size: Optional[int] = DEFAULT_BATCH_SIZE,
+                           skills_by_domain: Optional[Dict[str, List[Tuple[str, str, float]]]] = None):
         """
         处理 Excel 文件，读取所有工作表并构建知识图谱。
 
-        文件结构约定（与原项目保持一致）：
-          - 每个工作表代表一个岗位领域（如「数据分析师」「Java开发」等）
-          - 列顺序：
-              0: 硬实力名称
-              1: 硬实力频次（可忽略）
-              2: 硬实力权重
-              3: 软实力名称
-              4: 软实力频次（可忽略）
-              5: 软实力权重
+        batch_size 为正数时使用 UNWIND 批量导入，为 None / 0 时逐行导入。
+        文件结构约定见 read_excel_skills；已读取过的 skills_by_domain 可直接传入，避免重复解析。
         """
         try:
-            excel_file = pd.ExcelFile(excel_path)
-            sheet_names = excel_file.sheet_names
-            logger.info(f"发现 {len(sheet_names)} 个工作表: {sheet_names}")
-
-            for sheet_name in sheet_names:
-                logger.info("\n" + "=" * 80)
-                logger.info(f"开始处理领域: {sheet_name}")
-                logger.info("=" * 80)
-
-                df = pd.read_excel(excel_path, sheet_name=sheet_name)
-                logger.info(f"工作表 '{sheet_name}' 的形状: {df.shape}")
-                logger.info(f"列名: {df.columns.tolist()}")
-
-                # 创建领域根节点
-                self.create_domain_node(sheet_name)
-
-                # 按原有约定直接取列
-                hard_skills_col = df.columns[0]   # 硬实力名称
-                hard_weights_col = df.columns[2]  # 硬实力权重
-                soft_skills_col = df.columns[3]   # 软实力名称
-                soft_weights_col = df.columns[5]  # 软实力权重
-
-                logger.info(f"硬实力列: {hard_skills_col}, 权重列: {hard_weights_col}")
-                logger.info(f"软实力列: {soft_skills_col}, 权重列: {soft_weights_col}")
-
-                # 创建硬实力一级分类节点
-                self.create_first_level_node(sheet_name, '硬实力', '硬实力')
-
-                hard_count = 0
-                hard_df = df[[hard_skills_col, hard_weights_col]].dropna(subset=[hard_skills_col])
-                for _, row in hard_df.iterrows():
-                    skill_name = str(row[hard_skills_col]).strip()
-                    weight = row[hard_weights_col]
-                    if skill_name and skill_name not in ('nan', 'None') and pd.notna(weight):
-                        self.create_second_level_node(sheet_name, '硬实力', skill_name, weight)
-                        hard_count += 1
-                        logger.info(f"  [{hard_count}] 硬实力: {skill_name} (权重: {float(weight):.6f})")
-
-                logger.info(f"硬实力节点创建完成，共 {hard_count} 个")
-
-                # 创建软实力一级分类节点
-                self.create_first_level_node(sheet_name, '软实力', '软实力')
-
-                soft_count = 0
-                soft_df = df[[soft_skills_col, soft_weights_col]].dropna(subset=[soft_skills_col])
-                for _, row in soft_df.iterrows():
-                    skill_name = str(row[soft_skills_col]).strip()
-                    weight = row[soft_weights_col]
-                    if skill_name and skill_name not in ('nan', 'None') and pd.notna(weight):
-                        self.create_second_level_node(sheet_name, '软实力', skill_name, weight)
-                        soft_count += 1
-                        logger.info(f"  [{soft_count}] 软实力: {skill_name} (权重: {float(weight):.6f})")
-
-                logger.info(
-                    f"领域 '{sheet_name}' 处理完成！硬实力: {hard_count} 个, 软实力: {soft_count} 个"
-                )
+            if skills_by_domain is None:
+                skills_by_domain = read_excel_skills(excel_path)
+
+            if batch_size:
+                self.bulk_import(skills_by_domain, batch_size)
+            else:
+                self.import_row_by_row(skills_by_domain)
 
             logger.info("\n" + "=" * 80)
             logger.info("所有岗位→能力知识图谱构建完成！")
@@ -181,30 +517,383 @@ class Neo4jKnowledgeGraph:
             logger.error(f"处理Excel文件时出错: {str(e)}", exc_info=True)
             raise
 
+    def sync_excel_file(self,
+                        excel_path: str,
+                        batch_size: int = DEFAULT_BATCH_SIZE,
+                        skills_by_domain: Optional[Dict[str, List[Tuple[str, str, float]]]] = None) -> bool:
+        """
+        增量同步：对比 Excel 与当前图谱，只写入新增 / 删除 / 权重变化的技能边。
 
-def main():
-    """入口：清空数据库并按照 Excel 重新导入岗位→能力图谱"""
-    excel_path = "职位技能权重计算结果_去重后.xlsx"
+        - 工作表内容哈希与领域节点上记录的 content_hash 相同的领域直接跳过；
+        - 图谱中存在而 Excel 中已删除的领域整体删除；
+        - 其余领域按技能逐条比较后应用差异，不会清空正在被服务读取的图谱。
 
-    kg = Neo4jKnowledgeGraph()
+        Returns
+        -------
+        bool
+            图谱是否发生了变化。
+        """
+        if skills_by_domain is None:
+            skills_by_domain = read_excel_skills(excel_path)
+
+        with self.driver.session() as session:
+            current_hashes = {
+                r["domain"]: r["hash"] for r in session.run(CURRENT_DOMAINS_QUERY).data()
+            }
+
+        target_hashes = {domain: domain_content_hash(skills) for domain, skills in skills_by_domain.items()}
+        removed_domains = [d for d in current_hashes if d not in skills_by_domain]
+        changed_domains = [d for d, h in target_hashes.items() if current_hashes.get(d) != h]
+        logger.info(
+            f"增量同步：{len(skills_by_domain)} 个领域中 {len(changed_domains)} 个有变化，"
+            f"{len(skills_by_domain) - len(changed_domains)} 个未变化（跳过），"
+            f"{len(removed_domains)} 个已从 Excel 中删除"
+        )
+        if not changed_domains and not removed_domains:
+            return False
+
+        # 开始写入差异前标记重建状态，同步完成后由 bump_graph_version 清除，失败时由 clear_building 清除
+        self.mark_building()
+        try:
+            upserts, removals = self._apply_domain_diff(
+                skills_by_domain, changed_domains, removed_domains, batch_size
+            )
+        except Exception:
+            self._clear_building_quietly()
+            raise
+
+        logger.info(
+            f"增量同步完成：写入 {len(upserts)} 条技能边，删除 {len(removals)} 条技能边，"
+            f"删除 {len(removed_domains)} 个领域"
+        )
+        return True
+
+    def _apply_domain_diff(self,
+                           skills_by_domain: Dict[str, List[Tuple[str, str, float]]],
+                           changed_domains: List[str],
+                           removed_domains: List[str],
+                           batch_size: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """读取有变化领域的现有技能边并写入差异，返回 (写入的技能边, 删除的技能边)"""
+        # 读取有变化的领域在图谱中现有的技能边
+        current_skills: Dict[str, Dict[Tuple[str, str], float]] = {d: {} for d in changed_domains}
+        if changed_domains:
+            with self.driver.session() as session:
+                for r in session.run(CURRENT_SKILLS_QUERY, domains=changed_domains).data():
+                    current_skills[r["domain"]][(r["category_type"], r["skill"])] = r["weight"]
+
+        upserts: List[Dict[str, Any]] = []
+        removals: List[Dict[str, Any]] = []
+        for domain in changed_domains:
+            diff = diff_domain_skills(current_skills[domain], skills_by_domain[domain])
+            for category_type, skill, weight in diff["added"] + diff["reweighted"]:
+                upserts.append({"domain": domain, "category_type": category_type,
+                                "skill": skill, "weight": weight})
+            for category_type, skill, _ in diff["removed"]:
+                removals.append({"domain": domain, "category_type": category_type, "skill": skill})
+            logger.info(
+                f"领域 '{domain}': 新增 {len(diff['added'])}, 删除 {len(diff['removed'])}, "
+                f"权重变化 {len(diff['reweighted'])}"
+            )
 
+        # 领域 / 一级分类节点用 MERGE 保证存在，再应用技能边差异
+        self._run_batched(REMOVE_DOMAINS_QUERY, [{"domain": d} for d in removed_domains], batch_size)
+        self._run_batched(DOMAIN_BULK_QUERY, [{"domain": d} for d in changed_domains], batch_size)
+        self._run_batched(
+            FIRST_LEVEL_BULK_QUERY,
+            [{"domain": d, "category_type": c} for d in changed_domains for c in ('硬实力', '软实力')],
+            batch_size,
+        )
+        self._run_batched(REMOVE_SKILLS_QUERY, removals, batch_size)
+        self._run_batched(SECOND_LEVEL_BULK_QUERY, upserts, batch_size)
+        self._run_batched(
+            DOMAIN_HASH_QUERY, _hash_rows({d: skills_by_domain[d] for d in changed_domains}), batch_size
+        )
+        return upserts, removals
+
+    def _clear_building_quietly(self):
+        """失败路径上清除本进程设置的重建标记；清除本身失败时只记录日志，不掩盖原始异常"""
+        if not getattr(self, "_building", False):
+            return
+        try:
+            self.clear_building()
+        except Exception as e:
+            logger.error(f"清除图谱重建标记失败: {str(e)}")
+
+
+def compile_artifact(skills_by_domain: Dict[str, List[Tuple[str, str, float]]],
+                     path: str,
+                     graph_version: int = 0,
+                     source: str = "") -> Dict[str, Any]:
+    """
+    把 领域→技能 权重编译为快照产物（与图谱中的 领域-[:包含]->一级分类-[:包含]->二级分类 一致：
+    同一领域下同一分类的同名技能以最后一次为准）。
+
+    编译时即去重（同一领域下规范化后同名的技能只保留一条，权重取最大值），
+    服务端加载产物后直接使用内存映射的数组，不需要再去重复制到堆上。
+
+    Returns
+    -------
+    dict
+        产物头部。
+    """
+    snapshot = SkillJobSnapshot.from_edges((
+        (domain, skill, weight, category_type)
+        for domain, skills in skills_by_domain.items()
+        for (category_type, skill), weight in _skill_map(skills).items()
+    ), dedupe=True)
+    return write_artifact(snapshot, path, SCHEMA_DOMAIN, graph_version, source)
+
+
+def write_artifact(snapshot: SkillJobSnapshot,
+                   path: str,
+                   schema: str,
+                   graph_version: int = 0,
+                   source: str = "") -> Dict[str, Any]:
+    """
+    把快照写为编译产物，meta 记录数据模型、图谱版本号与构建时间戳（build_stamp）。
+
+    已有产物的数据模型、图谱版本号与内容哈希都相同时不重写文件（服务不会因此重新加载），
+    直接返回已有产物的头部；否则时间戳严格大于已有产物的时间戳。
+
+    Returns
+    -------
+    dict
+        产物头部。
+    """
     try:
-        # 1. 清空原有图数据库内容
-        kg.clear_database()
+        existing = read_header(path)
+    except (OSError, ValueError):
+        existing = None
+    if (existing is not None
+            and existing.get("content_hash") == content_hash(snapshot)
+            and artifact_schema(existing) == schema
+            and existing["meta"].get("graph_version") == graph_version):
+        logger.info(f"快照产物 {path} 内容未变化，保留原文件")
+        return existing
+
+    stamp = time.time_ns()
+    if existing is not None:
+        stamp = max(stamp, artifact_version(existing) + 1)
+    header = save_snapshot(snapshot, path, meta={
+        "schema": schema,
+        "graph_version": graph_version,
+        "build_stamp": stamp,
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "source": os.path.basename(source),
+    })
+    logger.info(
+        f"快照产物已写入 {path}（{schema} 模型，图谱版本 {graph_version}）: {header['num_jobs']} 个岗位, "
+        f"{header['num_skills']} 个技能, {header['nnz']} 条边"
+    )
+    return header
+
+
+def _plan_operators(plan: Optional[Dict[str, Any]]) -> List[str]:
+    """按先序遍历返回执行计划中的所有算子名称"""
+    if not plan:
+        return []
+    operators = [plan.get("operatorType", "")]
+    for child in plan.get("children", []):
+        operators.extend(_plan_operators(child))
+    return operators
+
+
+def domain_content_hash(skills: List[Tuple[str, str, float]]) -> str:
+    """领域内容哈希：与技能顺序无关，技能名称、类别或权重变化都会改变哈希"""
+    digest = hashlib.sha1()
+    for (category_type, skill), weight in sorted(_skill_map(skills).items()):
+        digest.update(f"{category_type}\t{skill}\t{weight!r}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _skill_map(skills: List[Tuple[str, str, float]]) -> Dict[Tuple[str, str], float]:
+    """(一级分类, 技能名称) -> 权重；同名技能重复出现时以最后一次为准（与逐条 MERGE + SET 一致）"""
+    return {(category_type, skill): float(weight) for category_type, skill, weight in skills}
+
+
+def _hash_rows(skills_by_domain: Dict[str, List[Tuple[str, str, float]]]) -> List[Dict[str, str]]:
+    return [
+        {"domain": domain, "hash": domain_content_hash(skills)}
+        for domain, skills in skills_by_domain.items()
+    ]
+
+
+def diff_domain_skills(current: Dict[Tuple[str, str], float],
+                       target_skills: List[Tuple[str, str, float]]) -> Dict[str, List[Tuple[str, str, float]]]:
+    """
+    比较单个领域图谱中现有的技能边与 Excel 中的目标技能。
+
+    Returns
+    -------
+    dict
+        added / removed / reweighted 三个列表，元素为 (一级分类, 技能名称, 权重)；
+        removed 中的权重为图谱中的旧权重。
+    """
+    target = _skill_map(target_skills)
+    added, reweighted = [], []
+    for (category_type, skill), weight in target.items():
+        old = current.get((category_type, skill))
+        if old is None:
+            added.append((category_type, skill, weight))
+        elif abs(float(old) - weight) > WEIGHT_TOLERANCE:
+            reweighted.append((category_type, skill, weight))
+    removed = [
+        (category_type, skill, weight)
+        for (category_type, skill), weight in current.items()
+        if (category_type, skill) not in target
+    ]
+    return {"added": added, "removed": removed, "reweighted": reweighted}
+
+
+def _extract_skills(df: pd.DataFrame, name_idx: int, weight_idx: int, category_type: str
+                    ) -> List[Tuple[str, str, float]]:
+    """向量化地取出一组 名称 / 权重 列，过滤空名称与无效权重"""
+    names = df.iloc[:, name_idx]
+    weights = pd.to_numeric(df.iloc[:, weight_idx], errors='coerce')
+    stripped = names.astype(str).str.strip()
+    mask = names.notna() & weights.notna() & (stripped != '') & ~stripped.isin(['nan', 'None'])
+    return [
+        (category_type, name, weight)
+        for name, weight in zip(stripped[mask].tolist(), weights[mask].astype(float).tolist())
+    ]
+
+
+def read_excel_skills(excel_path: str) -> Dict[str, List[Tuple[str, str, float]]]:
+    """
+    读取 Excel 文件的所有工作表，返回 领域 -> [(一级分类, 技能名称, 权重), ...]。
+
+    所有工作表在一次解析中读出（sheet_name=None），名称 / 权重列按列向量化提取，
+    每个工作表只输出一条汇总日志。
+
+    文件结构约定（与原项目保持一致）：
+      - 每个工作表代表一个岗位领域（如「数据分析师」「Java开发」等）
+      - 列顺序：
+          0: 硬实力名称
+          1: 硬实力频次（可忽略）
+          2: 硬实力权重
+          3: 软实力名称
+          4: 软实力频次（可忽略）
+          5: 软实力权重
+    """
+    sheets = pd.read_excel(excel_path, sheet_name=None)
+    logger.info(f"发现 {len(sheets)} 个工作表: {list(sheets)}")
+
+    skills_by_domain: Dict[str, List[Tuple[str, str, float]]] = {}
+    for sheet_name, df in sheets.items():
+        hard = _extract_skills(df, 0, 2, '硬实力')
+        soft = _extract_skills(df, 3, 5, '软实力')
+        skills_by_domain[sheet_name] = hard + soft
+        logger.info(
+            f"工作表 '{sheet_name}': 形状 {df.shape}, 硬实力 {len(hard)} 个, 软实力 {len(soft)} 个"
+        )
+
+    return skills_by_domain
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="岗位→能力知识图谱构建")
+    parser.add_argument("--excel", default="职位技能权重计算结果_去重后.xlsx", help="Excel 文件路径")
+    parser.add_argument(
+        "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+        help=f"UNWIND 批量导入时每个事务的行数（默认 {DEFAULT_BATCH_SIZE}），0 表示逐行导入",
+    )
+    parser.add_argument(
+        "--clear-batch-size", type=int, default=DEFAULT_CLEAR_BATCH_SIZE,
+        help=f"清空数据库时每个事务删除的节点数（默认 {DEFAULT_CLEAR_BATCH_SIZE}）",
+    )
+    parser.add_argument(
+        "--clear-owned-only", action="store_true",
+        help="只清空构建脚本维护的 领域 / 一级分类 / 二级分类 节点，保留其他数据",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="增量同步：不清空数据库，只写入与当前图谱的差异（跳过内容未变化的领域）",
+    )
+    parser.add_argument(
+        "--artifact", default=DEFAULT_ARTIFACT_PATH,
+        help="编译产物输出路径（默认 KnowledgeGraph/knowledge_graph.kgsnap），空字符串表示不输出",
+    )
+    parser.add_argument(
+        "--artifact-only", action="store_true",
+        help="只从 Excel 编译快照产物，不连接 Neo4j（图谱版本号记为 0，服务按构建时间戳发现产物更新）",
+    )
+    parser.add_argument(
+        "--page-artifact", default="",
+        help="从 Neo4j 中现有的 Page 模型导出 main.py 使用的编译产物到该路径后退出（不读取 Excel、不修改图谱）",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """入口：清空数据库并按照 Excel 重新导入岗位→能力图谱（--incremental 时增量同步）"""
+    args = parse_args(argv)
+    excel_path = args.excel
+
+    if args.artifact_only:
+        compile_artifact(read_excel_skills(excel_path), args.artifact or DEFAULT_ARTIFACT_PATH, source=excel_path)
+        return
+
+    if args.page_artifact:
+        kg = Neo4jKnowledgeGraph()
+        try:
+            kg.export_page_artifact(args.page_artifact)
+        finally:
+            kg.close()
+        return
+
+    kg = Neo4jKnowledgeGraph()
 
-        # 2. 从 Excel 重新构建岗位→能力知识图谱
-        kg.process_excel_file(excel_path)
+    try:
+        # Excel 只解析一次，导入图谱与编译产物共用
+        skills_by_domain = read_excel_skills(excel_path)
+
+        if args.incremental:
+            # 增量同步：只有图谱发生变化时才递增版本号
+            kg.ensure_schema()
+            if kg.sync_excel_file(excel_path, batch_size=args.batch_size or DEFAULT_BATCH_SIZE,
+                                  skills_by_domain=skills_by_domain):
+                version = kg.bump_graph_version()
+            else:
+                version = kg.current_graph_version()
+            kg.verify_schema()
+            if args.artifact:
+                compile_artifact(skills_by_domain, args.artifact, version, source=excel_path)
+            logger.info("岗位→能力知识图谱增量同步完成！")
+            return
+
+        # 1. 标记重建状态，再清空原有图数据库内容（分批删除）
+        kg.mark_building()
+        kg.clear_database(
+            batch_size=args.clear_batch_size,
+            labels=BUILDER_LABELS if args.clear_owned_only else None,
+        )
+
+        # 2. 创建约束与索引，使导入时的 MERGE 走索引
+        kg.ensure_schema()
+
+        # 3. 从 Excel 重新构建岗位→能力知识图谱
+        kg.process_excel_file(excel_path, batch_size=args.batch_size, skills_by_domain=skills_by_domain)
+
+        # 4. 检查约束 / 索引状态与索引使用情况
+        kg.verify_schema()
+
+        # 5. 递增图谱版本号，使服务端缓存失效
+        version = kg.bump_graph_version()
+
+        # 6. 编译快照产物（头部记录同一版本号，服务端据此判断产物是否更新）
+        if args.artifact:
+            compile_artifact(skills_by_domain, args.artifact, version, source=excel_path)
 
         logger.info("岗位→能力知识图谱构建成功完成！")
 
     except Exception as e:
         logger.error(f"程序执行出错: {str(e)}", exc_info=True)
+        # 本进程已标记重建（全量重建中途失败，或增量同步写入差异后递增版本号失败）时清除标记，
+        # 否则服务端会一直认为图谱正在重建
+        kg._clear_building_quietly()
     finally:
         kg.close()
 
 
 if __name__ == "__main__":
     main()
-
-
-
@@ -1,13 +1,37 @@
+import asyncio
+import contextlib
+import json
 import os
-import uuid
+import time
 from typing import List, Optional, Dict, Any
 
-from fastapi import FastAPI, HTTPException
+import numpy as np
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase, GraphDatabase
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 from fastapi import Body
 
+from abilityToJob import artifact
+from abilityToJob.matcher import PAGE_SNAPSHOT_CYPHER
+from abilityToJob.ranking import top_k_candidates
+from abilityToJob.shared_snapshot import SharedSnapshotStore
+from abilityToJob.snapshot import (
+    CATEGORY_HARD,
+    CATEGORY_SOFT,
+    SkillJobSnapshot,
+    SnapshotMatch,
+    normalize_skill_name,
+)
+from common.graph_version import GRAPH_VERSION_NAME, READ_VERSION_QUERY, GraphVersionTracker
+from common.hot_reload import SnapshotReloader
+from common.http_cache import JSON_MEDIA_TYPE, CatalogCache
+from common.neo4j_access import AsyncGraphAccess, GraphAccess, Neo4jSettings
+from common.result_cache import ResultCache
+from common.single_flight import AsyncSingleFlight
+
 
 # ==================== 加载 Backend/.env 配置 ====================
 
@@ -34,17 +58,89 @@ KG_NEO4J_PASSWORD = os.getenv("KG_NEO4J_PASSWORD") or os.getenv("NEO4J_PASSWORD"
 if not KG_NEO4J_PASSWORD:
     print("⚠️  KG_NEO4J_PASSWORD 未设置，将无法连接图数据库，请在 Backend/.env 或环境变量中配置。")
 
-
-driver = GraphDatabase.driver(
-    KG_NEO4J_URI,
-    auth=(KG_NEO4J_USER, KG_NEO4J_PASSWORD) if KG_NEO4J_PASSWORD else None,
-)
+# 技能→岗位结果缓存：最多条目数、过期时间（秒）；图谱版本号的检查间隔（秒）
+KG_CACHE_SIZE = int(os.getenv("KG_CACHE_SIZE", "2048"))
+KG_CACHE_TTL = float(os.getenv("KG_CACHE_TTL", "600"))
+KG_VERSION_CHECK_INTERVAL = float(os.getenv("KG_VERSION_CHECK_INTERVAL", "5"))
+
+# 图谱可视化：按 Page 缓存的子图数量；概要模式（detail=summary）下每个类别默认展示的技能数
+KG_VIZ_CACHE_SIZE = int(os.getenv("KG_VIZ_CACHE_SIZE", "256"))
+KG_VIZ_TOP_N = int(os.getenv("KG_VIZ_TOP_N", "10"))
+
+# 自动补全（/api/suggest/*）单次返回的最大条数
+KG_SUGGEST_MAX_LIMIT = int(os.getenv("KG_SUGGEST_MAX_LIMIT", "50"))
+
+# 相似岗位：快照加载时为每个岗位预先计算的近邻数
+KG_SIMILAR_TOP_N = int(os.getenv("KG_SIMILAR_TOP_N", "20"))
+
+# Page 模型的编译产物（.kgsnap，头部 meta.schema 为 "Page"）路径；配置后岗位 / 技能的读取直接使用内存映射的产物，
+# 技能→岗位匹配、岗位技能查询、岗位与技能列表都不再访问 Neo4j。
+# 该产物由构建脚本的 --page-artifact 从 Neo4j 中的 Page 模型导出；构建脚本默认输出的是 领域 模型的产物
+# （供 app.py 使用），与 /api/pages、图谱可视化使用的 Page 模型不一致，配置这类产物时启动即报错
+KG_ARTIFACT_PATH = os.getenv("KG_ARTIFACT_PATH") or None
+
+# 多 worker 共享快照的目录（建议 tmpfs，如 /dev/shm/kg_snapshot）；配置后各 worker 内存映射同一份快照，
+# 图谱版本变化时只由一个 worker 重建并发布新一代，其余 worker 直接切换
+KG_SHARED_SNAPSHOT_DIR = os.getenv("KG_SHARED_SNAPSHOT_DIR") or None
+
+# 技能→岗位打分方式：
+# - snapshot（默认）：在进程内快照上向量化打分，不访问 Neo4j
+# - cypher：在 Cypher 查询中完成打分与排序，只传回前 top_k 行。启动时不预加载快照，也不预先计算
+#   相似岗位表；自动补全、相似岗位、批量匹配、岗位列表等仍使用快照的接口在首次请求时按需加载，
+#   加载后随图谱版本号后台重建
+KG_SCORING_MODE = os.getenv("KG_SCORING_MODE", "snapshot").strip().lower()
+
+# 管理接口（/api/admin/*）的访问令牌，通过请求头 X-Admin-Token 传入；未设置时不校验
+KG_ADMIN_TOKEN = os.getenv("KG_ADMIN_TOKEN") or None
+
+# 连接池大小、获取连接超时、重试时间、fetch_size、查询超时等（KG_NEO4J_POOL_SIZE 等环境变量）
+KG_NEO4J_SETTINGS = Neo4jSettings.from_env()
+
+# 每个 worker 同时执行的 Neo4j 查询数上限（默认等于连接池大小），超出的请求排队等待
+KG_MAX_CONCURRENT_QUERIES = int(os.getenv("KG_MAX_CONCURRENT_QUERIES", str(KG_NEO4J_SETTINGS.pool_size)))
+
+
+# Neo4j 驱动由 lifespan 创建与关闭：
+# - async_driver / async_db：请求处理路径上的查询，异步执行，不占用线程池
+# - driver / db：后台线程中的快照重建（同步）
+driver = None
+async_driver = None
+db: Optional[GraphAccess] = None
+async_db: Optional[AsyncGraphAccess] = None
+_query_slots: Optional[asyncio.Semaphore] = None
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """创建 / 关闭 Neo4j 驱动，启动时预热，运行期间在后台定期读取图谱版本号"""
+    global driver, async_driver, db, async_db, _query_slots
+    if KG_ARTIFACT_PATH:
+        # 产物的数据模型与服务不一致时直接启动失败，而不是在请求中报错
+        artifact.read_header(KG_ARTIFACT_PATH, schema=artifact.SCHEMA_PAGE)
+    auth = (KG_NEO4J_USER, KG_NEO4J_PASSWORD) if KG_NEO4J_PASSWORD else None
+    driver = GraphDatabase.driver(KG_NEO4J_URI, auth=auth, **KG_NEO4J_SETTINGS.driver_kwargs())
+    async_driver = AsyncGraphDatabase.driver(KG_NEO4J_URI, auth=auth, **KG_NEO4J_SETTINGS.driver_kwargs())
+    db = GraphAccess(driver, KG_NEO4J_SETTINGS)
+    async_db = AsyncGraphAccess(async_driver, KG_NEO4J_SETTINGS)
+    _query_slots = asyncio.Semaphore(KG_MAX_CONCURRENT_QUERIES)
+
+    await warm_up()
+    watcher = asyncio.create_task(watch_graph_version())
+    try:
+        yield
+    finally:
+        watcher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await watcher
+        await async_driver.close()
+        driver.close()
 
 
 app = FastAPI(
     title="Job Matching Knowledge Graph Backend",
     description="图谱2 后端服务：岗位-能力知识图谱 API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
@@ -58,27 +154,303 @@ class JobSkillsRequest(BaseModel):
 class SkillsToJobsRequest(BaseModel):
     skills: List[str]  # 技能名称列表
     skill_levels: Optional[Dict[str, int]] = None  # 技能名称 -> 熟练度(1-5)的映射
+    top_k: Optional[int] = None  # 只返回前 top_k 个岗位（默认全部）
+    offset: int = 0  # 分页偏移量
+    min_score: float = 0.0  # 最低匹配分数
+
+
+class BatchProfile(BaseModel):
+    id: Optional[str] = None  # 画像标识（如 userId），原样返回
+    skills: List[str]
+    skill_levels: Optional[Dict[str, int]] = None
+
+
+class BatchSkillsToJobsRequest(BaseModel):
+    profiles: List[BatchProfile]
+    top_k: Optional[int] = None  # 每个画像只返回前 top_k 个岗位
+    min_score: float = 0.0
 
 
 # ==================== Neo4j 辅助函数 ====================
 
 
 def run_query(query: str, parameters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """同步只读查询（托管读事务，瞬时错误自动重试），只在后台线程（快照重建）中使用"""
+    if not KG_NEO4J_PASSWORD:
+        raise RuntimeError("KG_NEO4J_PASSWORD 未设置，无法连接 Neo4j")
+
+    return db.read(query, parameters)
+
+
+async def run_query_async(query: str, parameters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """异步只读查询，请求处理路径使用；同时执行的查询数受 KG_MAX_CONCURRENT_QUERIES 限制"""
     if not KG_NEO4J_PASSWORD:
         raise RuntimeError("KG_NEO4J_PASSWORD 未设置，无法连接 Neo4j")
 
-    with driver.session() as session:
-        result = session.run(query, parameters or {})
-        return [record.data() for record in result]
+    async with _query_slots:
+        return await async_db.read(query, parameters)
+
+
+async def run_write_async(query: str, parameters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """异步写查询（托管写事务），只在管理接口中使用（索引创建与 titleKey 回填）"""
+    if not KG_NEO4J_PASSWORD:
+        raise RuntimeError("KG_NEO4J_PASSWORD 未设置，无法连接 Neo4j")
+
+    async with _query_slots:
+        return await async_db.write(query, parameters)
+
+
+# ==================== 技能→岗位倒排索引 ====================
+
+# 全部 Page -> Category -> Skill 带权边，用于构建内存快照（与构建脚本导出 Page 模型产物的查询相同）
+SNAPSHOT_QUERY = PAGE_SNAPSHOT_CYPHER
+
+async def fetch_graph_version() -> Optional[int]:
+    if KG_ARTIFACT_PATH:
+        # 产物头部记录了构建时间戳；构建脚本原子替换为内容不同的文件后即可被检测到
+        return artifact.artifact_version(artifact.read_header(KG_ARTIFACT_PATH, schema=artifact.SCHEMA_PAGE))
+    records = await run_query_async(READ_VERSION_QUERY, {"name": GRAPH_VERSION_NAME})
+    if records and records[0].get("building"):
+        # 构建脚本正在重建图谱：沿用旧版本号，继续使用旧快照
+        return None
+    return (records[0].get("version") or 0) if records else 0
+
+
+# 图谱版本号（构建脚本每次导入后递增），快照重载以它判断是否过期；
+# 由后台任务 watch_graph_version 读取后写入，请求处理中只读取缓存值
+graph_version = GraphVersionTracker(None, KG_VERSION_CHECK_INTERVAL)
+
+
+def load_snapshot() -> SkillJobSnapshot:
+    """
+    从 Neo4j（或 KG_ARTIFACT_PATH 指向的编译产物）加载岗位×技能快照（含技能→岗位倒排表）。
+    同一岗位下的同名技能只保留一条，权重取最大值（与原查询逻辑一致）。
+    Page 模型的产物由去重后的快照写出，加载后直接使用内存映射的数组。
+    """
+    if KG_ARTIFACT_PATH:
+        return artifact.load_snapshot(KG_ARTIFACT_PATH, schema=artifact.SCHEMA_PAGE)[0]
+
+    records = run_query(SNAPSHOT_QUERY)
+    return SkillJobSnapshot.from_edges(
+        ((r.get("job_name"), r.get("skill"), r.get("weight"), r.get("category")) for r in records),
+        dedupe=True,
+    )
+
+
+shared_snapshots = (
+    SharedSnapshotStore(KG_SHARED_SNAPSHOT_DIR, artifact.SCHEMA_PAGE, KG_VERSION_CHECK_INTERVAL)
+    if KG_SHARED_SNAPSHOT_DIR else None
+)
+
+
+def _build_snapshot() -> SkillJobSnapshot:
+    """从数据源构建快照并预先计算相似岗位表（共享目录模式下随快照一起发布，其他 worker 直接映射）"""
+    snapshot = load_snapshot()
+    if KG_SCORING_MODE != "cypher":
+        snapshot.job_similarity(KG_SIMILAR_TOP_N)
+    return snapshot
+
+
+def _load_generation(version: int, rebuild: bool = False) -> SkillJobSnapshot:
+    """构建一代快照（配置共享目录时映射共享快照；rebuild=True 时强制重建并发布新一代）"""
+    if shared_snapshots is not None:
+        snapshot = shared_snapshots.get(version, _build_snapshot, force=rebuild)[0]
+    else:
+        snapshot = _build_snapshot()
+    if KG_SCORING_MODE != "cypher":
+        # 补全索引（每个 worker 各自构建）与相似岗位表（映射的共享快照中已包含时直接使用）
+        # 随快照在后台线程中准备，切换后的请求不需要等待；cypher 模式下在首次使用时构建
+        _ = snapshot.skill_prefix_index, snapshot.job_prefix_index
+        snapshot.job_similarity(KG_SIMILAR_TOP_N)
+    return snapshot
+
+
+# 快照热重载：图谱版本变化时在后台构建新快照并原子切换，请求不等待重建
+snapshot_reloader = SnapshotReloader(_load_generation, graph_version.current)
+
+def result_version():
+    """
+    技能→岗位结果缓存的版本：以当前提供服务的快照版本失效，快照切换后旧结果随之作废；
+    cypher 模式下单次匹配的结果直接来自 Neo4j（快照可能从未加载），同时跟随图谱版本号
+    """
+    if KG_SCORING_MODE == "cypher":
+        return graph_version.current(), snapshot_reloader.version
+    return snapshot_reloader.version
+
+
+# 技能→岗位查询结果缓存，键为规范化的技能集合 + 熟练度 + 分页参数
+result_cache = ResultCache(KG_CACHE_SIZE, KG_CACHE_TTL, result_version)
+
+
+# 合并同时到达的相同请求（岗位 / 技能 / Page 列表、相同的技能匹配），只向后端执行一次
+flights = AsyncSingleFlight()
+
+
+def catalog_version() -> Optional[int]:
+    """目录类接口（岗位 / 技能 / Page 列表）的缓存版本：产物模式下跟随正在服务的快照，否则跟随图谱版本号"""
+    return snapshot_reloader.version if KG_ARTIFACT_PATH else graph_version.current()
+
+
+# 目录类接口按图谱版本预编码的响应体（含 gzip / brotli 版本与 ETag）
+catalog_cache = CatalogCache(catalog_version, KG_CACHE_TTL)
+
+
+async def _catalog_response(request: Request, key: str, build) -> Response:
+    """
+    目录类接口的响应：命中时直接返回预编码的响应体，If-None-Match 一致时返回 304。
+
+    build 为返回 JSON 内容的协程函数，只在缓存未命中时调用（同时到达的请求只构建一次）。
+    """
+    entry = await catalog_cache.get_or_build_async(key, lambda: flights.do(("catalog", key), build))
+    status, body, headers = entry.respond(
+        request.headers.get("if-none-match"), request.headers.get("accept-encoding")
+    )
+    catalog_cache.record(status, entry, body)
+    return Response(content=body, status_code=status, headers=headers, media_type=JSON_MEDIA_TYPE)
+
+
+def get_snapshot() -> SkillJobSnapshot:
+    """返回当前快照，首次调用时同步加载，之后版本变化时在后台重建"""
+    return snapshot_reloader.get()
+
+
+async def get_snapshot_async() -> SkillJobSnapshot:
+    """请求处理路径上获取快照：已加载时直接返回，尚未加载（如启动时 Neo4j 不可用）时在线程池中加载"""
+    if snapshot_reloader.version is not None:
+        return snapshot_reloader.get()
+    return await run_in_threadpool(get_snapshot)
+
+
+async def watch_graph_version():
+    """后台任务：每 KG_VERSION_CHECK_INTERVAL 秒读取一次图谱版本号，变化时触发快照后台重建"""
+    while True:
+        await asyncio.sleep(KG_VERSION_CHECK_INTERVAL)
+        try:
+            graph_version.observe(await fetch_graph_version())
+        except Exception:
+            # 读取失败时沿用旧版本号，下个周期重试
+            continue
+        if shared_snapshots is not None and shared_snapshots.has_newer_generation():
+            # 其他 worker 强制重载发布了新一代（版本号不变），直接映射，不重建
+            snapshot_reloader.trigger(force=True, rebuild=False)
+        elif KG_SCORING_MODE != "cypher" or snapshot_reloader.version is not None:
+            # cypher 模式下快照按需加载，尚未加载时不在后台构建
+            snapshot_reloader.trigger()
+        if not _title_key_ready and not KG_ARTIFACT_PATH:
+            # 索引可能已由管理接口或其他实例创建，只读检查，不在此处写入
+            try:
+                await check_title_key_index()
+            except Exception:
+                pass
+
+
+# ==================== 岗位名称索引 ====================
+
+# Page.titleKey = 规范化（去空格、小写）后的岗位名称，建索引后按名称查找是索引查找而非全量扫描。
+# 索引创建与回填是写操作，只由管理接口 /api/admin/title-key-index 执行；
+# 请求处理路径只读取索引状态，索引未就绪或查不到时回退为全量扫描
+PAGE_TITLE_KEY_INDEX_NAME = "page_title_key"
+
+PAGE_TITLE_KEY_INDEX = f"CREATE INDEX {PAGE_TITLE_KEY_INDEX_NAME} IF NOT EXISTS FOR (p:Page) ON (p.titleKey)"
+
+PAGE_TITLE_KEY_INDEX_STATE = """
+SHOW INDEXES YIELD name, state
+WHERE name = $name
+RETURN state
+"""
+
+PAGE_TITLE_KEY_BACKFILL = """
+MATCH (p:Page)
+WITH p, toLower(trim(coalesce(p.pageName, p.name))) AS key
+WHERE key IS NOT NULL AND (p.titleKey IS NULL OR p.titleKey <> key)
+SET p.titleKey = key
+RETURN count(p) AS updated
+"""
+
+# titleKey 就绪后使用的索引查找
+JOB_SKILLS_BY_TITLE_KEY = """
+MATCH (p:Page {titleKey: $title_key})-[:HAS_CATEGORY]->(c:Category)-[r:HAS_SKILL]->(s:Skill)
+RETURN s.name AS skill,
+       coalesce(r.weight, 3) AS level,
+       coalesce(c.type, '') AS category_type
+ORDER BY level DESC, skill
+"""
+
+# titleKey 不可用时的回退：逐个 Page 比较名称（全量扫描）
+JOB_SKILLS_BY_TITLE_SCAN = """
+MATCH (p:Page)-[:HAS_CATEGORY]->(c:Category)-[r:HAS_SKILL]->(s:Skill)
+WHERE toLower(coalesce(p.pageName, p.name)) = toLower($title)
+RETURN s.name AS skill,
+       coalesce(r.weight, 3) AS level,
+       coalesce(c.type, '') AS category_type
+ORDER BY level DESC, skill
+"""
+
+_title_key_ready = False
+
+
+async def check_title_key_index() -> bool:
+    """只读检查 Page.titleKey 索引是否已上线，结果决定岗位技能查询是否走索引"""
+    global _title_key_ready
+    records = await run_query_async(PAGE_TITLE_KEY_INDEX_STATE, {"name": PAGE_TITLE_KEY_INDEX_NAME})
+    _title_key_ready = bool(records) and records[0].get("state") == "ONLINE"
+    return _title_key_ready
+
+
+async def ensure_title_key_index() -> int:
+    """创建 Page.titleKey 索引并回填缺失 / 过期的 titleKey（写操作，只由管理接口调用），返回回填的节点数"""
+    global _title_key_ready
+    await run_write_async(PAGE_TITLE_KEY_INDEX)
+    records = await run_write_async(PAGE_TITLE_KEY_BACKFILL)
+    _title_key_ready = True
+    return records[0].get("updated", 0) if records else 0
+
+
+# 快照类别编码 -> Category.type
+_CATEGORY_TYPES = {CATEGORY_HARD: "hard", CATEGORY_SOFT: "soft"}
+
+
+def _snapshot_skill_records(snapshot: SkillJobSnapshot, jid: int) -> List[Dict[str, Any]]:
+    """从快照中取出岗位的全部技能，字段与 JOB_SKILLS_BY_TITLE_* 查询结果一致"""
+    records = []
+    for i in range(snapshot.indptr[jid], snapshot.indptr[jid + 1]):
+        records.append({
+            "skill": snapshot.skill_names[int(snapshot.indices[i])],
+            "level": float(snapshot.weights[i]),
+            "category_type": _CATEGORY_TYPES.get(int(snapshot.categories[i]), ""),
+        })
+    records.sort(key=lambda r: (-r["level"], r["skill"]))
+    return records
+
+
+async def warm_up():
+    """启动时读取图谱版本号、预加载快照（cypher 模式下不预加载）并检查岗位名称索引；Neo4j 不可用时推迟到首次请求"""
+    try:
+        graph_version.observe(await fetch_graph_version())
+        if KG_SCORING_MODE != "cypher":
+            await run_in_threadpool(get_snapshot)
+    except Exception as e:
+        print(f"⚠️  启动时加载技能→岗位索引失败，将在首次请求时重试: {e}")
+    if KG_ARTIFACT_PATH:
+        # 岗位技能直接从产物读取，不需要 Page.titleKey 索引
+        return
+    try:
+        if await check_title_key_index():
+            print("Page.titleKey 索引已就绪")
+        else:
+            print("⚠️  Page.titleKey 索引不存在或未上线，岗位技能查询将回退为全量扫描"
+                  "（调用 POST /api/admin/title-key-index 创建并回填）")
+    except Exception as e:
+        print(f"⚠️  读取 Page.titleKey 索引状态失败，岗位技能查询将回退为全量扫描: {e}")
 
 
 # ==================== 健康检查 ====================
 
 
 @app.get("/api/health")
-def health_check():
+async def health_check():
     try:
-        _ = run_query("RETURN 1 AS ok")
+        _ = await run_query_async("RETURN 1 AS ok")
         return {"success": True, "message": "Neo4j 连接正常"}
     except Exception as e:
         return {
@@ -91,22 +463,39 @@ def health_check():
 
 
 @app.get("/api/all-skills")
-def get_all_skills():
+async def get_all_skills(request: Request):
     """
     返回知识图谱中的所有技能列表，按硬实力 / 软实力划分。
     这里假设 Skill 节点有属性：
     - name: 技能名称
     - category: '硬实力' 或 '软实力'（可选）
+
+    响应体按图谱版本预编码，支持 ETag / If-None-Match（304）与 gzip / br 压缩。
     """
     try:
-        # 当前图谱结构：
-        # - Page: 岗位大类
-        # - Category: 能力类别（区分硬实力 / 软实力），属性 type 表示类别
-        # - Skill: 具体技能
-        # - 关系：Page-[:HAS_CATEGORY]->Category-[:HAS_SKILL]->Skill
-        #
-        # 这里按 Category.type 将技能划分为硬实力 / 软实力
-        records = run_query(
+        return await _catalog_response(request, "all_skills", _all_skills_payload)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取技能列表失败: {e}")
+
+
+async def _all_skills_payload() -> Dict[str, Any]:
+    """/api/all-skills 的响应内容"""
+    # 当前图谱结构：
+    # - Page: 岗位大类
+    # - Category: 能力类别（区分硬实力 / 软实力），属性 type 表示类别
+    # - Skill: 具体技能
+    # - 关系：Page-[:HAS_CATEGORY]->Category-[:HAS_SKILL]->Skill
+    #
+    # 这里按 Category.type 将技能划分为硬实力 / 软实力
+    if KG_ARTIFACT_PATH:
+        snapshot = await get_snapshot_async()
+        pairs = {
+            (snapshot.skill_names[int(sid)], _CATEGORY_TYPES.get(int(code), ""))
+            for sid, code in zip(snapshot.indices, snapshot.categories)
+        }
+        records = [{"skill": name, "type": ctype} for name, ctype in sorted(pairs)]
+    else:
+        records = await run_query_async(
             """
             MATCH (c:Category)-[:HAS_SKILL]->(s:Skill)
             WHERE s.name IS NOT NULL
@@ -115,38 +504,168 @@ def get_all_skills():
             """
         )
 
-        hard_skills: List[str] = []
-        soft_skills: List[str] = []
+    hard_skills: List[str] = []
+    soft_skills: List[str] = []
 
-        for r in records:
-            name = r.get("skill")
-            ctype = (r.get("type") or "").strip().lower()
-            if not name:
-                continue
+    for r in records:
+        name = r.get("skill")
+        ctype = (r.get("type") or "").strip().lower()
+        if not name:
+            continue
 
-            # Category.type: 'soft' 表示软实力，'hard' 表示硬实力
-            if ctype == "soft":
-                soft_skills.append(name)
-            elif ctype == "hard":
-                hard_skills.append(name)
-            else:
-                # 未标明类型的技能，默认归入硬实力
-                hard_skills.append(name)
+        # Category.type: 'soft' 表示软实力，'hard' 表示硬实力
+        if ctype == "soft":
+            soft_skills.append(name)
+        elif ctype == "hard":
+            hard_skills.append(name)
+        else:
+            # 未标明类型的技能，默认归入硬实力
+            hard_skills.append(name)
 
-        return {
-            "success": True,
-            "hard_skills": hard_skills,
-            "soft_skills": soft_skills,
-        }
+    return {
+        "success": True,
+        "hard_skills": hard_skills,
+        "soft_skills": soft_skills,
+    }
+
+
+# ==================== 自动补全 ====================
+
+
+def _check_suggest_limit(limit: int):
+    if limit < 1 or limit > KG_SUGGEST_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit 必须在 1 到 {KG_SUGGEST_MAX_LIMIT} 之间")
+
+
+def _skill_type(snapshot: SkillJobSnapshot, sid: int) -> str:
+    """技能在各岗位中最常见的类别（hard / soft）"""
+    categories = snapshot.categories[snapshot.postings(sid)]
+    hard = int(np.count_nonzero(categories == CATEGORY_HARD))
+    soft = int(np.count_nonzero(categories == CATEGORY_SOFT))
+    if not hard and not soft:
+        return ""
+    return "soft" if soft > hard else "hard"
+
+
+@app.get("/api/suggest/skills")
+async def suggest_skills(q: str = "", limit: int = 10):
+    """
+    技能名称前缀补全：返回以 q 开头（忽略大小写与前后空格）的技能，
+    按要求该技能的岗位数从多到少排列；q 为空时返回最常见的技能。
+    前端输入时调用，不必下载 /api/all-skills 全量列表再在本地过滤。
+    """
+    _check_suggest_limit(limit)
+    try:
+        snapshot = await get_snapshot_async()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"获取技能列表失败: {e}")
+        raise HTTPException(status_code=500, detail=f"技能补全失败: {e}")
+
+    # 前缀查找与逐条统计类别在线程池中执行，不占用事件循环
+    return await run_in_threadpool(_skill_suggestions, snapshot, q, limit)
+
+
+def _skill_suggestions(snapshot: SkillJobSnapshot, q: str, limit: int) -> Dict[str, Any]:
+    ids, total = snapshot.skill_prefix_index.suggest(q, limit)
+    degrees = snapshot.posting_indptr
+    return {
+        "success": True,
+        "query": q,
+        "total": total,
+        "suggestions": [
+            {
+                "name": snapshot.skill_names[sid],
+                "jobs": int(degrees[sid + 1] - degrees[sid]),
+                "type": _skill_type(snapshot, sid),
+            }
+            for sid in ids
+        ],
+    }
+
+
+@app.get("/api/suggest/jobs")
+async def suggest_jobs(q: str = "", limit: int = 10):
+    """
+    岗位名称前缀补全：返回以 q 开头（忽略大小写与前后空格）的岗位，
+    按岗位技能权重总和从高到低排列；q 为空时返回权重最高的岗位。
+    """
+    _check_suggest_limit(limit)
+    try:
+        snapshot = await get_snapshot_async()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"岗位补全失败: {e}")
+
+    return await run_in_threadpool(_job_suggestions, snapshot, q, limit)
+
+
+def _job_suggestions(snapshot: SkillJobSnapshot, q: str, limit: int) -> Dict[str, Any]:
+    ids, total = snapshot.job_prefix_index.suggest(q, limit)
+    return {
+        "success": True,
+        "query": q,
+        "total": total,
+        "suggestions": [
+            {
+                "title": snapshot.job_names[jid],
+                "skills": int(snapshot.job_skill_counts[jid]),
+                "total_weight": round(float(snapshot.job_total_weights[jid]), 2),
+            }
+            for jid in ids
+        ],
+    }
+
+
+# ==================== 相似岗位 ====================
+
+
+@app.get("/api/similar-jobs")
+async def similar_jobs(job_title: str, limit: int = 10):
+    """
+    返回与 job_title 技能要求最相似的岗位（技能权重向量的余弦相似度）。
+
+    近邻表在快照加载时于后台线程中预先计算（见 abilityToJob/similarity.py），请求只读表，不访问 Neo4j；
+    cypher 模式下不预先计算，首个请求在线程池中构建（同时到达的请求等待同一次构建），不阻塞事件循环。
+    method 为 exact（精确计算）；shared_skills 为两个岗位共同要求的技能（按 job_title 岗位中的顺序）。
+    """
+    title = (job_title or "").strip()
+    if not title:
+        raise HTTPException(status_code=400, detail="job_title 不能为空")
+    if limit < 1 or limit > KG_SIMILAR_TOP_N:
+        raise HTTPException(status_code=400, detail=f"limit 必须在 1 到 {KG_SIMILAR_TOP_N} 之间")
+
+    try:
+        snapshot = await get_snapshot_async()
+        table = await run_in_threadpool(snapshot.job_similarity, KG_SIMILAR_TOP_N)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"相似岗位查询失败: {e}")
+
+    jid = snapshot.job_id(title)
+    if jid is None:
+        raise HTTPException(status_code=404, detail=f"岗位不存在: {title}")
+
+    own_skills = snapshot.indices[snapshot.indptr[jid]:snapshot.indptr[jid + 1]]
+    jobs = []
+    for other, similarity in table.neighbors(jid, limit):
+        other_skills = snapshot.indices[snapshot.indptr[other]:snapshot.indptr[other + 1]]
+        shared = own_skills[np.isin(own_skills, other_skills)]
+        jobs.append({
+            "job_name": snapshot.job_names[other],
+            "similarity": round(similarity, 4),
+            "shared_skills": [snapshot.skill_names[int(sid)] for sid in shared],
+        })
+
+    return {
+        "success": True,
+        "job_name": snapshot.job_names[jid],
+        "method": table.method,
+        "jobs": jobs,
+    }
 
 
 # ==================== 岗位 -> 技能 ====================
 
 
 @app.post("/api/query-job-skills")
-def query_job_skills(req: JobSkillsRequest):
+async def query_job_skills(req: JobSkillsRequest):
     """
     根据岗位名称查询该岗位需要的技能。
 
@@ -161,17 +680,39 @@ def query_job_skills(req: JobSkillsRequest):
         # 适配当前图结构：
         # (:Page)-[:HAS_CATEGORY]->(:Category {type})-[:HAS_SKILL {weight}]->(:Skill {name})
         # 其中 Page 表示岗位大类，Category.type 表示硬实力 / 软实力
-        records = run_query(
-            """
-            MATCH (p:Page)-[:HAS_CATEGORY]->(c:Category)-[r:HAS_SKILL]->(s:Skill)
-            WHERE toLower(coalesce(p.pageName, p.name)) = toLower($title)
-            RETURN s.name AS skill,
-                   coalesce(r.weight, 3) AS level,
-                   coalesce(c.type, '') AS category_type
-            ORDER BY level DESC, skill
-            """,
-            {"title": title},
-        )
+        #
+        # 查找路径（通过返回值 lookup 字段告知调用方）：
+        # - not_found: 进程内岗位名称字典中不存在该岗位，直接返回，不访问 Neo4j
+        # - title_index: 按 Page.titleKey 索引查找
+        # - scan: titleKey 索引未就绪时回退为逐个 Page 比较名称
+        # - artifact: 配置了 KG_ARTIFACT_PATH 时直接从内存映射的编译产物读取
+        title_key = normalize_skill_name(title)
+        if KG_ARTIFACT_PATH:
+            snapshot = await get_snapshot_async()
+            jid = snapshot.job_id(title_key)
+            known = jid is not None
+        elif KG_SCORING_MODE == "cypher" and snapshot_reloader.version is None:
+            known = True  # cypher 模式下不为预判加载快照，交给数据库查询
+        else:
+            try:
+                known = (await get_snapshot_async()).job_id(title_key) is not None
+            except Exception:
+                known = True  # 快照不可用时不做预判，交给数据库查询
+
+        if not known:
+            lookup, records = "not_found", []
+        elif KG_ARTIFACT_PATH:
+            lookup, records = "artifact", _snapshot_skill_records(snapshot, jid)
+        elif _title_key_ready:
+            lookup = "title_index"
+            records = await run_query_async(JOB_SKILLS_BY_TITLE_KEY, {"title_key": title_key})
+            if not records:
+                # 快照中存在但索引查不到：新导入的 Page 可能尚未回填 titleKey（回填由管理接口执行）
+                lookup = "scan"
+                records = await run_query_async(JOB_SKILLS_BY_TITLE_SCAN, {"title": title})
+        else:
+            lookup = "scan"
+            records = await run_query_async(JOB_SKILLS_BY_TITLE_SCAN, {"title": title})
 
         # 先收集所有权重值，用于计算1-5级映射
         raw_weights = []
@@ -240,6 +781,7 @@ def query_job_skills(req: JobSkillsRequest):
             "success": True,
             "job_title": title,
             "skills": skills,
+            "lookup": lookup,
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"查询岗位技能失败: {e}")
@@ -248,8 +790,201 @@ def query_job_skills(req: JobSkillsRequest):
 # ==================== 技能 -> 岗位匹配 ====================
 
 
+def _normalize_skills_input(skills: List[str],
+                            skill_levels: Optional[Dict[str, int]]):
+    """规范化输入技能（去重、小写），返回 (原始技能, 小写技能, 小写技能->熟练度)"""
+    input_skills_raw = [s.strip() for s in (skills or []) if s and s.strip()]
+    input_skills_lower = sorted({normalize_skill_name(s) for s in input_skills_raw})
+    # 技能名称 -> 熟练度映射（默认1分）
+    skill_levels_lower = {k.lower(): v for k, v in (skill_levels or {}).items()}
+    return input_skills_raw, input_skills_lower, skill_levels_lower
+
+
+def _build_skill_query(snapshot: SkillJobSnapshot,
+                       input_skills_lower: List[str],
+                       skill_levels_lower: Dict[str, int]) -> Dict[int, float]:
+    """用户能力稀疏向量：技能 ID -> 用户熟练度（默认1分），只包含图谱中存在的技能"""
+    query = {}
+    for name in input_skills_lower:
+        sid = snapshot.skill_id(name)
+        if sid is not None:
+            query[sid] = float(skill_levels_lower.get(name, 1))
+    return query
+
+
+def _match_snapshot(snapshot: SkillJobSnapshot,
+                    input_skills_lower: List[str],
+                    skill_levels_lower: Dict[str, int],
+                    top_k: Optional[int] = None,
+                    offset: int = 0,
+                    min_score: float = 0.0):
+    """在快照上匹配并打分（只读取输入技能的倒排表），返回 (岗位列表, 总数)"""
+    query = _build_skill_query(snapshot, input_skills_lower, skill_levels_lower)
+    return _score_jobs(snapshot, snapshot.match(query, positive_only=False), top_k, offset, min_score)
+
+
+def _score_jobs(snapshot: SkillJobSnapshot,
+                result: SnapshotMatch,
+                top_k: Optional[int] = None,
+                offset: int = 0,
+                min_score: float = 0.0):
+    """
+    按能力覆盖率+熟练度加权算法为命中岗位打分（0-100分）。
+
+    分数对全部命中岗位向量化计算，再用部分选择（argpartition）只取出第
+    offset ~ offset+top_k 名构造返回字典，长尾岗位不会被排序或序列化。
+    返回 (岗位列表, 满足 min_score 的岗位总数)。
+    """
+    jids = result.jobs
+    n = snapshot.job_skill_counts[jids]  # 岗位所需能力总数
+    k = result.match_counts  # 交集能力个数
+
+    # 权重总和（用于归一化），避免除零
+    total_weight = snapshot.job_total_weights[jids]
+    total_weight = np.where(total_weight == 0, 1.0, total_weight)
+
+    # 步骤1：能力覆盖率得分（40分）= k / n × 40
+    coverage_score = k / n * 40.0
+
+    # 步骤2：熟练度加权得分（60分）
+    # 加权熟练度均值 = Σ(熟练度 × 权重) / 权重总和；得分 = (均值 / 5) × 60
+    weighted_avg = result.scores / total_weight
+    proficiency_score = (weighted_avg / 5.0) * 60.0
+
+    # 步骤3：计算最终匹配分数，确保在0-100范围内
+    match_percentage = np.clip(np.round(coverage_score + proficiency_score, 2), 0.0, 100.0)
+
+    candidates = np.flatnonzero(match_percentage >= min_score)
+    limit = None if top_k is None else offset + top_k
+    picked = candidates[top_k_candidates(match_percentage[candidates], limit)]
+
+    # 按匹配分数降序排序（同分按匹配数降序、岗位名升序）
+    ranked = sorted(
+        picked.tolist(),
+        key=lambda p: (-match_percentage[p], -k[p], snapshot.job_names[int(jids[p])]),
+    )[offset:limit]
+
+    jobs = []
+    for pos in ranked:
+        jid = int(jids[pos])
+        jobs.append(
+            {
+                "job_name": snapshot.job_names[jid],
+                "matched_skills": [
+                    snapshot.skill_names[int(result.entry_skills[i])]
+                    for i in result.job_entries(pos)
+                ],
+                "match_count": int(k[pos]),
+                "total_weight": float(total_weight[pos]),
+                "match_percentage": float(match_percentage[pos]),
+                "hard_skills_count": int(snapshot.job_hard_counts[jid]),
+                "soft_skills_count": int(snapshot.job_soft_counts[jid]),
+            }
+        )
+    return jobs, int(candidates.shape[0])
+
+
+# 在 Cypher 中完成打分：先由输入技能找到候选岗位（Page 节点直接带入下一个 MATCH，
+# 不再按名称重新匹配全部 Page），只展开候选岗位的技能边；
+# 同一岗位下的同名技能只保留一条（权重取最大值），评分公式与 _score_jobs 一致；
+# 排序后只返回第 offset ~ end 行，total 为满足 min_score 的岗位总数
+SCORE_JOBS_QUERY = """
+MATCH (s0:Skill)<-[:HAS_SKILL]-(:Category)<-[:HAS_CATEGORY]-(p:Page)
+WHERE toLower(trim(s0.name)) IN $skills
+WITH DISTINCT p
+MATCH (p)-[:HAS_CATEGORY]->(c:Category)-[r:HAS_SKILL]->(s:Skill)
+WITH coalesce(p.pageName, p.name) AS job_name,
+     toLower(trim(s.name)) AS key,
+     s.name AS skill,
+     toFloat(coalesce(r.weight, 0.0)) AS weight,
+     toLower(coalesce(c.type, '')) AS ctype
+WHERE key <> ''
+WITH job_name, key, max(weight) AS weight, head(collect(skill)) AS skill, head(collect(ctype)) AS ctype
+WITH job_name,
+     count(key) AS n,
+     sum(weight) AS total_weight,
+     sum(CASE ctype WHEN 'hard' THEN 1 ELSE 0 END) AS hard_count,
+     sum(CASE ctype WHEN 'soft' THEN 1 ELSE 0 END) AS soft_count,
+     collect(CASE WHEN key IN $skills
+                  THEN {skill: skill, score: weight * toFloat(coalesce($levels[key], 1))} END) AS matched
+WITH job_name, n, hard_count, soft_count, matched, size(matched) AS k,
+     CASE WHEN total_weight = 0 THEN 1.0 ELSE total_weight END AS total_weight,
+     reduce(acc = 0.0, m IN matched | acc + m.score) AS score_sum
+WHERE k > 0
+WITH job_name, n, k, hard_count, soft_count, matched, total_weight,
+     round(toFloat(k) / n * 40.0 + (score_sum / total_weight / 5.0) * 60.0, 2) AS raw_score
+WITH job_name, k, hard_count, soft_count, matched, total_weight,
+     CASE WHEN raw_score < 0 THEN 0.0 WHEN raw_score > 100 THEN 100.0 ELSE raw_score END AS match_percentage
+WHERE match_percentage >= $min_score
+WITH job_name, k, hard_count, soft_count, matched, total_weight, match_percentage
+ORDER BY match_percentage DESC, k DESC, job_name
+WITH collect({
+    job_name: job_name,
+    matched_skills: [m IN matched | m.skill],
+    match_count: k,
+    total_weight: total_weight,
+    match_percentage: match_percentage,
+    hard_skills_count: hard_count,
+    soft_skills_count: soft_count
+}) AS rows
+RETURN size(rows) AS total, rows[$offset..$end] AS jobs
+"""
+
+# 各打分方式的请求数、耗时与（cypher 模式下）从 Neo4j 传回的数据量，用于按部署选择打分方式
+_scoring_stats: Dict[str, Dict[str, float]] = {}
+
+
+def _record_scoring(mode: str, seconds: float, rows: int, payload_bytes: int = 0):
+    stats = _scoring_stats.setdefault(
+        mode, {"requests": 0, "total_ms": 0.0, "rows": 0, "payload_bytes": 0}
+    )
+    stats["requests"] += 1
+    stats["total_ms"] += seconds * 1000
+    stats["rows"] += rows
+    stats["payload_bytes"] += payload_bytes
+
+
+def _scoring_summary() -> Dict[str, Any]:
+    return {
+        mode: {
+            "requests": stats["requests"],
+            "avg_ms": round(stats["total_ms"] / stats["requests"], 3),
+            "avg_rows": round(stats["rows"] / stats["requests"], 1),
+            "avg_payload_bytes": round(stats["payload_bytes"] / stats["requests"], 1),
+        }
+        for mode, stats in _scoring_stats.items()
+        if stats["requests"]
+    }
+
+
+async def _score_jobs_cypher(input_skills_lower: List[str],
+                             skill_levels_lower: Dict[str, int],
+                             top_k: Optional[int] = None,
+                             offset: int = 0,
+                             min_score: float = 0.0):
+    """在 Neo4j 中打分并只取回排序后的第 offset ~ offset+top_k 个岗位，返回 (岗位列表, 总数)"""
+    records = await run_query_async(SCORE_JOBS_QUERY, {
+        "skills": input_skills_lower,
+        "levels": {k: v for k, v in skill_levels_lower.items() if k in input_skills_lower},
+        "min_score": min_score,
+        "offset": offset,
+        "end": offset + top_k if top_k is not None else 2 ** 31 - 1,
+    })
+    if not records:
+        return [], 0
+    jobs = records[0].get("jobs") or []
+    return jobs, int(records[0].get("total") or 0)
+
+
+def _check_paging(top_k: Optional[int], offset: int):
+    if top_k is not None and top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k 必须为正整数")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset 不能为负数")
+
+
 @app.post("/api/query-skills-to-jobs")
-def query_skills_to_jobs(req: SkillsToJobsRequest):
+async def query_skills_to_jobs(req: SkillsToJobsRequest):
     """
     根据一组技能匹配岗位，使用能力覆盖率+熟练度加权算法计算匹配分数（0-100分）。
     
@@ -260,137 +995,52 @@ def query_skills_to_jobs(req: SkillsToJobsRequest):
     if not req.skills:
         raise HTTPException(status_code=400, detail="至少需要一个技能")
 
-    # 规范化输入技能（去重、小写）
-    input_skills_raw = [s.strip() for s in req.skills if s and s.strip()]
+    input_skills_raw, input_skills_lower, skill_levels_lower = _normalize_skills_input(
+        req.skills, req.skill_levels
+    )
     if not input_skills_raw:
         raise HTTPException(status_code=400, detail="至少需要一个有效技能")
-
-    input_skills_lower = sorted({s.lower() for s in input_skills_raw})
-    # 技能名称 -> 熟练度映射（默认1分）
-    skill_levels = req.skill_levels or {}
-    skill_levels_lower = {k.lower(): v for k, v in skill_levels.items()}
+    _check_paging(req.top_k, req.offset)
+
+    # 缓存键：排序后的小写技能集合 + 熟练度 + 分页参数
+    cache_key = (
+        "skills_to_jobs",
+        tuple(input_skills_lower),
+        tuple(sorted((k, v) for k, v in skill_levels_lower.items() if k in input_skills_lower)),
+        req.top_k,
+        req.offset,
+        req.min_score,
+    )
+
+    async def compute():
+        started = time.perf_counter()
+        if KG_SCORING_MODE == "cypher":
+            jobs, total = await _score_jobs_cypher(
+                input_skills_lower, skill_levels_lower, req.top_k, req.offset, req.min_score
+            )
+            payload = len(json.dumps(jobs, ensure_ascii=False).encode("utf-8"))
+        else:
+            snapshot = await get_snapshot_async()
+            # 匹配与打分是纯 CPU 计算，放到线程池中执行，避免阻塞事件循环上的其他请求
+            jobs, total = await run_in_threadpool(
+                _match_snapshot, snapshot, input_skills_lower, skill_levels_lower,
+                req.top_k, req.offset, req.min_score,
+            )
+            payload = 0
+        _record_scoring(KG_SCORING_MODE, time.perf_counter() - started, len(jobs), payload)
+        return jobs, total
 
     try:
-        # 查询每个岗位所需的所有技能及其权重
-        # 图结构：(p:Page)-[:HAS_CATEGORY]->(c:Category)-[r:HAS_SKILL {weight}]->(s:Skill)
-        records = run_query(
-            """
-            WITH $skills AS inputSkills
-            MATCH (p:Page)-[:HAS_CATEGORY]->(c:Category)-[r:HAS_SKILL]->(s:Skill)
-            WITH p, 
-                 collect({
-                     skill: s.name,
-                     weight: coalesce(r.weight, 0.0),
-                     category: coalesce(c.type, '')
-                 }) AS allSkills,
-                 collect(DISTINCT CASE WHEN toLower(s.name) IN inputSkills THEN s.name END) AS matchedSkillNames
-            WHERE size(matchedSkillNames) > 0
-            RETURN
-                coalesce(p.pageName, p.name) AS job_name,
-                allSkills AS job_skills,
-                matchedSkillNames AS matched_skills
-            ORDER BY size(matchedSkillNames) DESC, job_name
-            """,
-            {"skills": input_skills_lower},
+        # 缓存未命中时，同时到达的相同查询只计算一次
+        jobs, total = await result_cache.get_or_compute_async(
+            cache_key, lambda: flights.do(cache_key, compute)
         )
 
-        jobs = []
-        for r in records:
-            job_name = r.get("job_name") or ""
-            job_skills_raw = r.get("job_skills") or []
-            matched_skill_names = [s for s in (r.get("matched_skills") or []) if s]
-
-            if not job_skills_raw:
-                continue
-
-            # 处理岗位所需技能：去重，保留每个技能的最大权重
-            job_skills_map = {}  # skill_name_lower -> {name, weight, category}
-            for item in job_skills_raw:
-                skill_name = item.get("skill", "").strip()
-                if not skill_name:
-                    continue
-                skill_name_lower = skill_name.lower()
-                weight = float(item.get("weight") or 0.0)
-                
-                if skill_name_lower not in job_skills_map:
-                    job_skills_map[skill_name_lower] = {
-                        "name": skill_name,
-                        "weight": weight,
-                        "category": item.get("category", "").strip().lower()
-                    }
-                else:
-                    # 如果同一技能有多个权重，取最大值
-                    if weight > job_skills_map[skill_name_lower]["weight"]:
-                        job_skills_map[skill_name_lower]["weight"] = weight
-
-            job_skills_list = list(job_skills_map.values())
-            n = len(job_skills_list)  # 岗位所需能力总数
-
-            if n == 0:
-                continue  # 跳过无效数据
-
-            # 计算权重总和（用于归一化）
-            total_weight = sum(s["weight"] for s in job_skills_list)
-            if total_weight == 0:
-                total_weight = 1.0  # 避免除零
-
-            # 步骤1：计算能力覆盖率得分（40分）
-            # 找出用户与岗位的交集能力
-            matched_skills_lower = {s.lower() for s in matched_skill_names}
-            intersection_skills = [
-                s for s in job_skills_list 
-                if s["name"].lower() in matched_skills_lower
-            ]
-            k = len(intersection_skills)  # 交集能力个数
-
-            if k == 0:
-                # 无交集，得分为0
-                match_percentage = 0.0
-            else:
-                # 覆盖率 = k / n
-                coverage = k / n
-                coverage_score = coverage * 40.0
-
-                # 步骤2：计算熟练度加权得分（60分）
-                weighted_sum = 0.0
-                for skill in intersection_skills:
-                    skill_name_lower = skill["name"].lower()
-                    user_level = skill_levels_lower.get(skill_name_lower, 1)  # 默认1分
-                    weight = skill["weight"]
-                    weighted_sum += user_level * weight
-
-                # 加权熟练度均值 = 加权熟练度总和 / 权重总和
-                weighted_avg = weighted_sum / total_weight
-                # 熟练度得分 = (加权熟练度均值 / 5) × 60
-                proficiency_score = (weighted_avg / 5.0) * 60.0
-
-                # 步骤3：计算最终匹配分数
-                match_percentage = round(coverage_score + proficiency_score, 2)
-                # 确保在0-100范围内
-                match_percentage = max(0.0, min(100.0, match_percentage))
-
-            # 统计硬实力/软实力数量
-            hard_count = sum(1 for s in job_skills_list if s["category"] == "hard")
-            soft_count = sum(1 for s in job_skills_list if s["category"] == "soft")
-
-            jobs.append(
-                {
-                    "job_name": job_name,
-                    "matched_skills": matched_skill_names,
-                    "match_count": k,
-                    "total_weight": total_weight,
-                    "match_percentage": match_percentage,
-                    "hard_skills_count": hard_count,
-                    "soft_skills_count": soft_count,
-                }
-            )
-
-        # 按匹配分数降序排序
-        jobs.sort(key=lambda x: x["match_percentage"], reverse=True)
-
         return {
             "success": True,
             "jobs": jobs,
+            "total": total,
+            "offset": req.offset,
             "input_skills": input_skills_raw,
             "input_skills_count": len(input_skills_raw),
         }
@@ -398,230 +1048,439 @@ def query_skills_to_jobs(req: SkillsToJobsRequest):
         raise HTTPException(status_code=500, detail=f"技能→岗位查询失败: {e}")
 
 
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """技能→岗位结果缓存的命中 / 未命中 / 淘汰计数、共享快照的代信息、请求合并次数以及目录类接口的 304 次数"""
+    return {
+        "success": True,
+        "cache": result_cache.stats(),
+        "shared_snapshot": shared_snapshots.stats() if shared_snapshots is not None else None,
+        "reloader": snapshot_reloader.stats(),
+        "scoring_mode": KG_SCORING_MODE,
+        "scoring": _scoring_summary(),
+        "single_flight": flights.stats(),
+        "catalog": catalog_cache.stats(),
+    }
+
+
+@app.get("/api/neo4j/stats")
+async def neo4j_stats():
+    """
+    Neo4j 访问统计，用于确定连接池大小：
+    正在使用 / 等待连接的会话数及峰值、获取连接的平均 / 最大等待时间、重试与超时次数。
+    async 为请求处理路径，sync 为后台快照重建。
+    """
+    return {
+        "success": True,
+        "settings": KG_NEO4J_SETTINGS.as_dict(),
+        "max_concurrent_queries": KG_MAX_CONCURRENT_QUERIES,
+        "async": async_db.stats.snapshot() if async_db is not None else None,
+        "sync": db.stats.snapshot() if db is not None else None,
+    }
+
+
+# ==================== 管理接口 ====================
+
+
+@app.post("/api/admin/reload")
+async def admin_reload(force: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """
+    立即检查图谱版本号并在后台重建快照。
+
+    force=true 时即使版本号未变化也重建（如手动修改了图谱数据）。
+    重建在后台进行，接口立即返回；进度见返回的 reloader 状态或 /api/cache/stats。
+    """
+    if KG_ADMIN_TOKEN and x_admin_token != KG_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="管理令牌无效")
+    try:
+        version = graph_version.observe(await fetch_graph_version())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"读取图谱版本号失败: {e}")
+    started = snapshot_reloader.trigger(force=force)
+    return {
+        "success": True,
+        "started": started,
+        "graph_version": version,
+        "reloader": snapshot_reloader.stats(),
+    }
+
+
+@app.post("/api/admin/title-key-index")
+async def admin_title_key_index(x_admin_token: Optional[str] = Header(None)):
+    """
+    创建 Page.titleKey 索引并回填缺失 / 过期的 titleKey。
+
+    这是写操作，查询接口不会自动执行；导入新岗位后调用一次，之后按名称查询岗位技能走索引查找。
+    """
+    if KG_ADMIN_TOKEN and x_admin_token != KG_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="管理令牌无效")
+    if KG_ARTIFACT_PATH:
+        raise HTTPException(status_code=400, detail="产物模式下岗位技能从产物读取，不需要 Page.titleKey 索引")
+    try:
+        updated = await ensure_title_key_index()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"创建 Page.titleKey 索引失败: {e}")
+    return {"success": True, "updated": updated}
+
+
+# ==================== 批量技能 -> 岗位匹配 ====================
+
+
+def _prepare_batch(snapshot: SkillJobSnapshot, profiles: List[Any]):
+    """规范化每个画像的技能输入并构造查询向量，返回 (规范化结果列表, 查询向量列表)"""
+    prepared = [_normalize_skills_input(p.skills, p.skill_levels) for p in profiles]
+    queries = [
+        _build_skill_query(snapshot, skills_lower, levels_lower)
+        for _, skills_lower, levels_lower in prepared
+    ]
+    return prepared, queries
+
+
+@app.post("/api/batch/query-skills-to-jobs")
+async def batch_query_skills_to_jobs(req: BatchSkillsToJobsRequest):
+    """
+    批量匹配多个用户画像（结构同 Backend/data/profiles.json 中的 skills）。
+
+    所有画像一次性组成 画像×技能 矩阵，与 技能×岗位 矩阵分块相乘；
+    结果以 NDJSON 流式返回，每行对应一个画像（顺序与请求一致）。
+    """
+    if not req.profiles:
+        raise HTTPException(status_code=400, detail="至少需要一个画像")
+    _check_paging(req.top_k, 0)
+
+    try:
+        snapshot = await get_snapshot_async()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"技能→岗位查询失败: {e}")
+
+    # 规范化输入、构造查询向量在线程池中执行；
+    # 同步生成器由 StreamingResponse 在线程池中迭代，矩阵相乘与打分同样不占用事件循环
+    prepared, queries = await run_in_threadpool(_prepare_batch, snapshot, req.profiles)
+
+    def generate():
+        results = snapshot.match_many(queries, positive_only=False)
+        for idx, (profile, (raw, _, _), result) in enumerate(zip(req.profiles, prepared, results)):
+            jobs, total = _score_jobs(snapshot, result, req.top_k, 0, req.min_score) if raw else ([], 0)
+            line = {
+                "index": idx,
+                "id": profile.id,
+                "success": bool(raw),
+                "jobs": jobs,
+                "total": total,
+                "input_skills": raw,
+                "input_skills_count": len(raw),
+            }
+            if not raw:
+                line["message"] = "至少需要一个有效技能"
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 # ==================== 岗位列表（知识图谱） ====================
 
 
 @app.get("/api/jobs")
-def list_jobs():
+async def list_jobs(request: Request):
     """
     返回图谱中的岗位列表。
     这里只返回基础信息，具体岗位详情由 MySQL 提供。
     """
     try:
-        # 使用 Page 作为岗位大类
-        records = run_query(
-            """
-            MATCH (p:Page)
-            WITH coalesce(p.pageName, p.name) AS title
-            WHERE title IS NOT NULL AND title <> ''
-            RETURN DISTINCT title
-            ORDER BY title
-            """
-        )
-
-        jobs = [
-            {
-                "id": f"kg_{idx}",
-                "title": r.get("title") or "未命名岗位",
-            }
-            for idx, r in enumerate(records)
-        ]
-
-        return {"success": True, "jobs": jobs}
+        return await _catalog_response(request, "jobs", _jobs_payload)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取岗位列表失败: {e}")
 
 
+async def _job_records() -> List[Dict[str, Any]]:
+    # 使用 Page 作为岗位大类
+    if KG_ARTIFACT_PATH:
+        return [{"title": title} for title in sorted((await get_snapshot_async()).job_names)]
+    return await run_query_async(
+        """
+        MATCH (p:Page)
+        WITH coalesce(p.pageName, p.name) AS title
+        WHERE title IS NOT NULL AND title <> ''
+        RETURN DISTINCT title
+        ORDER BY title
+        """
+    )
+
+
+def _job_items(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"kg_{idx}",
+            "title": r.get("title") or "未命名岗位",
+        }
+        for idx, r in enumerate(records)
+    ]
+
+
+async def _jobs_payload() -> Dict[str, Any]:
+    """/api/jobs 的响应内容"""
+    return {"success": True, "jobs": _job_items(await _job_records())}
+
+
 @app.get("/api/domains")
-def list_domains():
+async def list_domains(request: Request):
     """
     兼容旧版接口：返回岗位大类（这里与 /api/jobs 相同结构）。
     """
-    jobs_resp = list_jobs()
+    try:
+        return await _catalog_response(request, "domains", _domains_payload)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取岗位列表失败: {e}")
+
+
+async def _domains_payload() -> Dict[str, Any]:
     # 旧接口字段名为 domains
-    return {"success": True, "domains": jobs_resp.get("jobs", [])}
+    return {"success": True, "domains": _job_items(await _job_records())}
 
 # ==================== Page 列表接口 ====================
 @app.get("/api/pages")
-def list_pages():
+async def list_pages(request: Request):
     """
     返回图谱中的 Page 节点列表（岗位大类），适配前端 /api/kg/pages 调用需求
     核心修复：同时返回数字ID和elementId，兼容新旧调用链路
     """
     try:
-        records = run_query(
-            """
-            MATCH (p:Page)
-            WITH coalesce(p.pageName, p.name) AS page_name, 
-                 id(p) AS page_id, 
-                 elementId(p) AS element_id
-            WHERE page_name IS NOT NULL AND page_name <> ''
-            RETURN DISTINCT page_id, element_id, page_name
-            ORDER BY page_name
-            """
-        )
-
-        pages = [
-            {
-                "id": str(r.get("page_id")),          # 数字ID（兼容原有前端）
-                "element_id": r.get("element_id"),    # elementId（兼容新逻辑）
-                "name": r.get("page_name") or "未命名分类",
-            }
-            for r in records
-        ]
-
-        return {"success": True, "pages": pages}
+        return await _catalog_response(request, "pages", _pages_payload)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取 Page 列表失败: {e}")
+
+
+async def _pages_payload() -> Dict[str, Any]:
+    """/api/pages 的响应内容"""
+    records = await run_query_async(
+        """
+        MATCH (p:Page)
+        WITH coalesce(p.pageName, p.name) AS page_name, 
+             id(p) AS page_id, 
+             elementId(p) AS element_id
+        WHERE page_name IS NOT NULL AND page_name <> ''
+        RETURN DISTINCT page_id, element_id, page_name
+        ORDER BY page_name
+        """
+    )
+
+    pages = [
+        {
+            "id": str(r.get("page_id")),          # 数字ID（兼容原有前端）
+            "element_id": r.get("element_id"),    # elementId（兼容新逻辑）
+            "name": r.get("page_name") or "未命名分类",
+        }
+        for r in records
+    ]
+
+    return {"success": True, "pages": pages}
     
 # ==================== 图谱可视化接口 ====================
+
+GRAPH_VIZ_QUERY = """
+MATCH (p:Page)-[r1:HAS_CATEGORY]->(c:Category)-[r2:HAS_SKILL]->(s:Skill)
+WHERE {page_filter}
+RETURN 
+    id(p) AS page_id, 
+    elementId(p) AS element_id,
+    p.pageName AS page_name,
+    p.name AS page_alt_name,
+    id(c) AS category_id,
+    elementId(c) AS category_element_id,
+    c.name AS category_name, 
+    c.type AS category_type,
+    id(s) AS skill_id,
+    elementId(s) AS skill_element_id,
+    s.name AS skill_name,
+    r1.weight AS r1_weight, 
+    r2.weight AS r2_weight
+"""
+
+# 按 Page 缓存构建好的子图（图谱版本号变化时整体失效）
+graph_viz_cache = ResultCache(KG_VIZ_CACHE_SIZE, KG_CACHE_TTL, graph_version.current)
+
+
+def _build_page_graph(records: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    把查询结果整理为 Page -> 类别 -> 技能 的层级结构（缓存的内容，构建后不再修改）。
+
+    边 ID 由两端节点的 elementId 确定：同一对节点在任意请求、任意 worker 中得到相同的 ID，
+    每个 Page→Category 边只出现一次（查询结果中它随每个技能行重复出现）。
+    """
+    if not records:
+        return None
+
+    # 处理Page节点（统一用数字ID显示，兼容前端）
+    page_data = records[0]
+    page_display_id = str(page_data["page_id"])
+    page_node = {
+        "id": page_display_id,
+        "label": page_data["page_name"] or page_data["page_alt_name"] or '未命名岗位大类',
+        "type": "Page",
+        "element_id": page_data["element_id"]  # 保留elementId备用
+    }
+
+    categories: Dict[str, Dict[str, Any]] = {}
+    for r in records:
+        cat_display_id = str(r["category_id"])
+        category = categories.get(cat_display_id)
+        if category is None:
+            category = categories[cat_display_id] = {
+                "node": {
+                    "id": cat_display_id,
+                    "label": r["category_name"] or '未命名类别',
+                    "type": "Category",
+                    "category_type": r["category_type"] or "",
+                    "element_id": r["category_element_id"]
+                },
+                "edge": {
+                    "id": f"r1_{page_data['element_id']}_{r['category_element_id']}",
+                    "from": page_display_id,
+                    "to": cat_display_id,
+                    "type": "HAS_CATEGORY",
+                    "label": str(r["r1_weight"] or 0),
+                    "properties": {"weight": r["r1_weight"] or 0}
+                },
+                "skills": {},
+            }
+
+        skill_display_id = str(r["skill_id"])
+        if skill_display_id in category["skills"]:
+            continue
+        category["skills"][skill_display_id] = (
+            {
+                "id": skill_display_id,
+                "label": r["skill_name"] or '未命名技能',
+                "type": "Skill",
+                "element_id": r["skill_element_id"]
+            },
+            {
+                "id": f"r2_{r['category_element_id']}_{r['skill_element_id']}",
+                "from": cat_display_id,
+                "to": skill_display_id,
+                "type": "HAS_SKILL",
+                "label": str(r["r2_weight"] or 0),
+                "properties": {"weight": r["r2_weight"] or 0}
+            },
+        )
+
+    # 类别内技能按权重从高到低排列，概要模式取前 N 个
+    for category in categories.values():
+        category["skills"] = sorted(
+            category["skills"].values(),
+            key=lambda item: (-float(item[1]["properties"]["weight"]), item[0]["label"]),
+        )
+    return {"page": page_node, "categories": categories}
+
+
+def _find_category(page_graph: Dict[str, Any], category_id: str) -> Optional[Dict[str, Any]]:
+    """按数字ID或elementId查找类别"""
+    category = page_graph["categories"].get(category_id)
+    if category is not None:
+        return category
+    for category in page_graph["categories"].values():
+        if category["node"]["element_id"] == category_id:
+            return category
+    return None
+
+
 @app.post("/api/graph-visualization")
-def get_graph_visualization(
+async def get_graph_visualization(
     page_id: Optional[str] = Body(None, embed=True),
-    element_id: Optional[str] = Body(None, embed=True)
+    element_id: Optional[str] = Body(None, embed=True),
+    detail: str = Body("full", embed=True),
+    top_n: Optional[int] = Body(None, embed=True),
+    expand_category: Optional[str] = Body(None, embed=True),
 ):
     """
     根据Page ID查询图谱节点和关系，返回vis-network兼容格式
     核心修复：
     1. 同时支持数字page_id和element_id查询（无需改动前端）
     2. 消除Neo4j废弃警告
-    3. 边ID唯一化，避免重复
+    3. 边ID由两端节点的elementId确定，同一条边在每次请求中ID相同，可直接用于前端增量更新
     4. 节点名称兼容，减少"未命名"
+
+    detail:
+    - full（默认）：Page、全部类别与技能
+    - summary：Page、全部类别以及每个类别中权重最高的 top_n 个技能（默认 KG_VIZ_TOP_N），
+      类别节点的 hidden_skills 为未展示的技能数
+    expand_category: 只返回该类别（数字ID或elementId）的全部技能节点与边，用于概要模式下按需展开
+
+    每个 Page 的子图按图谱版本缓存，同一 Page 的不同模式共用一份。
     """
+    # 1. 校验参数（至少传一个ID）
+    if not page_id and not element_id:
+        raise HTTPException(status_code=400, detail="必须传入page_id或element_id")
+    if detail not in ("full", "summary"):
+        raise HTTPException(status_code=400, detail="detail 必须是 full 或 summary")
+    if top_n is not None and top_n < 0:
+        raise HTTPException(status_code=400, detail="top_n 不能为负数")
+
+    # 2. 构建查询条件（兼容数字ID和elementId）
+    if page_id and page_id.isdigit():
+        # 数字ID查询（原有链路）
+        query = GRAPH_VIZ_QUERY.format(page_filter="id(p) = $page_id")
+        query_params = {"page_id": int(page_id)}
+    elif element_id:
+        # elementId查询（新链路）
+        query = GRAPH_VIZ_QUERY.format(page_filter="elementId(p) = $element_id")
+        query_params = {"element_id": element_id}
+    else:
+        raise HTTPException(status_code=400, detail="page_id必须是数字或传入有效的element_id")
+
     try:
-        # 1. 校验参数（至少传一个ID）
-        if not page_id and not element_id:
-            raise HTTPException(status_code=400, detail="必须传入page_id或element_id")
-        
-        # 2. 构建查询条件（兼容数字ID和elementId）
-        query_params = {}
-        if page_id and page_id.isdigit():
-            # 数字ID查询（原有链路）
-            query = """
-                MATCH (p:Page)-[r1:HAS_CATEGORY]->(c:Category)-[r2:HAS_SKILL]->(s:Skill)
-                WHERE id(p) = $page_id
-                RETURN 
-                    id(p) AS page_id, 
-                    elementId(p) AS element_id,
-                    p.pageName AS page_name,
-                    p.name AS page_alt_name,
-                    id(c) AS category_id,
-                    elementId(c) AS category_element_id,
-                    c.name AS category_name, 
-                    c.type AS category_type,
-                    id(s) AS skill_id,
-                    elementId(s) AS skill_element_id,
-                    s.name AS skill_name,
-                    r1.weight AS r1_weight, 
-                    r2.weight AS r2_weight
-            """
-            query_params["page_id"] = int(page_id)
-        elif element_id:
-            # elementId查询（新链路）
-            query = """
-                MATCH (p:Page)-[r1:HAS_CATEGORY]->(c:Category)-[r2:HAS_SKILL]->(s:Skill)
-                WHERE elementId(p) = $element_id
-                RETURN 
-                    id(p) AS page_id, 
-                    elementId(p) AS element_id,
-                    p.pageName AS page_name,
-                    p.name AS page_alt_name,
-                    id(c) AS category_id,
-                    elementId(c) AS category_element_id,
-                    c.name AS category_name, 
-                    c.type AS category_type,
-                    id(s) AS skill_id,
-                    elementId(s) AS skill_element_id,
-                    s.name AS skill_name,
-                    r1.weight AS r1_weight, 
-                    r2.weight AS r2_weight
-            """
-            query_params["element_id"] = element_id
-        else:
-            raise HTTPException(status_code=400, detail="page_id必须是数字或传入有效的element_id")
-        
-        # 3. 执行查询
-        records = run_query(query, query_params)
-
-        # 4. 构建节点和边（去重+名称兼容）
-        nodes = []
-        edges = []
-        nodeMap = {}  # 节点去重：id -> node
-        edgeMap = {}  # 边去重：id -> edge
-
-        if records:
-            # 处理Page节点
-            page_data = records[0]
-            page_display_id = str(page_data["page_id"])  # 统一用数字ID显示（兼容前端）
-            pageName = page_data["page_name"] or page_data["page_alt_name"] or '未命名岗位大类'
-            
-            nodeMap[page_display_id] = {
-                "id": page_display_id,
-                "label": pageName,
-                "type": "Page",
-                "element_id": page_data["element_id"]  # 保留elementId备用
-            }
+        # 3. 执行查询（按 Page 缓存；同时到达的相同请求只查询一次）
+        cache_key = ("graph_viz",) + tuple(sorted(query_params.items()))
 
-            # 遍历Category和Skill
-            for r in records:
-                # 处理Category节点
-                cat_display_id = str(r["category_id"])
-                catName = r["category_name"] or '未命名类别'
-                if cat_display_id not in nodeMap:
-                    nodeMap[cat_display_id] = {
-                        "id": cat_display_id,
-                        "label": catName,
-                        "type": "Category",
-                        "category_type": r["category_type"] or "",
-                        "element_id": r["category_element_id"]
-                    }
-
-                # 处理Skill节点
-                skill_display_id = str(r["skill_id"])
-                skillName = r["skill_name"] or '未命名技能'
-                if skill_display_id not in nodeMap:
-                    nodeMap[skill_display_id] = {
-                        "id": skill_display_id,
-                        "label": skillName,
-                        "type": "Skill",
-                        "element_id": r["skill_element_id"]
-                    }
-
-                # 处理Page->Category边（唯一ID+去重）
-                edge1Id = f"r1_{page_display_id}_{cat_display_id}_{str(uuid.uuid4())[:4]}"
-                if edge1Id not in edgeMap:
-                    edgeMap[edge1Id] = {
-                        "id": edge1Id,
-                        "from": page_display_id,
-                        "to": cat_display_id,
-                        "type": "HAS_CATEGORY",
-                        "label": str(r["r1_weight"] or 0),
-                        "properties": {"weight": r["r1_weight"] or 0}
-                    }
-
-                # 处理Category->Skill边（唯一ID+去重）
-                edge2Id = f"r2_{cat_display_id}_{skill_display_id}_{str(uuid.uuid4())[:4]}"
-                if edge2Id not in edgeMap:
-                    edgeMap[edge2Id] = {
-                        "id": edge2Id,
-                        "from": cat_display_id,
-                        "to": skill_display_id,
-                        "type": "HAS_SKILL",
-                        "label": str(r["r2_weight"] or 0),
-                        "properties": {"weight": r["r2_weight"] or 0}
-                    }
-
-        # 转换为列表（确保无重复）
-        nodes = list(nodeMap.values())
-        edges = list(edgeMap.values())
+        async def compute():
+            return _build_page_graph(await run_query_async(query, query_params))
 
+        page_graph = await graph_viz_cache.get_or_compute_async(
+            cache_key, lambda: flights.do(cache_key, compute)
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"图谱查询失败: {str(e)}")
+
+    # 4. 按模式组装节点和边（同一技能可能属于多个类别，节点按ID去重）
+    nodeMap: Dict[str, Dict[str, Any]] = {}
+    edges: List[Dict[str, Any]] = []
+
+    if expand_category is not None:
+        category = _find_category(page_graph, expand_category) if page_graph else None
+        if category is None:
+            raise HTTPException(status_code=404, detail=f"类别不存在: {expand_category}")
+        for skill_node, skill_edge in category["skills"]:
+            nodeMap[skill_node["id"]] = skill_node
+            edges.append(skill_edge)
         return {
             "success": True,
-            "nodes": nodes,
+            "category_id": category["node"]["id"],
+            "nodes": list(nodeMap.values()),
             "edges": edges
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"图谱查询失败: {str(e)}")
+
+    if page_graph:
+        limit = (KG_VIZ_TOP_N if top_n is None else top_n) if detail == "summary" else None
+        page_node = page_graph["page"]
+        nodeMap[page_node["id"]] = page_node
+        for category in page_graph["categories"].values():
+            skills = category["skills"] if limit is None else category["skills"][:limit]
+            cat_node = category["node"]
+            if limit is not None:
+                # 缓存中的节点是共享的，不能原地修改
+                cat_node = {**cat_node, "hidden_skills": len(category["skills"]) - len(skills)}
+            nodeMap[cat_node["id"]] = cat_node
+            edges.append(category["edge"])
+            for skill_node, skill_edge in skills:
+                nodeMap.setdefault(skill_node["id"], skill_node)
+                edges.append(skill_edge)
+
+    return {
+        "success": True,
+        "detail": detail,
+        "nodes": list(nodeMap.values()),
+        "edges": edges
+    }
 
 if __name__ == "__main__":
     import uvicorn
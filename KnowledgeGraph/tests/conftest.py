@@ -0,0 +1,49 @@
+"""
+测试公共配置：把 KnowledgeGraph 目录加入 sys.path，
+与 main.py / app.py 一样以 abilityToJob.* / common.* 导入。
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def main_client(monkeypatch):
+    """
+    main.py 的测试客户端：不进入 lifespan（不连接 Neo4j），
+    请求使用的快照由 serve(snapshot) 指定。
+    """
+    from fastapi.testclient import TestClient
+
+    import main
+
+    def serve(snapshot):
+        async def get_snapshot_async():
+            return snapshot
+
+        monkeypatch.setattr(main, "get_snapshot_async", get_snapshot_async)
+        main.result_cache.clear()
+        return TestClient(main.app)
+
+    return serve
+
+
+@pytest.fixture
+def app_client(monkeypatch):
+    """
+    app.py（Flask）的测试客户端：把 graph 替换为占位对象（不连接 Neo4j），
+    请求使用的快照由 serve(snapshot) 指定。
+    """
+    import app
+
+    def serve(snapshot):
+        monkeypatch.setattr(app, "graph", object())
+        monkeypatch.setattr(app, "get_snapshot", lambda: snapshot)
+        app.result_cache.clear()
+        return app.app.test_client()
+
+    return serve
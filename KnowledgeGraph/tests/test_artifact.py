@@ -0,0 +1,167 @@
+"""
+编译产物（.kgsnap）的保存 / 加载与数据模型检查
+"""
+
+import numpy as np
+import pytest
+
+from abilityToJob import artifact
+from abilityToJob.shared_snapshot import SharedSnapshotStore
+from abilityToJob.snapshot import SkillJobSnapshot
+from jobToAbility.build_knowledge_graph import compile_artifact
+
+from test_snapshot import random_edges
+
+
+def test_round_trip_preserves_arrays_and_names(tmp_path):
+    snapshot = SkillJobSnapshot.from_edges(random_edges(4) + [("岗位", "数据分析", 3, "硬实力")], dedupe=True)
+    path = str(tmp_path / "snap.kgsnap")
+    artifact.save_snapshot(snapshot, path, meta={"graph_version": 7, "schema": artifact.SCHEMA_PAGE})
+
+    loaded, header = artifact.load_snapshot(path)
+    assert header["meta"] == {"graph_version": 7, "schema": artifact.SCHEMA_PAGE}
+    assert (header["num_jobs"], header["num_skills"], header["nnz"]) == (snapshot.num_jobs, snapshot.num_skills, snapshot.nnz)
+    assert loaded.job_names == snapshot.job_names
+    assert loaded.skill_names == snapshot.skill_names
+    for name, array in snapshot.to_arrays().items():
+        np.testing.assert_array_equal(getattr(loaded, name), array)
+        # 数值数组是 mmap 上的只读视图
+        assert not getattr(loaded, name).flags.writeable
+
+    query = {0: 2.0, 5: 1.0}
+    np.testing.assert_array_equal(loaded.match(query).scores, snapshot.match(query).scores)
+    assert artifact.read_header(path)["meta"]["graph_version"] == 7
+
+
+def test_rejects_bad_magic(tmp_path):
+    path = tmp_path / "bad.kgsnap"
+    path.write_bytes(b"NOTASNAP" + b"\0" * 16)
+    with pytest.raises(ValueError):
+        artifact.read_header(str(path))
+
+
+def test_schema_check(tmp_path):
+    snapshot = SkillJobSnapshot.from_edges(random_edges(5))
+    legacy = str(tmp_path / "legacy.kgsnap")
+    page = str(tmp_path / "page.kgsnap")
+    artifact.save_snapshot(snapshot, legacy, meta={"graph_version": 1})
+    artifact.save_snapshot(snapshot, page, meta={"schema": artifact.SCHEMA_PAGE})
+
+    # 没有 schema 字段的早期产物按 领域 模型处理
+    assert artifact.artifact_schema(artifact.read_header(legacy)) == artifact.SCHEMA_DOMAIN
+    artifact.load_snapshot(legacy, schema=artifact.SCHEMA_DOMAIN)
+    artifact.load_snapshot(page, schema=artifact.SCHEMA_PAGE)
+    with pytest.raises(ValueError, match="Domain"):
+        artifact.read_header(legacy, schema=artifact.SCHEMA_PAGE)
+    with pytest.raises(ValueError, match="Page"):
+        artifact.load_snapshot(page, schema=artifact.SCHEMA_DOMAIN)
+
+
+def test_compile_artifact_is_deduplicated_domain_model(tmp_path):
+    path = str(tmp_path / "kg.kgsnap")
+    header = compile_artifact({
+        "数据分析": [("硬实力", "Python", 3), ("软实力", "python ", 5), ("硬实力", "SQL", 2)],
+        "产品经理": [("软实力", "沟通", 4)],
+    }, path, graph_version=3)
+    assert header["meta"]["schema"] == artifact.SCHEMA_DOMAIN
+    assert header["meta"]["graph_version"] == 3
+
+    snapshot, _ = artifact.load_snapshot(path, schema=artifact.SCHEMA_DOMAIN)
+    assert not snapshot.has_duplicate_entries()
+    assert snapshot.nnz == 3
+    assert snapshot.job_total_weights.tolist() == [7.0, 4.0]
+
+
+def test_main_rejects_domain_artifact(tmp_path, monkeypatch):
+    import main
+
+    path = str(tmp_path / "kg.kgsnap")
+    compile_artifact({"数据分析": [("硬实力", "Python", 3)]}, path)
+    monkeypatch.setattr(main, "KG_ARTIFACT_PATH", path)
+    with pytest.raises(ValueError, match="Page"):
+        main.load_snapshot()
+
+
+def test_shared_store_ignores_other_schema(tmp_path):
+    snapshot = SkillJobSnapshot.from_edges(random_edges(6), dedupe=True)
+    page_store = SharedSnapshotStore(str(tmp_path), artifact.SCHEMA_PAGE)
+    page_store.get(1, lambda: snapshot)
+
+    builds = []
+    domain_store = SharedSnapshotStore(str(tmp_path), artifact.SCHEMA_DOMAIN)
+    _, built = domain_store.get(1, lambda: builds.append(1) or snapshot)
+    assert built and builds == [1]
+    assert artifact.read_header(str(tmp_path / "gen-2.kgsnap"), schema=artifact.SCHEMA_DOMAIN)
+
+
+def test_content_hash_tracks_edges_only():
+    edges = random_edges(7)
+    snapshot = SkillJobSnapshot.from_edges(edges, dedupe=True)
+    digest = artifact.content_hash(snapshot)
+    assert artifact.content_hash(SkillJobSnapshot.from_edges(edges, dedupe=True)) == digest
+    # 与数据源中的行序（岗位 / 技能 ID 的分配顺序）无关
+    rows = [("A", "Python", 3, "hard"), ("A", "SQL", 1, "hard"), ("B", "沟通", 2, "soft"), ("B", "SQL", 4, "hard")]
+    assert (artifact.content_hash(SkillJobSnapshot.from_edges(rows))
+            == artifact.content_hash(SkillJobSnapshot.from_edges(rows[::-1])))
+    # 相似岗位表等派生数据不影响内容哈希
+    snapshot.job_similarity(5)
+    assert artifact.content_hash(snapshot) == digest
+
+    job, skill, weight, category = edges[0]
+    changed = [(job, skill, float(weight) + 1, category)] + edges[1:]
+    assert artifact.content_hash(SkillJobSnapshot.from_edges(changed, dedupe=True)) != digest
+    renamed = [("另一个岗位", skill, weight, category)] + edges[1:]
+    assert artifact.content_hash(SkillJobSnapshot.from_edges(renamed, dedupe=True)) != digest
+
+
+def test_artifact_version_uses_build_stamp(tmp_path):
+    snapshot = SkillJobSnapshot.from_edges(random_edges(8))
+    legacy = str(tmp_path / "legacy.kgsnap")
+    artifact.save_snapshot(snapshot, legacy, meta={"graph_version": 4})
+    assert artifact.artifact_version(artifact.read_header(legacy)) == 4
+
+    stamped = str(tmp_path / "stamped.kgsnap")
+    artifact.save_snapshot(snapshot, stamped, meta={"graph_version": 0, "build_stamp": 123})
+    assert artifact.artifact_version(artifact.read_header(stamped)) == 123
+
+
+def test_recompiling_changes_version_only_when_content_changes(tmp_path):
+    path = str(tmp_path / "kg.kgsnap")
+    skills = {"数据分析": [("硬实力", "Python", 3), ("软实力", "沟通", 1)]}
+    first = compile_artifact(skills, path)
+    version = artifact.artifact_version(first)
+    assert version > 0 and first["meta"]["graph_version"] == 0
+
+    # 内容相同：不重写文件，版本不变
+    mtime = (tmp_path / "kg.kgsnap").stat().st_mtime_ns
+    again = compile_artifact({"数据分析": list(reversed(skills["数据分析"]))}, path)
+    assert artifact.artifact_version(again) == version
+    assert (tmp_path / "kg.kgsnap").stat().st_mtime_ns == mtime
+
+    # 内容变化（只编译产物时图谱版本号仍为 0）：时间戳递增
+    changed = compile_artifact({"数据分析": [("硬实力", "Python", 4), ("软实力", "沟通", 1)]}, path)
+    assert changed["meta"]["graph_version"] == 0
+    assert artifact.artifact_version(changed) > version
+    assert artifact.artifact_version(artifact.read_header(path)) == artifact.artifact_version(changed)
+
+
+def test_services_notice_rebuilt_artifact(tmp_path, monkeypatch):
+    import asyncio
+
+    import app
+    import main
+    from jobToAbility.build_knowledge_graph import write_artifact
+
+    page = str(tmp_path / "page.kgsnap")
+    domain = str(tmp_path / "domain.kgsnap")
+    monkeypatch.setattr(main, "KG_ARTIFACT_PATH", page)
+    monkeypatch.setattr(app, "ARTIFACT_PATH", domain)
+
+    versions = []
+    for weight in (3, 3, 5):
+        edges = [("数据分析", "Python", weight, "hard")]
+        write_artifact(SkillJobSnapshot.from_edges(edges, dedupe=True), page, artifact.SCHEMA_PAGE)
+        compile_artifact({"数据分析": [("硬实力", "Python", weight)]}, domain)
+        versions.append((asyncio.run(main.fetch_graph_version()), app._fetch_graph_version()))
+    assert versions[0] == versions[1]
+    assert versions[2][0] > versions[1][0] and versions[2][1] > versions[1][1]
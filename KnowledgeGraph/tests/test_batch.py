@@ -0,0 +1,116 @@
+"""
+批量匹配与逐个匹配的一致性
+
+同一组画像批量匹配（match_many / match_skills_to_jobs_batch / 批量接口）
+与逐个调用单次匹配的结果必须完全一致。
+"""
+
+import json
+import random
+
+import numpy as np
+import pytest
+
+from abilityToJob.matcher import match_skills_to_jobs, match_skills_to_jobs_batch
+from abilityToJob.snapshot import SkillJobSnapshot
+
+from test_snapshot import random_edges
+
+
+def random_profiles(seed, count=30):
+    rng = random.Random(seed)
+    names = [f"skill{i}" for i in range(60)] + ["skil1", "未知技能", ""]
+    profiles = []
+    for _ in range(count):
+        skills = rng.sample(names, rng.randint(0, 8))
+        levels = {s: rng.randint(1, 5) for s in skills if s and rng.random() < 0.5}
+        profiles.append((skills, levels))
+    return profiles
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 512])
+def test_match_many_equals_match(chunk_size):
+    snapshot = SkillJobSnapshot.from_edges(random_edges(1))
+    rng = np.random.RandomState(1)
+    queries = [
+        {int(sid): float(rng.randint(1, 6)) for sid in rng.choice(snapshot.num_skills, rng.randint(0, 6), replace=False)}
+        for _ in range(25)
+    ]
+    for query, batched in zip(queries, snapshot.match_many(queries, chunk_size=chunk_size)):
+        single = snapshot.match(query)
+        for field in ("jobs", "match_counts", "scores", "matched_weights",
+                      "entry_job_pos", "entry_skills", "entry_weights", "entry_categories"):
+            np.testing.assert_array_equal(getattr(batched, field), getattr(single, field))
+
+
+@pytest.mark.parametrize("top_k, min_score", [(None, 0), (3, 0), (5, 40)])
+def test_matcher_batch_equals_single(top_k, min_score):
+    snapshot = SkillJobSnapshot.from_edges(random_edges(2))
+    profiles = random_profiles(2)
+
+    batched = list(match_skills_to_jobs_batch(
+        None, [skills for skills, _ in profiles], [levels for _, levels in profiles],
+        snapshot=snapshot, top_k=top_k, min_score=min_score,
+    ))
+    assert len(batched) == len(profiles)
+    for (skills, levels), result in zip(profiles, batched):
+        single = match_skills_to_jobs(None, skills, snapshot=snapshot, skill_levels=levels,
+                                      top_k=top_k, min_score=min_score)
+        assert result == single
+
+
+def test_batch_endpoint_equals_single_endpoint(main_client):
+    snapshot = SkillJobSnapshot.from_edges(random_edges(3), dedupe=True)
+    client = main_client(snapshot)
+    profiles = random_profiles(3, count=12)
+
+    response = client.post("/api/batch/query-skills-to-jobs", json={
+        "profiles": [{"id": str(i), "skills": s, "skill_levels": l} for i, (s, l) in enumerate(profiles)],
+        "top_k": 5,
+    })
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines] == list(range(len(profiles)))
+
+    for (skills, levels), line in zip(profiles, lines):
+        single = client.post("/api/query-skills-to-jobs", json={
+            "skills": skills, "skill_levels": levels, "top_k": 5,
+        })
+        if not any(s.strip() for s in skills):
+            assert not line["success"] and single.status_code == 400
+            continue
+        body = single.json()
+        assert line["success"]
+        assert line["jobs"] == body["jobs"]
+        assert line["total"] == body["total"]
+
+
+def test_matcher_batch_rejects_mismatched_levels():
+    snapshot = SkillJobSnapshot.from_edges(random_edges(4))
+    with pytest.raises(ValueError):
+        match_skills_to_jobs_batch(None, [["skill1"], ["skill2"]], [{"skill1": 3}], snapshot=snapshot)
+
+
+def test_matcher_batch_offset_equals_single():
+    snapshot = SkillJobSnapshot.from_edges(random_edges(5))
+    profiles = random_profiles(5, count=10)
+    batched = match_skills_to_jobs_batch(
+        None, [skills for skills, _ in profiles], [levels for _, levels in profiles],
+        snapshot=snapshot, top_k=3, offset=2,
+    )
+    for (skills, levels), result in zip(profiles, batched):
+        assert result == match_skills_to_jobs(None, skills, snapshot=snapshot, skill_levels=levels,
+                                              top_k=3, offset=2)
+
+
+def test_app_batch_endpoint_applies_offset(app_client):
+    client = app_client(SkillJobSnapshot.from_edges(random_edges(6)))
+    skills = [f"skill{i}" for i in range(0, 60, 5)]
+    full = client.post("/api/query-skills-to-jobs", json={"skills": skills}).get_json()["jobs"]
+
+    response = client.post("/api/batch/query-skills-to-jobs", json={
+        "profiles": [{"id": "u1", "skills": skills}], "top_k": 3, "offset": 2,
+    })
+    [line] = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert line["jobs"] == full[2:5]
+    assert line["offset"] == 2
@@ -0,0 +1,575 @@
+"""
+构建脚本（jobToAbility/build_knowledge_graph.py）的测试
+
+不连接 Neo4j：FakeGraph 按查询文本模拟脚本用到的每一条 Cypher，
+在内存中维护 领域 -> 一级分类 -> 二级分类 的结构，并记录执行过的查询与写事务数。
+"""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from jobToAbility import build_knowledge_graph as bkg
+
+
+INDEX_SEEK_PLAN = {
+    "operatorType": "ProduceResults@neo4j",
+    "children": [{"operatorType": "NodeUniqueIndexSeek@neo4j", "children": []}],
+}
+
+LABEL_SCAN_PLAN = {
+    "operatorType": "ProduceResults@neo4j",
+    "children": [{
+        "operatorType": "Filter@neo4j",
+        "children": [{"operatorType": "NodeByLabelScan@neo4j", "children": []}],
+    }],
+}
+
+
+class FakeResult:
+    def __init__(self, rows=None, plan=None):
+        self._rows = rows or []
+        self._plan = plan
+
+    def data(self):
+        return [dict(row) for row in self._rows]
+
+    def single(self):
+        return self._rows[0] if self._rows else None
+
+    def consume(self):
+        return SimpleNamespace(plan=self._plan)
+
+
+class FakeSession:
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, parameters=None, **kwargs):
+        return self.graph.execute(query, {**(parameters or {}), **kwargs})
+
+    def execute_write(self, work):
+        self.graph.write_transactions += 1
+        return work(self)
+
+
+class FakeGraph:
+    """内存中的图谱；未知查询直接报错，避免测试悄悄漏掉新增的 Cypher"""
+
+    def __init__(self):
+        # 领域 -> {"hash", "categories", "skills": {(一级分类, 技能): 权重}}
+        self.domains = {}
+        self.queries = []
+        self.write_transactions = 0
+        self.fail_on = set()
+        self.handlers = {
+            bkg.DOMAIN_BULK_QUERY: self._merge_domains,
+            bkg.FIRST_LEVEL_BULK_QUERY: self._merge_categories,
+            bkg.SECOND_LEVEL_BULK_QUERY: self._merge_skills,
+            bkg.DOMAIN_HASH_QUERY: self._set_hashes,
+            bkg.CURRENT_DOMAINS_QUERY: self._current_domains,
+            bkg.CURRENT_SKILLS_QUERY: self._current_skills,
+            bkg.REMOVE_SKILLS_QUERY: self._remove_skills,
+            bkg.REMOVE_DOMAINS_QUERY: self._remove_domains,
+            bkg.MARK_BUILDING_QUERY: self._mark_building,
+            bkg.CLEAR_BUILDING_QUERY: self._clear_building,
+            bkg.BUMP_VERSION_QUERY: self._bump_version,
+            bkg.READ_VERSION_QUERY: self._read_version,
+            bkg.PAGE_SNAPSHOT_CYPHER: lambda params: self.page_edges,
+        }
+        # Page 模型的技能边（main.py 使用的模型，构建脚本只读取）
+        self.page_edges = []
+        self.handlers[bkg.CLEAR_ALL_BATCH_QUERY] = self._clear_all
+        for label in bkg.BUILDER_LABELS:
+            self.handlers[bkg.CLEAR_LABEL_BATCH_QUERY.format(label=label)] = (
+                lambda params, label=label: self._clear_label(label, params)
+            )
+        for name, statement in bkg.SCHEMA_STATEMENTS:
+            self.handlers[statement] = lambda params, name=name: self._create_index(name)
+        for _, probe in bkg.SCHEMA_PROBES:
+            self.handlers[probe] = None
+        self.handlers["CALL db.awaitIndexes(300)"] = lambda params: None
+        self.handlers[bkg.SHOW_INDEXES_QUERY] = self._show_indexes
+        # 索引名 -> 状态；offline 中的索引创建后停留在 POPULATING
+        self.indexes = {}
+        self.offline = set()
+        # EXPLAIN 查询 -> 执行计划（缺省为唯一索引查找）
+        self.plans = {}
+        # (:GraphVersion) 节点的属性
+        self.version = {"version": None, "building": False}
+        # 清空测试用的节点（每个节点一个标签），与 domains 相互独立
+        self.nodes = []
+
+    # ------------------------------------------------------------ 驱动接口
+
+    def session(self):
+        return FakeSession(self)
+
+    def close(self):
+        pass
+
+    def execute(self, query, params):
+        self.queries.append((query, params))
+        if query in self.fail_on:
+            raise RuntimeError("模拟的 Neo4j 错误")
+        if query not in self.handlers:
+            raise AssertionError(f"未模拟的查询: {query}")
+        if query.startswith("EXPLAIN"):
+            return FakeResult(plan=self.plans.get(query, INDEX_SEEK_PLAN))
+        return FakeResult(self.handlers[query](params))
+
+    def count(self, query):
+        return sum(1 for q, _ in self.queries if q == query)
+
+    def skills(self):
+        return {domain: dict(info["skills"]) for domain, info in self.domains.items()}
+
+    # ------------------------------------------------------------ 导入
+
+    def _merge_domains(self, params):
+        for row in params["rows"]:
+            self.domains.setdefault(row["domain"], {"hash": None, "categories": set(), "skills": {}})
+
+    def _merge_categories(self, params):
+        for row in params["rows"]:
+            if row["domain"] in self.domains:
+                self.domains[row["domain"]]["categories"].add(row["category_type"])
+
+    def _merge_skills(self, params):
+        for row in params["rows"]:
+            domain = self.domains.get(row["domain"])
+            if domain is not None and row["category_type"] in domain["categories"]:
+                domain["skills"][(row["category_type"], row["skill"])] = row["weight"]
+
+    def _set_hashes(self, params):
+        for row in params["rows"]:
+            if row["domain"] in self.domains:
+                self.domains[row["domain"]]["hash"] = row["hash"]
+
+    # ------------------------------------------------------------ 增量同步
+
+    def _current_domains(self, params):
+        return [{"domain": domain, "hash": info["hash"]} for domain, info in self.domains.items()]
+
+    def _current_skills(self, params):
+        return [
+            {"domain": domain, "category_type": category_type, "skill": skill, "weight": weight}
+            for domain in params["domains"] if domain in self.domains
+            for (category_type, skill), weight in self.domains[domain]["skills"].items()
+        ]
+
+    def _remove_skills(self, params):
+        for row in params["rows"]:
+            if row["domain"] in self.domains:
+                self.domains[row["domain"]]["skills"].pop((row["category_type"], row["skill"]), None)
+
+    def _remove_domains(self, params):
+        for row in params["rows"]:
+            self.domains.pop(row["domain"], None)
+
+    # ------------------------------------------------------------ 模式
+
+    def _create_index(self, name):
+        self.indexes[name] = "POPULATING" if name in self.offline else "ONLINE"
+
+    def _show_indexes(self, params):
+        return [
+            {"name": name, "state": state, "populationPercent": 100.0, "readCount": 0, "lastRead": None}
+            for name, state in self.indexes.items()
+        ]
+
+    # ------------------------------------------------------------ 清空
+
+    def _delete(self, match, batch_size):
+        doomed = [i for i, label in enumerate(self.nodes) if match(label)][:batch_size]
+        for i in reversed(doomed):
+            del self.nodes[i]
+        return [{"deleted": len(doomed)}]
+
+    def _clear_all(self, params):
+        return self._delete(lambda label: label != "GraphVersion", params["batch_size"])
+
+    def _clear_label(self, label, params):
+        return self._delete(lambda other: other == label, params["batch_size"])
+
+    # ------------------------------------------------------------ 版本号
+
+    def _read_version(self, params):
+        if self.version["version"] is None and not self.version["building"]:
+            return []
+        return [dict(self.version)]
+
+    def _mark_building(self, params):
+        self.version["building"] = True
+        return [{"version": self.version["version"] or 0}]
+
+    def _clear_building(self, params):
+        self.version["building"] = False
+        return [{"version": self.version["version"] or 0}]
+
+    def _bump_version(self, params):
+        self.version = {"version": (self.version["version"] or 0) + 1, "building": False}
+        return [{"version": self.version["version"]}]
+
+
+@pytest.fixture
+def graph():
+    return FakeGraph()
+
+
+@pytest.fixture
+def kg(graph):
+    kg = bkg.Neo4jKnowledgeGraph.__new__(bkg.Neo4jKnowledgeGraph)
+    kg.driver = graph
+    return kg
+
+
+SKILLS = {
+    "数据分析师": [("硬实力", "Python", 0.4), ("硬实力", "SQL", 0.3), ("软实力", "沟通", 0.2)],
+    "Java开发": [("硬实力", "Java", 0.5), ("硬实力", "Spring", 0.25), ("软实力", "沟通", 0.1)],
+}
+
+
+@pytest.mark.parametrize("rows, batch_size, expected", [(0, 3, 0), (1, 3, 1), (6, 3, 2), (7, 3, 3), (7, 100, 1)])
+def test_run_batched_chunks_rows(kg, graph, rows, batch_size, expected):
+    payload = [{"domain": f"d{i}"} for i in range(rows)]
+    assert kg._run_batched(bkg.DOMAIN_BULK_QUERY, payload, batch_size) == expected
+    assert graph.write_transactions == expected
+    # 每块一个事务，按顺序覆盖全部行，不重不漏
+    batches = [params["rows"] for _, params in graph.queries]
+    assert [len(b) for b in batches] == [min(batch_size, rows - i) for i in range(0, rows, batch_size)]
+    assert [row for batch in batches for row in batch] == payload
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 1000])
+def test_bulk_import_writes_every_skill(kg, graph, batch_size):
+    kg.bulk_import(SKILLS, batch_size)
+    assert graph.skills() == {
+        domain: {(c, s): w for c, s, w in skills} for domain, skills in SKILLS.items()
+    }
+    for domain, skills in SKILLS.items():
+        assert graph.domains[domain]["categories"] == {"硬实力", "软实力"}
+        assert graph.domains[domain]["hash"] == bkg.domain_content_hash(skills)
+
+    # 领域 2 行、一级分类 4 行、技能 6 行、哈希 2 行
+    expected = sum(-(-rows // batch_size) for rows in (2, 4, 6, 2))
+    assert graph.write_transactions == expected
+
+
+def original_read(excel_path):
+    """原实现的解析逻辑：逐个工作表 read_excel，dropna 后 iterrows 逐行过滤"""
+    import pandas as pd
+
+    result = {}
+    for sheet_name in pd.ExcelFile(excel_path).sheet_names:
+        df = pd.read_excel(excel_path, sheet_name=sheet_name)
+        skills = []
+        for category, name_col, weight_col in (("硬实力", 0, 2), ("软实力", 3, 5)):
+            name_col, weight_col = df.columns[name_col], df.columns[weight_col]
+            part = df[[name_col, weight_col]].dropna(subset=[name_col])
+            for _, row in part.iterrows():
+                skill_name = str(row[name_col]).strip()
+                weight = row[weight_col]
+                if skill_name and skill_name not in ('nan', 'None') and pd.notna(weight):
+                    skills.append((category, skill_name, float(weight)))
+        result[sheet_name] = skills
+    return result
+
+
+def test_read_excel_skills_equals_original_parsing(tmp_path):
+    import pandas as pd
+
+    path = tmp_path / "skills.xlsx"
+    nan = float("nan")
+    sheets = {
+        "数据分析师": pd.DataFrame({
+            "硬实力": ["Python", " SQL ", None, "  ", "nan", 2023, "Excel"],
+            "硬实力频次": [10, 8, 7, 6, 5, 4, 3],
+            "硬实力权重": [0.4, 0.3, 0.2, 0.1, 0.05, 0.02, nan],
+            "软实力": ["沟通", "None", "团队协作", None, None, None, None],
+            "软实力频次": [9, 1, 3, None, None, None, None],
+            "软实力权重": [0.5, 0.1, "0.25", None, None, None, None],
+        }),
+        "Java开发": pd.DataFrame({
+            "硬实力": ["Java", "Spring"],
+            "硬实力频次": [5, 4],
+            "硬实力权重": [1, 0],
+            "软实力": [None, "抗压"],
+            "软实力频次": [None, 2],
+            "软实力权重": [None, 0.3],
+        }),
+        "空工作表": pd.DataFrame(columns=["硬实力", "硬实力频次", "硬实力权重", "软实力", "软实力频次", "软实力权重"]),
+    }
+    with pd.ExcelWriter(path) as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+
+    parsed = bkg.read_excel_skills(str(path))
+    assert parsed == original_read(str(path))
+    assert list(parsed) == ["数据分析师", "Java开发", "空工作表"]
+    assert parsed["数据分析师"] == [
+        ("硬实力", "Python", 0.4), ("硬实力", "SQL", 0.3), ("硬实力", "2023", 0.02),
+        ("软实力", "沟通", 0.5), ("软实力", "团队协作", 0.25),
+    ]
+    assert parsed["空工作表"] == []
+
+
+def test_read_bundled_workbook_equals_original_parsing():
+    path = os.path.join(os.path.dirname(bkg.__file__), "职位技能权重计算结果_去重后.xlsx")
+    if not os.path.exists(path):
+        pytest.skip("仓库中没有随附的工作簿")
+    assert bkg.read_excel_skills(path) == original_read(path)
+
+
+def test_domain_content_hash_is_stable():
+    skills = SKILLS["数据分析师"]
+    digest = bkg.domain_content_hash(skills)
+    # 与技能顺序无关，重复计算结果相同
+    assert bkg.domain_content_hash(list(reversed(skills))) == digest == bkg.domain_content_hash(list(skills))
+    # 同名技能重复出现时以最后一次为准
+    assert bkg.domain_content_hash([("硬实力", "Python", 0.1)] + skills) == digest
+    # 名称、类别、权重变化都会改变哈希
+    for changed in (
+        [("硬实力", "Python3", 0.4)] + skills[1:],
+        [("软实力", "Python", 0.4)] + skills[1:],
+        [("硬实力", "Python", 0.41)] + skills[1:],
+        skills[1:],
+    ):
+        assert bkg.domain_content_hash(changed) != digest
+    # 整数与浮点权重按 float 比较
+    assert bkg.domain_content_hash([("硬实力", "Java", 1)]) == bkg.domain_content_hash([("硬实力", "Java", 1.0)])
+
+
+def test_diff_domain_skills():
+    current = {("硬实力", "Python"): 0.4, ("硬实力", "SQL"): 0.3, ("软实力", "沟通"): 0.2}
+    target = [("硬实力", "Python", 0.4 + 1e-12), ("硬实力", "SQL", 0.5), ("软实力", "抗压", 0.1)]
+    assert bkg.diff_domain_skills(current, target) == {
+        "added": [("软实力", "抗压", 0.1)],
+        "removed": [("软实力", "沟通", 0.2)],
+        "reweighted": [("硬实力", "SQL", 0.5)],
+    }
+    assert bkg.diff_domain_skills(current, [(c, s, w) for (c, s), w in current.items()]) == {
+        "added": [], "removed": [], "reweighted": [],
+    }
+
+
+def _skills_written(graph, domain):
+    return [
+        row for query, params in graph.queries
+        if query in (bkg.SECOND_LEVEL_BULK_QUERY, bkg.REMOVE_SKILLS_QUERY)
+        for row in params["rows"] if row["domain"] == domain
+    ]
+
+
+def test_sync_applies_only_the_differences(kg, graph):
+    kg.bulk_import({**SKILLS, "运维": [("硬实力", "Linux", 0.6)]}, 1000)
+    graph.queries.clear()
+
+    target = {
+        # 有变化：删除 Python、SQL 权重变化、新增 Tableau
+        "数据分析师": [("硬实力", "SQL", 0.35), ("硬实力", "Tableau", 0.15), ("软实力", "沟通", 0.2)],
+        # 未变化（顺序不同）
+        "Java开发": list(reversed(SKILLS["Java开发"])),
+        # 新增领域；运维 已从 Excel 中删除
+        "产品经理": [("软实力", "沟通", 0.6)],
+    }
+    assert kg.sync_excel_file("", batch_size=2, skills_by_domain=target) is True
+
+    assert graph.skills() == {domain: {(c, s): w for c, s, w in skills} for domain, skills in target.items()}
+    for domain, skills in target.items():
+        assert graph.domains[domain]["hash"] == bkg.domain_content_hash(skills)
+    assert graph.version["building"] is True
+
+    # 未变化的领域不读取、不写入技能边
+    assert _skills_written(graph, "Java开发") == []
+    [(_, params)] = [(q, p) for q, p in graph.queries if q == bkg.CURRENT_SKILLS_QUERY]
+    assert sorted(params["domains"]) == ["产品经理", "数据分析师"]
+    # 数据分析师 只删除 Python、只写入变化的两条
+    assert sorted(row["skill"] for row in _skills_written(graph, "数据分析师")) == ["Python", "SQL", "Tableau"]
+    [(_, params)] = [(q, p) for q, p in graph.queries if q == bkg.REMOVE_DOMAINS_QUERY]
+    assert params["rows"] == [{"domain": "运维"}]
+
+
+def test_sync_without_changes_writes_nothing(kg, graph):
+    kg.bulk_import(SKILLS, 1000)
+    graph.queries.clear()
+    graph.write_transactions = 0
+
+    assert kg.sync_excel_file("", skills_by_domain={d: list(reversed(s)) for d, s in SKILLS.items()}) is False
+    assert [q for q, _ in graph.queries] == [bkg.CURRENT_DOMAINS_QUERY]
+    assert graph.write_transactions == 0
+    assert graph.version["building"] is False
+
+
+def test_sync_rewrites_domains_imported_without_hash(kg, graph):
+    kg.bulk_import(SKILLS, 1000)
+    for info in graph.domains.values():
+        info["hash"] = None
+
+    assert kg.sync_excel_file("", skills_by_domain=SKILLS) is True
+    # 内容相同：只补写哈希，不增删技能边
+    assert graph.skills() == {domain: {(c, s): w for c, s, w in skills} for domain, skills in SKILLS.items()}
+    assert graph.count(bkg.REMOVE_SKILLS_QUERY) == 0 and graph.count(bkg.SECOND_LEVEL_BULK_QUERY) == 1
+    assert all(info["hash"] for info in graph.domains.values())
+
+
+NODES = ["领域"] * 3 + ["一级分类"] * 6 + ["二级分类"] * 25 + ["Page"] * 4 + ["GraphVersion"]
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 38, 1000])
+def test_clear_database_deletes_in_batches(kg, graph, batch_size):
+    graph.nodes = list(NODES)
+    assert kg.clear_database(batch_size=batch_size) == len(NODES) - 1
+    # 版本号节点保留，其余全部删除
+    assert graph.nodes == ["GraphVersion"]
+    # 每批一个写事务，最后一批删除 0 个后退出循环
+    assert graph.write_transactions == -(-(len(NODES) - 1) // batch_size) + 1
+    assert all(params["batch_size"] == batch_size for _, params in graph.queries)
+
+
+def test_clear_owned_only_keeps_other_labels_and_graph_version(kg, graph):
+    graph.nodes = list(NODES)
+    assert kg.clear_database(batch_size=4, labels=bkg.BUILDER_LABELS) == 34
+    assert graph.nodes == ["Page"] * 4 + ["GraphVersion"]
+    # 只执行按标签限定的删除，不会执行删除全部节点的查询
+    assert graph.count(bkg.CLEAR_ALL_BATCH_QUERY) == 0
+    # 领域 1 批、一级分类 2 批、二级分类 7 批，每个标签再多一次删除 0 个的检查
+    assert graph.write_transactions == (1 + 2 + 7) + 3
+
+
+def test_clear_database_on_empty_graph(kg, graph):
+    graph.nodes = ["GraphVersion"]
+    assert kg.clear_database(batch_size=10) == 0
+    assert graph.write_transactions == 1
+
+
+def test_plan_operators_preorder():
+    assert bkg._plan_operators(None) == []
+    assert bkg._plan_operators(LABEL_SCAN_PLAN) == [
+        "ProduceResults@neo4j", "Filter@neo4j", "NodeByLabelScan@neo4j",
+    ]
+    plan = {"operatorType": "A", "children": [
+        {"operatorType": "B", "children": [{"operatorType": "C"}]},
+        {"operatorType": "D"},
+    ]}
+    assert bkg._plan_operators(plan) == ["A", "B", "C", "D"]
+
+
+def test_ensure_schema_issues_every_statement(kg, graph):
+    graph.fail_on.add(bkg.SCHEMA_STATEMENTS[1][1])
+    kg.ensure_schema()
+    issued = [query for query, _ in graph.queries]
+    assert issued == [statement for _, statement in bkg.SCHEMA_STATEMENTS] + ["CALL db.awaitIndexes(300)"]
+    # 单个约束创建失败（如已有重复数据）不影响其他约束 / 索引
+    assert set(graph.indexes) == {name for name, _ in bkg.SCHEMA_STATEMENTS} - {bkg.SCHEMA_STATEMENTS[1][0]}
+    assert all(statement.split()[1] in ("CONSTRAINT", "INDEX") and "IF NOT EXISTS" in statement
+               for _, statement in bkg.SCHEMA_STATEMENTS)
+
+
+def test_verify_schema_reports_ready_schema(kg, graph):
+    kg.ensure_schema()
+    report = kg.verify_schema()
+    assert report["missing"] == [] and report["unindexed"] == []
+    assert set(report["indexes"]) == {name for name, _ in bkg.SCHEMA_STATEMENTS}
+    assert all(probe["uses_index"] for probe in report["probes"].values())
+
+
+def test_verify_schema_reports_label_scans_and_missing_indexes(kg, graph):
+    graph.offline.add("second_level_unique")
+    kg.ensure_schema()
+    del graph.indexes["domain_name_unique"]
+    scanned, probe = bkg.SCHEMA_PROBES[0]
+    graph.plans[probe] = LABEL_SCAN_PLAN
+
+    report = kg.verify_schema()
+    assert report["missing"] == ["domain_name_unique", "second_level_unique"]
+    assert report["unindexed"] == [scanned]
+    assert report["probes"][scanned] == {
+        "uses_index": False,
+        "operators": ["ProduceResults@neo4j", "Filter@neo4j", "NodeByLabelScan@neo4j"],
+    }
+
+
+def test_export_page_artifact_is_loadable_by_main(kg, graph, tmp_path, monkeypatch):
+    import main
+    from abilityToJob import artifact
+
+    graph.version["version"] = 6
+    graph.page_edges = [
+        {"job_name": "数据分析师", "skill": "Python", "weight": 3.0, "category": "hard"},
+        {"job_name": "数据分析师", "skill": "python", "weight": 5.0, "category": "hard"},
+        {"job_name": "数据分析师", "skill": "沟通", "weight": 1.0, "category": "soft"},
+        {"job_name": "产品经理", "skill": "沟通", "weight": 4.0, "category": "soft"},
+    ]
+    path = str(tmp_path / "page.kgsnap")
+    header = kg.export_page_artifact(path)
+    assert header["meta"]["schema"] == artifact.SCHEMA_PAGE
+    assert header["meta"]["graph_version"] == 6
+    # 只读：不写入图谱
+    assert graph.write_transactions == 0 and graph.domains == {}
+
+    monkeypatch.setattr(main, "KG_ARTIFACT_PATH", path)
+    snapshot = main.load_snapshot()
+    assert snapshot.job_names == ["数据分析师", "产品经理"]
+    assert snapshot.nnz == 3 and snapshot.job_total_weights.tolist() == [6.0, 4.0]
+
+    # 图谱未变化时重新导出不改变产物版本
+    assert artifact.artifact_version(kg.export_page_artifact(path)) == artifact.artifact_version(header)
+
+
+def test_failed_sync_clears_building_flag(kg, graph):
+    kg.bulk_import(SKILLS, 1000)
+    graph.version["version"] = 3
+    graph.fail_on.add(bkg.SECOND_LEVEL_BULK_QUERY)
+
+    target = {**SKILLS, "产品经理": [("软实力", "沟通", 0.6)]}
+    with pytest.raises(RuntimeError):
+        kg.sync_excel_file("", skills_by_domain=target)
+    # 版本号不变、重建标记已清除：服务端继续使用旧快照，而不是一直认为图谱在重建
+    assert graph.version == {"version": 3, "building": False}
+    assert graph.count(bkg.CLEAR_BUILDING_QUERY) == 1
+
+
+@pytest.fixture
+def run_main(kg, graph, tmp_path, monkeypatch):
+    """以 kg 代替真实连接执行构建脚本的 main()"""
+    monkeypatch.setattr(bkg, "Neo4jKnowledgeGraph", lambda: kg)
+    monkeypatch.setattr(bkg, "read_excel_skills", lambda path: SKILLS)
+    monkeypatch.setattr(kg, "_building", False, raising=False)
+    artifact_path = str(tmp_path / "domain.kgsnap")
+    return lambda *args: bkg.main(["--artifact", artifact_path, *args])
+
+
+def test_failed_rebuild_clears_building_flag(run_main, graph):
+    graph.version["version"] = 5
+    graph.fail_on.add(bkg.SECOND_LEVEL_BULK_QUERY)
+    run_main()
+    assert graph.count(bkg.MARK_BUILDING_QUERY) == 1
+    assert graph.version == {"version": 5, "building": False}
+    assert graph.count(bkg.BUMP_VERSION_QUERY) == 0
+
+
+def test_failed_bump_after_sync_clears_building_flag(run_main, graph):
+    graph.fail_on.add(bkg.BUMP_VERSION_QUERY)
+    run_main("--incremental")
+    assert graph.skills() == {domain: {(c, s): w for c, s, w in skills} for domain, skills in SKILLS.items()}
+    assert graph.version["building"] is False
+    assert graph.count(bkg.CLEAR_BUILDING_QUERY) == 1
+
+
+def test_successful_rebuild_bumps_version(run_main, graph):
+    graph.version["version"] = 5
+    run_main()
+    assert graph.version == {"version": 6, "building": False}
+    # 成功路径不执行清除标记的查询；失败前未标记重建时也不执行
+    assert graph.count(bkg.CLEAR_BUILDING_QUERY) == 0
+    graph.fail_on.add(bkg.CURRENT_DOMAINS_QUERY)
+    run_main("--incremental")
+    assert graph.count(bkg.CLEAR_BUILDING_QUERY) == 0
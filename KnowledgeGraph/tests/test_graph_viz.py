@@ -0,0 +1,155 @@
+"""
+/api/graph-visualization：边 ID 稳定、Page→Category 边不重复、
+概要模式（detail=summary / top_n / hidden_skills）、按类别展开与参数校验。
+"""
+
+import pytest
+
+import main
+
+
+def viz_records():
+    """一个 Page、两个类别；技能 S2 同时属于两个类别，每个技能行都重复带出 Page→Category 边"""
+    page = {"page_id": 1, "element_id": "4:p:1", "page_name": "数据分析", "page_alt_name": None}
+    categories = {
+        "hard": {"category_id": 10, "category_element_id": "4:c:10", "category_name": "硬实力",
+                 "category_type": "hard", "r1_weight": 0.7},
+        "soft": {"category_id": 11, "category_element_id": "4:c:11", "category_name": "软实力",
+                 "category_type": "soft", "r1_weight": None},
+    }
+    skills = [
+        ("hard", 100, "Python", 0.5),
+        ("hard", 101, "SQL", 0.9),
+        ("hard", 102, "Excel", 0.2),
+        ("hard", 102, "Excel", 0.2),  # 查询结果中的重复行
+        ("soft", 103, "沟通", 0.4),
+        ("soft", 101, "SQL", 0.1),
+    ]
+    return [
+        {**page, **categories[cat], "skill_id": sid, "skill_element_id": f"4:s:{sid}",
+         "skill_name": name, "r2_weight": weight}
+        for cat, sid, name, weight in skills
+    ]
+
+
+@pytest.fixture
+def viz_client(main_client, monkeypatch):
+    """返回 (客户端, 查询记录)；查询按 Page ID / elementId 过滤"""
+    queries = []
+
+    async def run_query_async(query, parameters=None):
+        queries.append((query, parameters))
+        if parameters in ({"page_id": 1}, {"element_id": "4:p:1"}):
+            return viz_records()
+        return []
+
+    monkeypatch.setattr(main, "run_query_async", run_query_async)
+    main.graph_viz_cache.clear()
+    client = main_client(None)
+    yield client, queries
+    main.graph_viz_cache.clear()
+
+
+def _post(client, **body):
+    return client.post("/api/graph-visualization", json=body)
+
+
+def test_full_graph_nodes_and_edges(viz_client):
+    client, _ = viz_client
+    body = _post(client, page_id="1").json()
+    assert body["success"] and body["detail"] == "full"
+
+    nodes = {node["id"]: node for node in body["nodes"]}
+    assert len(nodes) == len(body["nodes"])
+    assert nodes["1"]["label"] == "数据分析" and nodes["1"]["type"] == "Page"
+    assert {nodes[i]["type"] for i in ("10", "11")} == {"Category"}
+    # SQL 属于两个类别，节点只出现一次
+    assert sorted(n["label"] for n in body["nodes"] if n["type"] == "Skill") == ["Excel", "Python", "SQL", "沟通"]
+
+    edge_ids = [edge["id"] for edge in body["edges"]]
+    assert len(edge_ids) == len(set(edge_ids))
+    # 每个 Page→Category 边只出现一次，尽管它随每个技能行重复返回
+    has_category = [edge for edge in body["edges"] if edge["type"] == "HAS_CATEGORY"]
+    assert sorted(edge["id"] for edge in has_category) == ["r1_4:p:1_4:c:10", "r1_4:p:1_4:c:11"]
+    assert {edge["to"]: edge["properties"]["weight"] for edge in has_category} == {"10": 0.7, "11": 0}
+    has_skill = {(edge["from"], edge["to"]): edge for edge in body["edges"] if edge["type"] == "HAS_SKILL"}
+    assert set(has_skill) == {("10", "100"), ("10", "101"), ("10", "102"), ("11", "103"), ("11", "101")}
+    assert has_skill[("11", "101")]["id"] == "r2_4:c:11_4:s:101"
+
+
+def test_edge_ids_are_stable_across_calls(viz_client):
+    client, queries = viz_client
+    first = _post(client, page_id="1").json()
+    second = _post(client, page_id="1").json()
+    assert [edge["id"] for edge in first["edges"]] == [edge["id"] for edge in second["edges"]]
+    # 第二次命中缓存
+    assert len(queries) == 1
+
+    # 缓存清空后重新查询（相当于另一个 worker），边 ID 仍由两端节点的 elementId 决定
+    main.graph_viz_cache.clear()
+    third = _post(client, element_id="4:p:1").json()
+    assert len(queries) == 2
+    assert sorted(edge["id"] for edge in third["edges"]) == sorted(edge["id"] for edge in first["edges"])
+
+
+def test_summary_keeps_top_skills(viz_client):
+    client, _ = viz_client
+    body = _post(client, page_id="1", detail="summary", top_n=1).json()
+    assert body["detail"] == "summary"
+
+    categories = {node["id"]: node for node in body["nodes"] if node["type"] == "Category"}
+    assert categories["10"]["hidden_skills"] == 2
+    assert categories["11"]["hidden_skills"] == 1
+    # 每个类别只保留权重最高的技能
+    has_skill = sorted((edge["from"], edge["to"]) for edge in body["edges"] if edge["type"] == "HAS_SKILL")
+    assert has_skill == [("10", "101"), ("11", "103")]
+    assert len([edge for edge in body["edges"] if edge["type"] == "HAS_CATEGORY"]) == 2
+
+    # 概要模式不修改缓存中共享的节点
+    full = _post(client, page_id="1").json()
+    assert all("hidden_skills" not in node for node in full["nodes"])
+
+    body = _post(client, page_id="1", detail="summary", top_n=0).json()
+    assert [node["type"] for node in body["nodes"]] == ["Page", "Category", "Category"]
+    assert {node["hidden_skills"] for node in body["nodes"] if node["type"] == "Category"} == {3, 2}
+
+
+def test_summary_defaults_to_configured_top_n(viz_client, monkeypatch):
+    client, _ = viz_client
+    monkeypatch.setattr(main, "KG_VIZ_TOP_N", 2)
+    body = _post(client, page_id="1", detail="summary").json()
+    categories = {node["id"]: node for node in body["nodes"] if node["type"] == "Category"}
+    assert (categories["10"]["hidden_skills"], categories["11"]["hidden_skills"]) == (1, 0)
+
+
+def test_expand_category(viz_client):
+    client, queries = viz_client
+    for category_id in ("10", "4:c:10"):
+        body = _post(client, page_id="1", expand_category=category_id).json()
+        assert body["category_id"] == "10"
+        assert [node["label"] for node in body["nodes"]] == ["SQL", "Python", "Excel"]
+        assert [edge["id"] for edge in body["edges"]] == ["r2_4:c:10_4:s:101", "r2_4:c:10_4:s:100", "r2_4:c:10_4:s:102"]
+    # 展开与完整视图共用同一份缓存
+    assert len(queries) == 1
+
+    assert _post(client, page_id="1", expand_category="99").status_code == 404
+    # Page 不存在时展开同样返回 404
+    assert _post(client, page_id="2", expand_category="10").status_code == 404
+
+
+def test_unknown_page_returns_empty_graph(viz_client):
+    client, _ = viz_client
+    body = _post(client, page_id="2").json()
+    assert body["success"] and body["nodes"] == [] and body["edges"] == []
+
+
+@pytest.mark.parametrize("body", [
+    {},
+    {"page_id": "abc"},
+    {"page_id": "1", "detail": "compact"},
+    {"page_id": "1", "detail": "summary", "top_n": -1},
+])
+def test_invalid_parameters(viz_client, body):
+    client, queries = viz_client
+    assert _post(client, **body).status_code == 400
+    assert queries == []
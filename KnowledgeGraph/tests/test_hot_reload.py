@@ -0,0 +1,200 @@
+"""
+SnapshotReloader：后台重建与原子切换、重建期间读者继续使用旧快照、
+失败后沿用旧快照并按 retry_interval 退避、强制重载不受退避限制。
+"""
+
+import threading
+import time
+
+import pytest
+
+from common.hot_reload import SnapshotReloader
+
+
+class Source:
+    """可控的图谱版本号与 load 回调：load 可被阻塞或设置为失败"""
+
+    def __init__(self, version=1):
+        self.version = version
+        self.calls = []
+        self.fail = False
+        # 清除后 load 阻塞，直到 release() 被调用
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Event()
+
+    def load(self, version, rebuild):
+        self.calls.append((version, rebuild))
+        self.entered.set()
+        assert self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError(f"构建版本 {version} 失败")
+        return {"version": version, "build": len(self.calls)}
+
+    def block(self):
+        self.gate.clear()
+        self.entered.clear()
+
+    def release(self):
+        self.gate.set()
+
+
+def _wait(reloader, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while reloader.stats()["reloading"]:
+        assert time.monotonic() < deadline, "后台重建未在限定时间内结束"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def source():
+    return Source()
+
+
+def test_initial_load_is_synchronous(source):
+    reloader = SnapshotReloader(source.load, lambda: source.version)
+    assert reloader.version is None
+    assert reloader.get() == {"version": 1, "build": 1}
+    assert reloader.version == 1
+    # 版本号不变时不重建
+    assert reloader.get() is reloader.get()
+    assert not reloader.trigger()
+    assert source.calls == [(1, False)]
+    assert reloader.stats()["generation"] == 1
+
+
+def test_version_change_swaps_atomically(source):
+    reloader = SnapshotReloader(source.load, lambda: source.version)
+    old = reloader.get()
+
+    source.version = 2
+    source.block()
+    # 发现新版本号时启动后台重建，调用方立即拿到旧快照
+    assert reloader.get() is old
+    assert source.entered.wait(5)
+    assert reloader.stats()["reloading"]
+    # 重建进行中：读者继续拿到完整的旧快照，不会重复启动重建
+    for _ in range(10):
+        assert reloader.get() is old
+    assert not reloader.trigger()
+    assert reloader.version == 1
+
+    source.release()
+    _wait(reloader)
+    new = reloader.get()
+    assert new == {"version": 2, "build": 2}
+    assert reloader.version == 2
+    assert source.calls == [(1, False), (2, False)]
+    stats = reloader.stats()
+    assert (stats["generation"], stats["reloads"], stats["failures"]) == (2, 2, 0)
+
+
+def test_concurrent_readers_see_old_or_new_generation(source):
+    reloader = SnapshotReloader(source.load, lambda: source.version)
+    old = reloader.get()
+    source.version = 2
+    source.block()
+
+    seen = []
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            seen.append(reloader.get())
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    assert source.entered.wait(5)
+    time.sleep(0.02)
+    source.release()
+    _wait(reloader)
+    time.sleep(0.02)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    new = reloader.get()
+    assert new is not old
+    # 每次读取都是完整的某一代，且只有一次后台重建
+    assert all(snapshot is old or snapshot is new for snapshot in seen)
+    assert any(snapshot is old for snapshot in seen)
+    assert source.calls == [(1, False), (2, False)]
+
+
+def test_failed_reload_keeps_old_snapshot_and_backs_off(source):
+    reloader = SnapshotReloader(source.load, lambda: source.version, retry_interval=60)
+    old = reloader.get()
+
+    source.version = 2
+    source.fail = True
+    assert reloader.trigger()
+    _wait(reloader)
+    assert reloader.get() is old
+    assert reloader.version == 1
+    stats = reloader.stats()
+    assert stats["failures"] == 1 and "版本 2" in stats["last_error"]
+
+    # retry_interval 内同一版本号不再自动重试
+    for _ in range(5):
+        assert reloader.get() is old
+    assert not reloader.trigger()
+    assert source.calls == [(1, False), (2, False)]
+
+    # 版本号再次变化时立即重试
+    source.version = 3
+    source.fail = False
+    assert reloader.trigger()
+    _wait(reloader)
+    assert reloader.get() == {"version": 3, "build": 3}
+    assert reloader.stats()["last_error"] is None
+
+
+def test_backoff_expires_after_retry_interval(source):
+    reloader = SnapshotReloader(source.load, lambda: source.version, retry_interval=0.05)
+    reloader.get()
+    source.version = 2
+    source.fail = True
+    assert reloader.trigger()
+    _wait(reloader)
+    assert not reloader.trigger()
+
+    time.sleep(0.06)
+    source.fail = False
+    assert reloader.trigger()
+    _wait(reloader)
+    assert reloader.version == 2
+
+
+def test_forced_reload_bypasses_backoff_and_rebuilds(source):
+    reloader = SnapshotReloader(source.load, lambda: source.version, retry_interval=60)
+    reloader.get()
+    source.version = 2
+    source.fail = True
+    assert reloader.trigger()
+    _wait(reloader)
+    assert not reloader.trigger()
+
+    # 管理接口的强制重载：不受退避限制，且要求从数据源重建
+    source.fail = False
+    assert reloader.trigger(force=True)
+    _wait(reloader)
+    assert reloader.version == 2
+    assert source.calls[-1] == (2, True)
+
+    # 版本号未变化时强制重载同样生成新一代
+    before = reloader.get()
+    assert reloader.trigger(force=True)
+    _wait(reloader)
+    assert reloader.get() is not before
+    assert reloader.stats()["generation"] == 3
+
+
+def test_initial_load_failure_propagates(source):
+    source.fail = True
+    reloader = SnapshotReloader(source.load, lambda: source.version)
+    with pytest.raises(RuntimeError):
+        reloader.get()
+    assert reloader.version is None
+    source.fail = False
+    assert reloader.get() == {"version": 1, "build": 2}
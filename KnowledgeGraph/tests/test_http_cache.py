@@ -0,0 +1,151 @@
+"""
+目录类接口的预编码响应（EncodedBody / CatalogCache）与条件请求
+"""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+
+import main
+from common import http_cache as http_cache_module
+from common.http_cache import MIN_COMPRESS_SIZE, CatalogCache, EncodedBody
+
+LARGE = {"jobs": [{"id": f"kg_{i}", "title": f"岗位{i}"} for i in range(200)]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(http_cache_module, "time", fake)
+    return fake
+
+
+def test_etag_depends_only_on_content():
+    assert EncodedBody(LARGE).etag == EncodedBody(json.loads(json.dumps(LARGE))).etag
+    assert EncodedBody(LARGE).etag != EncodedBody({"jobs": []}).etag
+
+
+def test_small_bodies_are_not_compressed():
+    entry = EncodedBody({"ok": True})
+    assert len(entry.body) < MIN_COMPRESS_SIZE and entry.variants == {}
+    assert entry.select("gzip, br") == (None, entry.body, entry.etag)
+
+
+def test_gzip_variant_round_trips():
+    entry = EncodedBody(LARGE)
+    body, etag = entry.variants["gzip"]
+    assert gzip.decompress(body) == entry.body
+    assert etag != entry.etag and etag.endswith('-gzip"')
+    # mtime=0：同一内容的 gzip 字节串在不同进程中相同
+    assert EncodedBody(LARGE).variants["gzip"][0] == body
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "br" if http_cache_module.brotli else "gzip"),
+    ("gzip;q=0.5, br;q=1.0", "br" if http_cache_module.brotli else "gzip"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+])
+def test_select_honours_accept_encoding(header, expected):
+    assert EncodedBody(LARGE).select(header)[0] == expected
+
+
+def test_conditional_responses():
+    entry = EncodedBody(LARGE)
+    status, body, headers = entry.respond(None, "gzip")
+    assert status == 200 and headers["Content-Encoding"] == "gzip"
+    assert headers["Vary"] == "Accept-Encoding" and headers["Cache-Control"] == "no-cache"
+
+    gzip_etag = headers["ETag"]
+    for if_none_match in (gzip_etag, f"W/{gzip_etag}", entry.etag, f'"other", {entry.etag}', "*"):
+        status, body, headers = entry.respond(if_none_match, "gzip")
+        assert status == 304 and body == b"" and "Content-Encoding" not in headers
+    assert entry.respond('"stale"', None)[0] == 200
+
+
+def test_catalog_cache_hits_and_ttl(clock):
+    cache = CatalogCache(ttl=10)
+    builds = []
+    build = lambda: builds.append(1) or LARGE  # noqa: E731
+
+    first = cache.get_or_build("jobs", build)
+    assert cache.get_or_build("jobs", build) is first and builds == [1]
+    clock.now += 11
+    assert cache.get_or_build("jobs", build) is not first and builds == [1, 1]
+    assert cache.stats()["hits"] == 1 and cache.stats()["builds"] == 2
+
+
+def test_catalog_cache_invalidates_on_version_change(clock):
+    version = [1]
+    cache = CatalogCache(lambda: version[0], ttl=60)
+    cache.get_or_build("jobs", lambda: LARGE)
+    version[0] = 2
+    assert cache.get("jobs") is None
+    assert cache.stats()["invalidations"] == 1 and cache.stats()["graph_version"] == 2
+
+
+def test_catalog_cache_skips_store_when_version_changes_during_build(clock):
+    version = [1]
+    cache = CatalogCache(lambda: version[0], ttl=60)
+
+    def build():
+        version[0] = 2  # 构建期间图谱被重建
+        return LARGE
+
+    entry = cache.get_or_build("jobs", build)
+    assert entry.body and cache.get("jobs") is None
+
+
+def test_catalog_cache_async(clock):
+    cache = CatalogCache(ttl=60)
+    builds = []
+
+    async def build():
+        builds.append(1)
+        return LARGE
+
+    async def scenario():
+        first = await cache.get_or_build_async("jobs", build)
+        second = await cache.get_or_build_async("jobs", build)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first is second and builds == [1]
+
+
+def test_jobs_endpoint_etag_and_304(main_client, monkeypatch):
+    queries = []
+
+    async def run_query_async(query, parameters=None):
+        queries.append(query)
+        return [{"title": f"岗位{i}"} for i in range(100)]
+
+    monkeypatch.setattr(main, "run_query_async", run_query_async)
+    monkeypatch.setattr(main, "KG_ARTIFACT_PATH", None)
+    monkeypatch.setattr(main, "catalog_cache", CatalogCache(main.catalog_version, 60))
+    client = main_client(None)
+
+    response = client.get("/api/jobs", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    etag = response.headers["etag"]
+    titles = [job["title"] for job in response.json()["jobs"]]
+    assert titles[:2] == ["岗位0", "岗位1"] and len(titles) == 100
+
+    response = client.get("/api/jobs", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304 and response.content == b""
+    assert len(queries) == 1
+    assert main.catalog_cache.stats()["not_modified"] == 1
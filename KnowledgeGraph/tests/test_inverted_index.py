@@ -0,0 +1,143 @@
+"""
+main.py 技能→岗位匹配（倒排表 + _score_jobs）与原实现的对照
+
+原实现用一条 Cypher 取回全部 Page 的技能边，再在 Python 中逐岗位去重（同名技能保留最大权重）、
+计算覆盖率与熟练度得分；这里用同样的边列表重放原实现，与接口返回的结果逐项比较。
+"""
+
+import random
+
+import pytest
+
+from abilityToJob.snapshot import SkillJobSnapshot
+
+
+def random_page_edges(seed, num_jobs=30, num_skills=40):
+    """(Page 名称, 技能, 权重, Category.type) 边；包含零权重技能与同一岗位下重复出现的技能"""
+    rng = random.Random(seed)
+    skills = [f"Skill{i}" for i in range(num_skills)]
+    edges = []
+    for j in range(num_jobs):
+        for name in rng.sample(skills, rng.randint(1, 10)):
+            weight = 0.0 if rng.random() < 0.15 else float(rng.randint(1, 9))
+            edges.append((f"job{j}", name, weight, rng.choice(("hard", "soft", ""))))
+            if rng.random() < 0.2:
+                # 同一技能挂在岗位的另一个类别下，权重不同
+                edges.append((f"job{j}", name, float(rng.randint(0, 9)), rng.choice(("hard", "soft"))))
+    return edges
+
+
+def baseline_score(edges, skills, skill_levels):
+    """原实现（Cypher 取回全部技能边后在 Python 中逐岗位打分）"""
+    inputs = {s.strip().lower() for s in skills if s and s.strip()}
+    levels = {k.lower(): v for k, v in (skill_levels or {}).items()}
+    by_job = {}
+    for job, skill, weight, ctype in edges:
+        by_job.setdefault(job, []).append({"skill": skill, "weight": weight, "category": ctype})
+
+    jobs = []
+    # Cypher 的返回顺序：ORDER BY size(matchedSkillNames) DESC, job_name
+    rows = []
+    for job, job_skills in by_job.items():
+        matched = sorted({s["skill"] for s in job_skills if s["skill"].lower() in inputs})
+        if matched:
+            rows.append((job, job_skills, matched))
+    rows.sort(key=lambda r: (-len(r[2]), r[0]))
+
+    for job, job_skills_raw, matched_names in rows:
+        job_skills_map = {}
+        for item in job_skills_raw:
+            name = item["skill"].strip()
+            weight = float(item["weight"] or 0.0)
+            entry = job_skills_map.get(name.lower())
+            if entry is None:
+                job_skills_map[name.lower()] = {"name": name, "weight": weight,
+                                                "category": item["category"].strip().lower()}
+            elif weight > entry["weight"]:
+                entry["weight"] = weight
+        job_skills = list(job_skills_map.values())
+        n = len(job_skills)
+        total_weight = sum(s["weight"] for s in job_skills) or 1.0
+        matched_lower = {s.lower() for s in matched_names}
+        intersection = [s for s in job_skills if s["name"].lower() in matched_lower]
+        k = len(intersection)
+        weighted_sum = sum(levels.get(s["name"].lower(), 1) * s["weight"] for s in intersection)
+        score = round(k / n * 40.0 + (weighted_sum / total_weight / 5.0) * 60.0, 2)
+        jobs.append({
+            "job_name": job,
+            "matched_skills": matched_names,
+            "match_count": k,
+            "total_weight": total_weight,
+            "match_percentage": max(0.0, min(100.0, score)),
+            "hard_skills_count": sum(1 for s in job_skills if s["category"] == "hard"),
+            "soft_skills_count": sum(1 for s in job_skills if s["category"] == "soft"),
+        })
+    jobs.sort(key=lambda x: x["match_percentage"], reverse=True)
+    return jobs
+
+
+def _comparable(jobs):
+    # 原查询中 collect(DISTINCT ...) 的顺序不确定，匹配技能按集合比较
+    return [dict(job, matched_skills=sorted(job["matched_skills"])) for job in jobs]
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_endpoint_equals_original_scoring(main_client, seed):
+    edges = random_page_edges(seed)
+    client = main_client(SkillJobSnapshot.from_edges(edges, dedupe=True))
+    rng = random.Random(seed)
+    skills = rng.sample([f"skill{i}" for i in range(40)], rng.randint(1, 8)) + ["未知技能"]
+    levels = {s.upper(): rng.randint(1, 5) for s in skills if rng.random() < 0.5}
+
+    body = client.post("/api/query-skills-to-jobs", json={"skills": skills, "skill_levels": levels}).json()
+    expected = baseline_score(edges, skills, levels)
+    assert body["total"] == len(expected)
+    assert _comparable(body["jobs"]) == pytest.approx(_comparable(expected))
+
+
+def test_zero_weight_and_duplicate_skills(main_client):
+    edges = [
+        # 只匹配到零权重技能的岗位仍然命中（覆盖率得分），positive_only=False
+        ("A", "Python", 0.0, "hard"),
+        ("A", "SQL", 4.0, "hard"),
+        # 同一技能重复出现时保留最大权重、首次出现的类别
+        ("B", "Python", 2.0, "hard"),
+        ("B", "Python", 5.0, "soft"),
+        ("B", "沟通", 5.0, "soft"),
+        # 全部权重为 0：总权重按 1 计
+        ("C", "Python", 0.0, "soft"),
+    ]
+    client = main_client(SkillJobSnapshot.from_edges(edges, dedupe=True))
+    body = client.post("/api/query-skills-to-jobs", json={"skills": ["python"], "skill_levels": {"Python": 4}}).json()
+
+    assert _comparable(body["jobs"]) == _comparable(baseline_score(edges, ["python"], {"Python": 4}))
+    by_name = {job["job_name"]: job for job in body["jobs"]}
+    assert set(by_name) == {"A", "B", "C"}
+    assert by_name["A"]["match_percentage"] == 20.0
+    assert by_name["B"]["total_weight"] == 10.0
+    assert by_name["B"]["match_percentage"] == 44.0
+    assert (by_name["B"]["hard_skills_count"], by_name["B"]["soft_skills_count"]) == (1, 1)
+    assert by_name["C"]["total_weight"] == 1.0
+    assert by_name["C"]["match_percentage"] == 40.0
+
+
+def test_cpu_work_runs_in_threadpool(main_client, monkeypatch):
+    import main
+
+    offloaded = []
+    run_in_threadpool = main.run_in_threadpool
+
+    async def recording(func, *args, **kwargs):
+        offloaded.append(func.__name__)
+        return await run_in_threadpool(func, *args, **kwargs)
+
+    monkeypatch.setattr(main, "run_in_threadpool", recording)
+    client = main_client(SkillJobSnapshot.from_edges(random_page_edges(0), dedupe=True))
+
+    assert client.post("/api/query-skills-to-jobs", json={"skills": ["skill1"]}).status_code == 200
+    assert client.get("/api/suggest/skills", params={"q": "sk"}).status_code == 200
+    assert client.get("/api/suggest/jobs", params={"q": "job"}).status_code == 200
+    response = client.post("/api/batch/query-skills-to-jobs", json={"profiles": [{"skills": ["skill1"]}]})
+    assert response.status_code == 200
+    # 匹配打分、前缀补全与批量画像的预处理都不在事件循环上执行
+    assert {"_match_snapshot", "_skill_suggestions", "_job_suggestions", "_prepare_batch"} <= set(offloaded)
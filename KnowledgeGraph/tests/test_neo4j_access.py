@@ -0,0 +1,207 @@
+"""
+Neo4j 数据访问层：托管事务、事务超时与统计
+
+事务函数在驱动真实的 ManagedTransaction / AsyncManagedTransaction 上执行
+（驱动在托管事务中拒绝 neo4j.Query），只把 Bolt 连接替换为按顺序应答的内存实现。
+会话按驱动的方式从事务函数读取 unit_of_work 设置的 timeout 并随 BEGIN 发送。
+"""
+
+import asyncio
+import inspect
+from types import SimpleNamespace
+
+import pytest
+from neo4j import READ_ACCESS, WRITE_ACCESS, Address, AsyncManagedTransaction, ManagedTransaction, ServerInfo
+from neo4j.exceptions import TransientError
+
+from common.neo4j_access import AsyncGraphAccess, GraphAccess, Neo4jSettings
+
+ROWS = [{"name": "Python", "weight": 5}, {"name": "SQL", "weight": 3}]
+
+
+class FakeConnection:
+    """按 BEGIN / RUN / PULL / COMMIT 的顺序应答的 Bolt 连接"""
+
+    supports_multiple_results = True
+    unresolved_address = Address(("localhost", 7687))
+    server_info = ServerInfo(unresolved_address, (5, 0))
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.pending = []
+        self.begins = []
+        self.runs = []
+        self.commits = 0
+
+    def begin(self, timeout=None, mode=None, on_success=None, **kwargs):
+        self.begins.append({"timeout": timeout, "mode": mode})
+        self.pending.append([(on_success, {})])
+
+    def run(self, query, parameters=None, timeout=None, on_success=None, **kwargs):
+        self.runs.append((query, parameters, timeout))
+        keys = list(self.rows[0]) if self.rows else []
+        self.pending.append([(on_success, {"fields": keys, "qid": 0})])
+
+    def pull(self, on_records=None, on_success=None, **kwargs):
+        self.pending.append([(on_records, [list(row.values()) for row in self.rows]), (on_success, {})])
+
+    def commit(self, on_success=None, **kwargs):
+        self.commits += 1
+        self.pending.append([(on_success, {})])
+
+    def new_hydration_scope(self):
+        return SimpleNamespace(hydration_hooks={}, dehydration_hooks={})
+
+    def send_all(self):
+        pass
+
+    def fetch_message(self):
+        for callback, argument in self.pending.pop(0):
+            callback(argument)
+
+    def fetch_all(self):
+        while self.pending:
+            self.fetch_message()
+
+
+class AsyncFakeConnection(FakeConnection):
+    async def send_all(self):
+        pass
+
+    async def fetch_message(self):
+        for callback, argument in self.pending.pop(0):
+            result = callback(argument)
+            if inspect.isawaitable(result):
+                await result
+
+    async def fetch_all(self):
+        while self.pending:
+            await self.fetch_message()
+
+
+def _noop(*args, **kwargs):
+    pass
+
+
+async def _async_noop(*args, **kwargs):
+    pass
+
+
+class FakeSession:
+    """与驱动的 Session._run_transaction 相同：从事务函数读取 timeout，开启托管事务后调用"""
+
+    def __init__(self, connection, access_mode, failures=0):
+        self.connection = connection
+        self.access_mode = access_mode
+        self.failures = failures
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def _run(self, access_mode, transaction_function):
+        assert access_mode == self.access_mode
+        while True:
+            tx = ManagedTransaction(self.connection, 100, None, _noop, _noop, _noop, _noop)
+            tx._begin(None, None, (), access_mode, getattr(transaction_function, "metadata", None),
+                      getattr(transaction_function, "timeout", None), None, None)
+            result = transaction_function(tx)
+            if self.failures:
+                # 模拟驱动对瞬时错误的自动重试
+                self.failures -= 1
+                continue
+            tx._commit()
+            return result
+
+    def execute_read(self, transaction_function):
+        return self._run(READ_ACCESS, transaction_function)
+
+    def execute_write(self, transaction_function):
+        return self._run(WRITE_ACCESS, transaction_function)
+
+
+class AsyncFakeSession(FakeSession):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def _run(self, access_mode, transaction_function):
+        assert access_mode == self.access_mode
+        tx = AsyncManagedTransaction(self.connection, 100, None, _async_noop, _async_noop, _noop, _noop)
+        await tx._begin(None, None, (), access_mode, getattr(transaction_function, "metadata", None),
+                        getattr(transaction_function, "timeout", None), None, None)
+        result = await transaction_function(tx)
+        await tx._commit()
+        return result
+
+
+class FakeDriver:
+    def __init__(self, connection, session_cls=FakeSession, failures=0):
+        self.connection = connection
+        self.session_cls = session_cls
+        self.failures = failures
+        self.session_kwargs = []
+
+    def session(self, **kwargs):
+        self.session_kwargs.append(kwargs)
+        return self.session_cls(self.connection, kwargs["default_access_mode"], self.failures)
+
+
+SETTINGS = Neo4jSettings(query_timeout=12.5, fetch_size=100, database="kg")
+
+
+@pytest.mark.parametrize("method, mode", [("read", READ_ACCESS), ("write", WRITE_ACCESS)])
+def test_sync_access_runs_in_managed_transaction(method, mode):
+    connection = FakeConnection(ROWS)
+    driver = FakeDriver(connection)
+    access = GraphAccess(driver, SETTINGS)
+
+    records = getattr(access, method)("MATCH (s:Skill) RETURN s.name AS name", {"limit": 2})
+    assert records == ROWS
+    # 查询字符串原样传给 RUN，超时随 BEGIN 发送（托管事务中 RUN 不带超时）
+    assert connection.runs == [("MATCH (s:Skill) RETURN s.name AS name", {"limit": 2}, None)]
+    assert connection.begins == [{"timeout": 12.5, "mode": mode}]
+    assert connection.commits == 1
+    assert driver.session_kwargs == [{"default_access_mode": mode, "fetch_size": 100, "database": "kg"}]
+
+    stats = access.stats.snapshot()
+    assert (stats["queries"], stats["failures"], stats["in_use"], stats["waiting"]) == (1, 0, 0, 0)
+
+
+def test_sync_access_timeout_override_and_retries():
+    connection = FakeConnection(ROWS)
+    access = GraphAccess(FakeDriver(connection, failures=2), SETTINGS)
+
+    assert access.read("RETURN 1", timeout=3) == ROWS
+    assert [begin["timeout"] for begin in connection.begins] == [3, 3, 3]
+    stats = access.stats.snapshot()
+    assert stats["retries"] == 2 and stats["peak_in_use"] == 1 and stats["in_use"] == 0
+
+
+def test_sync_access_counts_failures():
+    class FailingSession(FakeSession):
+        def _run(self, access_mode, transaction_function):
+            raise TransientError("database unavailable")
+
+    access = GraphAccess(FakeDriver(FakeConnection(ROWS), FailingSession), SETTINGS)
+    with pytest.raises(TransientError):
+        access.read("RETURN 1")
+    stats = access.stats.snapshot()
+    assert (stats["queries"], stats["failures"], stats["waiting"], stats["in_use"]) == (1, 1, 0, 0)
+
+
+@pytest.mark.parametrize("method, mode", [("read", READ_ACCESS), ("write", WRITE_ACCESS)])
+def test_async_access_runs_in_managed_transaction(method, mode):
+    connection = AsyncFakeConnection(ROWS)
+    access = AsyncGraphAccess(FakeDriver(connection, AsyncFakeSession), SETTINGS)
+
+    records = asyncio.run(getattr(access, method)("MATCH (s:Skill) RETURN s.name AS name"))
+    assert records == ROWS
+    assert connection.runs == [("MATCH (s:Skill) RETURN s.name AS name", {}, None)]
+    assert connection.begins == [{"timeout": 12.5, "mode": mode}]
+    assert connection.commits == 1
+    assert access.stats.snapshot()["queries"] == 1
@@ -0,0 +1,100 @@
+"""
+Top-K / 分页的测试
+
+部分选择（argpartition）+ 候选排序的结果必须与「全量排序后切片」完全一致，
+包括第 k 名附近的同分岗位。
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from abilityToJob.matcher import match_skills_to_jobs
+from abilityToJob.ranking import top_k_candidates
+from abilityToJob.snapshot import SkillJobSnapshot
+
+from test_snapshot import random_edges
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_top_k_candidates_keeps_all_ties(seed):
+    rng = np.random.RandomState(seed)
+    # 取值很少，制造大量同分
+    scores = rng.randint(0, 5, size=rng.randint(1, 50)).astype(float)
+    for k in [None, 0, 1, 3, len(scores) - 1, len(scores), len(scores) + 5]:
+        picked = top_k_candidates(scores, k)
+        if k is None or k >= len(scores):
+            assert sorted(picked.tolist()) == list(range(len(scores)))
+        elif k <= 0:
+            assert len(picked) == 0
+        else:
+            kth = np.sort(scores)[::-1][k - 1]
+            assert sorted(picked.tolist()) == np.flatnonzero(scores >= kth).tolist()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matcher_paging_equals_full_sort_slice(seed):
+    snapshot = SkillJobSnapshot.from_edges(random_edges(seed))
+    skills = random.Random(seed).sample([f"skill{i}" for i in range(60)], 6)
+    full, _, _ = match_skills_to_jobs(None, skills, snapshot=snapshot)
+    assert full
+
+    for min_score in (0, 30):
+        expected_all = [job for job in full if job["match_percentage"] >= min_score]
+        for top_k in (1, 2, 5, 100):
+            for offset in (0, 1, 3, len(full)):
+                jobs, _, _ = match_skills_to_jobs(None, skills, snapshot=snapshot, top_k=top_k,
+                                                  offset=offset, min_score=min_score)
+                assert jobs == expected_all[offset:offset + top_k]
+
+
+def test_main_paging_equals_full_sort_slice(main_client):
+    snapshot = SkillJobSnapshot.from_edges(random_edges(7), dedupe=True)
+    client = main_client(snapshot)
+    skills = [f"skill{i}" for i in range(0, 60, 7)]
+
+    full = client.post("/api/query-skills-to-jobs", json={"skills": skills}).json()
+    assert full["total"] == len(full["jobs"]) > 5
+
+    for top_k, offset, min_score in [(1, 0, 0), (3, 2, 0), (4, 0, 20), (50, 5, 10)]:
+        body = client.post("/api/query-skills-to-jobs", json={
+            "skills": skills, "top_k": top_k, "offset": offset, "min_score": min_score,
+        }).json()
+        expected = [job for job in full["jobs"] if job["match_percentage"] >= min_score]
+        assert body["jobs"] == expected[offset:offset + top_k]
+        assert body["total"] == len(expected)
+
+
+@pytest.mark.parametrize("paging", [
+    {"top_k": "abc"},
+    {"offset": "x"},
+    {"min_score": "high"},
+    {"top_k": [1]},
+    {"top_k": 0},
+    {"top_k": -2},
+    {"offset": -1},
+])
+def test_app_rejects_invalid_paging(app_client, paging):
+    client = app_client(SkillJobSnapshot.from_edges(random_edges(0)))
+
+    response = client.post("/api/query-skills-to-jobs", json={"skills": ["skill1"], **paging})
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+
+    response = client.post("/api/batch/query-skills-to-jobs", json={
+        "profiles": [{"skills": ["skill1"]}], **paging,
+    })
+    assert response.status_code == 400
+
+
+def test_app_paging_equals_full_sort_slice(app_client):
+    client = app_client(SkillJobSnapshot.from_edges(random_edges(4)))
+    skills = [f"skill{i}" for i in range(0, 60, 5)]
+    full = client.post("/api/query-skills-to-jobs", json={"skills": skills}).get_json()["jobs"]
+
+    body = client.post("/api/query-skills-to-jobs", json={
+        "skills": skills, "top_k": "3", "offset": "2",
+    }).get_json()
+    assert body["jobs"] == full[2:5]
+    assert body["offset"] == 2
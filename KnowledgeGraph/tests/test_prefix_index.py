@@ -0,0 +1,81 @@
+"""
+名称前缀补全索引（PrefixIndex）与 /api/suggest/* 接口
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from abilityToJob.prefix_index import PrefixIndex
+from abilityToJob.snapshot import SkillJobSnapshot, normalize_skill_name
+
+from test_snapshot import random_edges
+
+
+def random_names(seed, count=300):
+    rng = random.Random(seed)
+    alphabet = "abcPyS数据分析开发 "
+    names = {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 6))) for _ in range(count)}
+    return sorted(names)
+
+
+def brute_force(names, scores, prefix, limit):
+    key = normalize_skill_name(prefix)
+    hits = [i for i, name in enumerate(names) if normalize_skill_name(name).startswith(key)]
+    ranked = sorted(hits, key=lambda i: (-scores[i], normalize_skill_name(names[i])))
+    return ranked[:limit], len(hits)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_suggest_matches_brute_force(seed):
+    names = random_names(seed)
+    rng = np.random.RandomState(seed)
+    scores = rng.randint(0, 5, size=len(names)).astype(float)
+    index = PrefixIndex(names, scores)
+
+    prefixes = ["", "a", "P", " py", "数据", "数据分", "zzz"] + [name[:2] for name in names[:20]]
+    for prefix in prefixes:
+        for limit in (1, 5, 50):
+            assert index.suggest(prefix, limit) == brute_force(names, scores, prefix, limit), (prefix, limit)
+
+
+def test_prefix_range_and_edge_cases():
+    index = PrefixIndex(["Python", "PyTorch", "SQL", "沟通"], np.array([3.0, 1.0, 2.0, 5.0]))
+    assert len(index) == 4
+    lo, hi = index.prefix_range("PY")
+    assert index.keys[lo:hi] == ["python", "pytorch"]
+    assert index.suggest("py", 10) == ([0, 1], 2)
+    assert index.suggest("", 2) == ([3, 0], 4)
+    assert index.suggest("java", 10) == ([], 0)
+    assert index.suggest("py", 0) == ([], 2)
+
+
+def test_suggest_endpoints(main_client):
+    snapshot = SkillJobSnapshot.from_edges(random_edges(9) + [
+        ("Python工程师", "Python", 5, "硬实力"),
+        ("Python讲师", "python", 3, "软实力"),
+    ], dedupe=True)
+    client = main_client(snapshot)
+
+    body = client.get("/api/suggest/skills", params={"q": "skill1", "limit": 3}).json()
+    expected_ids, expected_total = snapshot.skill_prefix_index.suggest("skill1", 3)
+    assert body["total"] == expected_total
+    assert [s["name"] for s in body["suggestions"]] == [snapshot.skill_names[i] for i in expected_ids]
+    degrees = [s["jobs"] for s in body["suggestions"]]
+    assert degrees == sorted(degrees, reverse=True)
+
+    python = client.get("/api/suggest/skills", params={"q": " PYT"}).json()["suggestions"]
+    # 硬实力 / 软实力各一次时归为 hard
+    assert python == [{"name": "Python", "jobs": 2, "type": "hard"}]
+
+    jobs = client.get("/api/suggest/jobs", params={"q": "python"}).json()
+    assert jobs["total"] == 2
+    assert [s["title"] for s in jobs["suggestions"]][0] == "Python工程师"
+
+
+@pytest.mark.parametrize("limit", [0, -1, 10_000])
+def test_suggest_limit_is_validated(main_client, limit):
+    client = main_client(SkillJobSnapshot.from_edges(random_edges(9)))
+    assert client.get("/api/suggest/skills", params={"q": "a", "limit": limit}).status_code == 400
+    assert client.get("/api/suggest/jobs", params={"q": "a", "limit": limit}).status_code == 400
@@ -0,0 +1,122 @@
+"""
+ResultCache 的测试：LRU 淘汰、TTL 过期、按版本失效，以及 app.py 的缓存键。
+"""
+
+import asyncio
+
+import pytest
+
+from abilityToJob.snapshot import SkillJobSnapshot
+from common import result_cache as result_cache_module
+from common.result_cache import ResultCache
+
+from test_snapshot import random_edges
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(result_cache_module, "time", fake)
+    return fake
+
+
+def test_lru_evicts_least_recently_used(clock):
+    cache = ResultCache(maxsize=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # a 变为最近使用
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResultCache(maxsize=10, ttl=5)
+    cache.put("a", 1)
+    clock.now += 5
+    assert cache.get("a") == 1
+    clock.now += 0.01
+    assert cache.get("a", "missing") == "missing"
+
+    stats = cache.stats()
+    assert stats["expirations"] == 1 and stats["size"] == 0
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_version_change_invalidates_everything(clock):
+    version = {"value": 1}
+    cache = ResultCache(maxsize=10, ttl=60, version=lambda: version["value"])
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+
+    version["value"] = 2
+    assert cache.get("a") is None
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["graph_version"] == 2
+
+
+def test_result_computed_across_a_version_change_is_not_stored(clock):
+    version = {"value": 1}
+    cache = ResultCache(maxsize=10, ttl=60, version=lambda: version["value"])
+
+    def compute():
+        version["value"] = 2  # 计算期间快照被切换
+        return "stale"
+
+    assert cache.get_or_compute("a", compute) == "stale"
+    assert cache.get("a") is None
+    assert cache.get_or_compute("a", lambda: "fresh") == "fresh"
+    assert cache.get("a") == "fresh"
+
+
+def test_get_or_compute_async_caches(clock):
+    cache = ResultCache(maxsize=10, ttl=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return "value"
+
+    async def run():
+        return [await cache.get_or_compute_async("a", compute) for _ in range(3)]
+
+    assert asyncio.run(run()) == ["value"] * 3
+    assert len(calls) == 1
+
+
+def test_app_levels_are_coerced_before_building_the_key(app_client):
+    client = app_client(SkillJobSnapshot.from_edges(random_edges(0)))
+    import app
+
+    first = client.post("/api/query-skills-to-jobs", json={"skills": ["skill1"], "skill_levels": {"skill1": 3}})
+    hits = app.result_cache.stats()["hits"]
+    second = client.post("/api/query-skills-to-jobs", json={"skills": ["skill1"], "skill_levels": {"skill1": "3.0"}})
+    assert first.status_code == second.status_code == 200
+    assert first.get_json()["jobs"] == second.get_json()["jobs"]
+    # 同一取值的不同写法共用一个缓存条目
+    assert app.result_cache.stats()["hits"] == hits + 1
+
+
+@pytest.mark.parametrize("levels", [{"skill1": [3]}, {"skill1": {"v": 1}}, {"skill1": "high"}, ["skill1"]])
+def test_app_rejects_unparseable_levels(app_client, levels):
+    client = app_client(SkillJobSnapshot.from_edges(random_edges(0)))
+
+    response = client.post("/api/query-skills-to-jobs", json={"skills": ["skill1"], "skill_levels": levels})
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+
+    response = client.post("/api/batch/query-skills-to-jobs", json={
+        "profiles": [{"skills": ["skill1"], "skill_levels": levels}],
+    })
+    assert response.status_code == 400
@@ -0,0 +1,109 @@
+"""
+数据模型检测（SchemaAdapter）：检测一次、按图谱版本号重新检测、只查询存在的模型
+"""
+
+import pytest
+
+from common.schema_adapter import (
+    DETECT_QUERY,
+    QUERY_SETS,
+    SCHEMA_DOMAIN,
+    SCHEMA_PAGE,
+    SCHEMA_POSITION,
+    SchemaAdapter,
+)
+
+
+class FakeGraph:
+    """按查询语句返回预设结果，并记录执行过的查询"""
+
+    def __init__(self, counts, results=None):
+        self.counts = counts
+        self.results = results or {}
+        self.queries = []
+
+    def run(self, query, params):
+        self.queries.append(query)
+        if query == DETECT_QUERY:
+            return [self.counts]
+        return self.results.get(query, [])
+
+
+def _adapter(counts, results=None, version=None):
+    graph = FakeGraph(counts, results)
+    return SchemaAdapter(graph.run, version), graph
+
+
+def test_detect_orders_existing_schemas():
+    adapter, _ = _adapter({"positions": 0, "domains": 3, "pages": 5})
+    assert adapter.detect() == (SCHEMA_DOMAIN, SCHEMA_PAGE)
+    stats = adapter.stats()
+    assert stats["active"] == SCHEMA_DOMAIN
+    assert stats["counts"] == {SCHEMA_POSITION: 0, SCHEMA_DOMAIN: 3, SCHEMA_PAGE: 5}
+
+
+def test_only_existing_schemas_are_queried():
+    names = [{"name": "数据分析"}]
+    adapter, graph = _adapter(
+        {"positions": 0, "domains": 2, "pages": 0},
+        {QUERY_SETS[SCHEMA_DOMAIN]["job_names"]: names},
+    )
+    assert adapter.query("job_names") == (SCHEMA_DOMAIN, names)
+    assert adapter.query("job_names") == (SCHEMA_DOMAIN, names)
+    # 检测一次，之后每个请求只有一条查询，不再试探 Position
+    assert graph.queries == [DETECT_QUERY] + [QUERY_SETS[SCHEMA_DOMAIN]["job_names"]] * 2
+    op = adapter.stats()["operations"]["job_names"]
+    assert op["queries"] == 2 and op["skipped_queries"] == 2
+
+
+def test_falls_through_to_next_schema_with_results():
+    rows = [{"skill": "Python", "weight": 5, "category": "hard"}]
+    adapter, graph = _adapter(
+        {"positions": 1, "domains": 0, "pages": 4},
+        {QUERY_SETS[SCHEMA_PAGE]["job_skills"]: rows},
+    )
+    assert adapter.query("job_skills", job_title="数据分析") == (SCHEMA_PAGE, rows)
+    assert graph.queries[1:] == [QUERY_SETS[SCHEMA_POSITION]["job_skills"], QUERY_SETS[SCHEMA_PAGE]["job_skills"]]
+
+
+def test_no_results_returns_none():
+    adapter, _ = _adapter({"positions": 1, "domains": 1, "pages": 0})
+    assert adapter.query("job_names") == (None, [])
+
+
+@pytest.mark.parametrize("counts", [{}, {"positions": 0, "domains": 0, "pages": 0}])
+def test_empty_detection_is_retried(counts):
+    adapter, graph = _adapter(counts)
+    assert adapter.schemas() == ()
+    assert adapter.schemas() == ()
+    assert graph.queries == [DETECT_QUERY, DETECT_QUERY]
+
+
+def test_redetects_when_graph_version_changes():
+    version = [1]
+    adapter, graph = _adapter({"positions": 0, "domains": 1, "pages": 0}, version=lambda: version[0])
+    adapter.schemas()
+    adapter.schemas()
+    assert graph.queries.count(DETECT_QUERY) == 1
+
+    graph.counts = {"positions": 0, "domains": 0, "pages": 2}
+    version[0] = 2
+    assert adapter.schemas() == (SCHEMA_PAGE,)
+    assert graph.queries.count(DETECT_QUERY) == 2
+    assert adapter.stats()["graph_version"] == 2
+
+
+def test_app_job_list_uses_detected_schema(app_client, monkeypatch):
+    import app
+
+    names = [{"name": "产品经理"}, {"name": "数据分析"}]
+    adapter, graph = _adapter(
+        {"positions": 0, "domains": 2, "pages": 0},
+        {QUERY_SETS[SCHEMA_DOMAIN]["job_names"]: names},
+    )
+    monkeypatch.setattr(app, "schema_adapter", adapter)
+    client = app_client(None)
+
+    body = client.get("/api/jobs").get_json()
+    assert body["jobs"] == ["产品经理", "数据分析"] and body["type"] == SCHEMA_DOMAIN
+    assert QUERY_SETS[SCHEMA_POSITION]["job_names"] not in graph.queries
@@ -0,0 +1,88 @@
+"""
+KG_SCORING_MODE=cypher：技能→岗位匹配在 Neo4j 中打分，进程不预加载快照
+"""
+
+import asyncio
+
+import pytest
+
+import main
+from abilityToJob.snapshot import SkillJobSnapshot
+
+from test_snapshot import random_edges
+
+
+@pytest.fixture
+def cypher_mode(monkeypatch):
+    monkeypatch.setattr(main, "KG_SCORING_MODE", "cypher")
+    monkeypatch.setattr(main, "KG_ARTIFACT_PATH", None)
+    monkeypatch.setattr(main, "shared_snapshots", None)
+
+
+def test_score_query_carries_pages_forward():
+    # 候选 Page 节点直接带入第二个 MATCH，不按名称重新匹配全部 Page
+    assert "WITH DISTINCT p\nMATCH (p)-[:HAS_CATEGORY]->" in main.SCORE_JOBS_QUERY
+    assert "IN job_names" not in main.SCORE_JOBS_QUERY
+
+
+def test_cypher_scoring_does_not_load_snapshot(cypher_mode, main_client, monkeypatch):
+    client = main_client(None)
+    calls = []
+    jobs = [{"job_name": "数据分析", "match_percentage": 80.0}]
+
+    async def run_query_async(query, parameters=None):
+        calls.append((query, parameters))
+        return [{"total": 3, "jobs": jobs}]
+
+    async def get_snapshot_async():
+        raise AssertionError("cypher 模式下单次匹配不应加载快照")
+
+    monkeypatch.setattr(main, "run_query_async", run_query_async)
+    monkeypatch.setattr(main, "get_snapshot_async", get_snapshot_async)
+
+    body = client.post("/api/query-skills-to-jobs", json={
+        "skills": ["Python", " sql "], "skill_levels": {"python": 4}, "top_k": 1, "offset": 2,
+    }).json()
+    assert body["jobs"] == jobs and body["total"] == 3
+    [(query, parameters)] = calls
+    assert query == main.SCORE_JOBS_QUERY
+    assert sorted(parameters["skills"]) == ["python", "sql"]
+    assert parameters["levels"] == {"python": 4}
+    assert (parameters["offset"], parameters["end"]) == (2, 3)
+
+
+def test_warm_up_skips_snapshot_in_cypher_mode(cypher_mode, monkeypatch):
+    loads = []
+
+    async def fetch_graph_version():
+        return 5
+
+    async def run_query_async(query, parameters=None):
+        return []
+
+    monkeypatch.setattr(main, "fetch_graph_version", fetch_graph_version)
+    monkeypatch.setattr(main, "run_query_async", run_query_async)
+    monkeypatch.setattr(main, "get_snapshot", lambda: loads.append(1))
+
+    asyncio.run(main.warm_up())
+    assert loads == []
+    assert main.graph_version.current() == 5
+
+
+@pytest.mark.parametrize("mode, prepared", [("cypher", False), ("snapshot", True)])
+def test_generation_precomputes_only_in_snapshot_mode(monkeypatch, mode, prepared):
+    snapshot = SkillJobSnapshot.from_edges(random_edges(8), dedupe=True)
+    monkeypatch.setattr(main, "KG_SCORING_MODE", mode)
+    monkeypatch.setattr(main, "shared_snapshots", None)
+    monkeypatch.setattr(main, "load_snapshot", lambda: snapshot)
+
+    assert main._load_generation(1) is snapshot
+    assert (snapshot._job_similarity is not None) is prepared
+    assert (snapshot._skill_prefix_index is not None) is prepared
+
+
+def test_result_cache_follows_graph_version_in_cypher_mode(cypher_mode, monkeypatch):
+    monkeypatch.setattr(main.graph_version, "_version", 9)
+    assert main.result_version() == (9, main.snapshot_reloader.version)
+    monkeypatch.setattr(main, "KG_SCORING_MODE", "snapshot")
+    assert main.result_version() == main.snapshot_reloader.version
@@ -0,0 +1,125 @@
+"""
+多 worker 共享快照（SharedSnapshotStore）与热重载的强制重建
+"""
+
+import os
+import time
+
+import numpy as np
+
+from abilityToJob import artifact
+from abilityToJob.shared_snapshot import SharedSnapshotStore
+from abilityToJob.snapshot import SkillJobSnapshot
+from common.hot_reload import SnapshotReloader
+
+from test_snapshot import random_edges
+
+
+class Builder:
+    """记录构建次数的 build 回调"""
+
+    def __init__(self, seed=0):
+        self.calls = 0
+        self.seed = seed
+
+    def __call__(self):
+        self.calls += 1
+        return SkillJobSnapshot.from_edges(random_edges(self.seed), dedupe=True)
+
+
+def _store(tmp_path, **kwargs):
+    return SharedSnapshotStore(str(tmp_path), artifact.SCHEMA_PAGE, check_interval=0, **kwargs)
+
+
+def test_second_worker_attaches_without_building(tmp_path):
+    build = Builder()
+    first, second = _store(tmp_path), _store(tmp_path)
+
+    snapshot, built = first.get(3, build)
+    assert built and build.calls == 1
+    attached, built = second.get(3, build)
+    assert not built and build.calls == 1
+    assert attached.job_names == snapshot.job_names
+    np.testing.assert_array_equal(attached.weights, snapshot.weights)
+    # 版本号不旧于已发布的代时不重建
+    assert second.get(2, build)[1] is False
+
+
+def test_newer_version_rebuilds_and_removes_old_generations(tmp_path):
+    build = Builder()
+    store = _store(tmp_path)
+    for version in range(1, 5):
+        store.get(version, build)
+    assert build.calls == 4 and store.generation == 4
+    files = sorted(name for name in os.listdir(tmp_path) if name.endswith(".kgsnap"))
+    assert files == ["gen-3.kgsnap", "gen-4.kgsnap"]
+
+
+def test_force_rebuilds_same_version(tmp_path):
+    build = Builder()
+    first, second = _store(tmp_path), _store(tmp_path)
+    first.get(1, build)
+    second.get(1, build)
+    assert not second.has_newer_generation()
+
+    _, built = first.get(1, build, force=True)
+    assert built and build.calls == 2 and first.generation == 2
+    # 版本号未变，其他 worker 通过代号发现新发布并直接映射
+    assert second.has_newer_generation()
+    assert second.get(1, build)[1] is False
+    assert second.generation == 2 and build.calls == 2
+    assert not second.has_newer_generation()
+
+
+def test_has_newer_generation_is_rate_limited(tmp_path):
+    build = Builder()
+    first = _store(tmp_path)
+    second = SharedSnapshotStore(str(tmp_path), artifact.SCHEMA_PAGE, check_interval=3600)
+    first.get(1, build)
+    second.get(1, build)
+    assert not second.has_newer_generation()
+    first.get(1, build, force=True)
+    assert not second.has_newer_generation()
+
+
+def test_similarity_table_is_published_with_snapshot(tmp_path):
+    def build():
+        snapshot = SkillJobSnapshot.from_edges(random_edges(7), dedupe=True)
+        snapshot.job_similarity(5)
+        return snapshot
+
+    publisher = _store(tmp_path)
+    published, _ = publisher.get(1, build)
+    reader = _store(tmp_path)
+    attached, built = reader.get(1, build)
+    assert not built
+
+    similarity = attached._job_similarity
+    assert similarity is not None and similarity.top_n == 5
+    assert not similarity.neighbor_ids.flags.writeable
+    expected = published.job_similarity()
+    for jid in range(attached.num_jobs):
+        assert similarity.neighbors(jid, 5) == expected.neighbors(jid, 5)
+
+
+def _wait(reloader):
+    deadline = time.monotonic() + 5
+    while reloader.stats()["reloading"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_reloader_passes_rebuild_flag():
+    calls = []
+
+    def load(version, rebuild):
+        calls.append((version, rebuild))
+        return object()
+
+    reloader = SnapshotReloader(load, lambda: 1)
+    reloader.get()
+    assert not reloader.trigger()
+    assert reloader.trigger(force=True)
+    _wait(reloader)
+    assert reloader.trigger(force=True, rebuild=False)
+    _wait(reloader)
+    assert calls == [(1, False), (1, True), (1, False)]
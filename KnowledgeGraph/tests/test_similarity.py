@@ -0,0 +1,185 @@
+"""
+JobSimilarity 的测试：近邻表与逐对计算余弦相似度的结果一致（含同分按 ID 截断、分块大小、
+未去重的快照），快照上的缓存与并发首次构建，以及 /api/similar-jobs 接口。
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from abilityToJob.similarity import JobSimilarity
+from abilityToJob.snapshot import SkillJobSnapshot
+
+from test_snapshot import random_edges
+
+
+def cosine_matrix(snapshot):
+    """逐对计算的岗位×岗位余弦相似度（稠密矩阵，对角线置 0）"""
+    dense = np.zeros((snapshot.num_jobs, snapshot.num_skills))
+    np.add.at(dense, (snapshot.entry_rows, snapshot.indices), snapshot.weights)
+    norms = np.linalg.norm(dense, axis=1)
+    denom = np.outer(norms, norms)
+    sims = (dense @ dense.T) / np.where(denom > 0, denom, 1.0)
+    np.fill_diagonal(sims, 0.0)
+    return sims
+
+
+def brute_force(sims, jid, top_n):
+    order = sorted((j for j in range(len(sims)) if sims[jid, j] > 1e-12), key=lambda j: (-sims[jid, j], j))
+    return [(j, sims[jid, j]) for j in order[:top_n]]
+
+
+@pytest.mark.parametrize("seed, top_n", [(0, 5), (1, 20), (2, 3)])
+def test_exact_equals_brute_force(seed, top_n):
+    snapshot = SkillJobSnapshot.from_edges(random_edges(seed), dedupe=True)
+    table = JobSimilarity.build(snapshot, top_n=top_n)
+    assert table.method == "exact"
+    sims = cosine_matrix(snapshot)
+    for jid in range(snapshot.num_jobs):
+        got = table.neighbors(jid, top_n)
+        expected = brute_force(sims, jid, top_n)
+        assert [s for _, s in got] == pytest.approx([s for _, s in expected], abs=1e-6)
+        # 相似度相同的岗位按 ID 排序时可能因浮点误差交换位置，逐个核对相似度即可
+        for other, similarity in got:
+            assert other != jid
+            assert similarity == pytest.approx(sims[jid, other], abs=1e-6)
+
+
+def test_ties_break_by_job_id():
+    # 与 A 相似度相同的岗位按 ID 升序截断
+    edges = [("A", "Python", 1, "硬实力")] + [(f"J{i}", "Python", 1 + i, "硬实力") for i in range(6)]
+    snapshot = SkillJobSnapshot.from_edges(edges)
+    table = JobSimilarity.build(snapshot, top_n=3)
+    a = snapshot.job_id("A")
+    assert table.neighbors(a, 3) == [(snapshot.job_id(f"J{i}"), pytest.approx(1.0)) for i in range(3)]
+
+
+@pytest.mark.parametrize("chunk_cells", [1, 7, 1 << 22])
+def test_chunking_does_not_change_table(monkeypatch, chunk_cells):
+    from abilityToJob import similarity
+
+    snapshot = SkillJobSnapshot.from_edges(random_edges(5, num_jobs=60), dedupe=True)
+    expected = JobSimilarity.build(snapshot, top_n=8)
+    monkeypatch.setattr(similarity, "_CHUNK_CELLS", chunk_cells)
+    table = JobSimilarity.build(snapshot, top_n=8)
+    assert table.neighbor_indptr.tolist() == expected.neighbor_indptr.tolist()
+    assert table.neighbor_ids.tolist() == expected.neighbor_ids.tolist()
+    assert table.neighbor_scores == pytest.approx(expected.neighbor_scores)
+    assert table.candidate_pairs == expected.candidate_pairs
+
+
+def test_duplicate_entries_match_brute_force():
+    # 未去重的快照：同一岗位下的重复技能边按向量分量相加
+    snapshot = SkillJobSnapshot.from_edges(random_edges(9) + random_edges(9, num_jobs=20))
+    table = JobSimilarity.build(snapshot, top_n=5)
+    sims = cosine_matrix(snapshot)
+    for jid in range(snapshot.num_jobs):
+        expected = brute_force(sims, jid, 5)
+        assert [s for _, s in table.neighbors(jid, 5)] == pytest.approx([s for _, s in expected], abs=1e-6)
+
+
+def test_tiny_snapshots():
+    for edges in ([], [("A", "Python", 1, "硬实力")]):
+        table = JobSimilarity.build(SkillJobSnapshot.from_edges(edges), top_n=5)
+        assert table.neighbor_ids.size == 0
+        assert table.neighbor_indptr.tolist() == [0] * (len(edges) + 1)
+
+
+def test_neighbors_limit_and_stats():
+    snapshot = SkillJobSnapshot.from_edges([
+        ("A", "Python", 4, "硬实力"),
+        ("A", "SQL", 2, "硬实力"),
+        ("B", "Python", 4, "硬实力"),
+        ("B", "SQL", 2, "硬实力"),
+        ("C", "Python", 1, "硬实力"),
+        ("D", "沟通", 3, "软实力"),
+        ("E", "Excel", 0, "硬实力"),
+    ])
+    table = JobSimilarity.build(snapshot, top_n=5)
+    a, b, c, d, e = (snapshot.job_id(name) for name in "ABCDE")
+
+    assert table.neighbors(a, 5) == [(b, pytest.approx(1.0)), (c, pytest.approx(4 / np.sqrt(20)))]
+    assert table.neighbors(a, 1) == [(b, pytest.approx(1.0))]
+    # 没有共同技能的岗位、权重全为 0 的岗位没有近邻
+    assert table.neighbors(d, 5) == []
+    assert table.neighbors(e, 5) == []
+
+    stats = table.stats()
+    assert stats["method"] == "exact"
+    assert stats["top_n"] == 5
+    assert stats["jobs"] == 5
+    assert stats["neighbors"] == 6
+    assert stats["avg_neighbors"] == 1.2
+
+
+def test_job_similarity_is_cached_on_snapshot():
+    snapshot = SkillJobSnapshot.from_edges(random_edges(3), dedupe=True)
+    table = snapshot.job_similarity(5)
+    assert snapshot.job_similarity(20) is table
+    assert table.top_n == 5 and table.method == "exact"
+
+
+def test_concurrent_first_calls_build_once(monkeypatch):
+    snapshot = SkillJobSnapshot.from_edges(random_edges(3), dedupe=True)
+    builds = []
+    build = JobSimilarity.build.__func__
+
+    def counting_build(cls, *args, **kwargs):
+        builds.append(1)
+        time.sleep(0.05)
+        return build(cls, *args, **kwargs)
+
+    monkeypatch.setattr(JobSimilarity, "build", classmethod(counting_build))
+    tables = []
+    threads = [threading.Thread(target=lambda: tables.append(snapshot.job_similarity(5))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert builds == [1]
+    assert all(table is tables[0] for table in tables)
+
+
+def test_similar_jobs_endpoint(main_client, monkeypatch):
+    import main
+
+    snapshot = SkillJobSnapshot.from_edges([
+        ("数据分析师", "Python", 4, "硬实力"),
+        ("数据分析师", "SQL", 3, "硬实力"),
+        ("数据分析师", "沟通", 1, "软实力"),
+        ("数据工程师", "Python", 3, "硬实力"),
+        ("数据工程师", "SQL", 4, "硬实力"),
+        ("数据工程师", "Spark", 2, "硬实力"),
+        ("销售", "沟通", 5, "软实力"),
+    ])
+    client = main_client(snapshot)
+    offloaded = []
+    run_in_threadpool = main.run_in_threadpool
+
+    async def recording(func, *args, **kwargs):
+        offloaded.append(func)
+        return await run_in_threadpool(func, *args, **kwargs)
+
+    monkeypatch.setattr(main, "run_in_threadpool", recording)
+
+    response = client.get("/api/similar-jobs", params={"job_title": " 数据分析师 "})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] and body["job_name"] == "数据分析师" and body["method"] == "exact"
+    assert [job["job_name"] for job in body["jobs"]] == ["数据工程师", "销售"]
+    assert body["jobs"][0]["shared_skills"] == ["Python", "SQL"]
+    assert body["jobs"][1]["shared_skills"] == ["沟通"]
+    assert body["jobs"][0]["similarity"] == pytest.approx(24 / np.sqrt(26 * 29), abs=1e-4)
+    # 近邻表未预先计算（如 cypher 模式）时在线程池中构建，不阻塞事件循环
+    assert offloaded == [snapshot.job_similarity]
+
+    response = client.get("/api/similar-jobs", params={"job_title": "数据分析师", "limit": 1})
+    assert [job["job_name"] for job in response.json()["jobs"]] == ["数据工程师"]
+
+    assert client.get("/api/similar-jobs", params={"job_title": "不存在的岗位"}).status_code == 404
+    assert client.get("/api/similar-jobs", params={"job_title": "  "}).status_code == 400
+    for limit in (0, 1000):
+        response = client.get("/api/similar-jobs", params={"job_title": "数据分析师", "limit": limit})
+        assert response.status_code == 400
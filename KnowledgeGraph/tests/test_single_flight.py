@@ -0,0 +1,173 @@
+"""
+相同请求的合并执行（SingleFlight / AsyncSingleFlight）：结果、异常与取消
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from common.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_threads_share_one_execution():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return {"value": 1}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("k", fn))) for _ in range(5)]
+    threads[0].start()
+    while flights.stats()["in_flight"] == 0:
+        time.sleep(0.001)
+    for thread in threads[1:]:
+        thread.start()
+    while flights.stats()["calls"] < 5:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert len(results) == 5 and all(r is results[0] for r in results)
+    assert flights.stats() == {"calls": 5, "executions": 1, "deduplicated": 4, "dedup_rate": 0.8, "in_flight": 0}
+    # 键已释放，之后的调用重新执行
+    flights.do("k", fn)
+    assert calls == [1, 1]
+
+
+def test_threads_share_the_error():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    errors = []
+
+    def call():
+        try:
+            flights.do("k", fn)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    while flights.stats()["calls"] < 2:
+        time.sleep(0.001)
+    release.set()
+    leader.join()
+    follower.join()
+    assert len(errors) == 2 and errors[0] is errors[1]
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_async_followers_share_result():
+    async def scenario():
+        flights = AsyncSingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await release.wait()
+            return [1, 2]
+
+        tasks = [asyncio.create_task(flights.do("k", fn)) for _ in range(4)]
+        await _settle()
+        release.set()
+        results = await asyncio.gather(*tasks)
+        assert calls == [1] and all(r is results[0] for r in results)
+        assert flights.stats()["deduplicated"] == 3 and flights.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_async_followers_share_error():
+    async def scenario():
+        flights = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            raise ValueError("boom")
+
+        tasks = [asyncio.create_task(flights.do("k", fn)) for _ in range(3)]
+        await _settle()
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flights.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_async_leader_cancel_reruns_for_followers():
+    async def scenario():
+        flights = AsyncSingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await release.wait()
+            return len(calls)
+
+        leader = asyncio.create_task(flights.do("k", fn))
+        await _settle()
+        followers = [asyncio.create_task(flights.do("k", fn)) for _ in range(3)]
+        await _settle()
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        await _settle()
+        # 一个等待者重新执行，其余等待者等待它
+        assert calls == [1, 1]
+        release.set()
+        assert await asyncio.gather(*followers) == [2, 2, 2]
+        stats = flights.stats()
+        assert (stats["calls"], stats["executions"], stats["deduplicated"], stats["in_flight"]) == (4, 2, 2, 0)
+
+    asyncio.run(scenario())
+
+
+def test_async_follower_cancel_does_not_affect_others():
+    async def scenario():
+        flights = AsyncSingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await release.wait()
+            return "ok"
+
+        leader = asyncio.create_task(flights.do("k", fn))
+        await _settle()
+        cancelled, waiting = (asyncio.create_task(flights.do("k", fn)) for _ in range(2))
+        await _settle()
+
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        release.set()
+        assert await leader == "ok" and await waiting == "ok"
+        assert calls == [1]
+
+    asyncio.run(scenario())
@@ -0,0 +1,152 @@
+"""
+SkillJobSnapshot 与 matcher.match_skills_to_jobs 的测试
+
+快照打分与原实现（逐岗位遍历全部技能边）的公式逐项对照。
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from abilityToJob.matcher import match_skills_to_jobs
+from abilityToJob.snapshot import (
+    CATEGORY_HARD,
+    CATEGORY_SOFT,
+    SkillJobSnapshot,
+    normalize_skill_name,
+)
+
+CATEGORIES = ("硬实力", "软实力")
+
+
+def random_edges(seed, num_jobs=40, num_skills=60, max_skills=12):
+    rng = random.Random(seed)
+    skills = [f"Skill{i}" for i in range(num_skills)]
+    edges = []
+    for j in range(num_jobs):
+        for name in rng.sample(skills, rng.randint(1, max_skills)):
+            # 同名技能的大小写 / 空格变体与零权重都应按原实现处理
+            if rng.random() < 0.1:
+                name = f"  {name.upper()} "
+            weight = rng.choice([0, 0.5, 1, 2, 3.5, 5]) if rng.random() < 0.1 else rng.randint(1, 9)
+            edges.append((f"job{j}", name, weight, rng.choice(CATEGORIES)))
+    return edges
+
+
+def baseline_match(edges, skills):
+    """原实现：逐岗位遍历全部技能边，Score = 100 × 匹配权重和 / 全部权重和"""
+    normalized_input = [normalize_skill_name(s) for s in skills if normalize_skill_name(s)]
+    by_job = {}
+    for job, skill, weight, category in edges:
+        by_job.setdefault(job, []).append((skill, weight, category))
+
+    jobs = []
+    for job, infos in by_job.items():
+        total_all = sum(float(w) for _, w, _ in infos)
+        if total_all <= 0:
+            continue
+        matched, total_matched, hard, soft = [], 0.0, 0, 0
+        for skill, weight, category in infos:
+            if normalize_skill_name(skill) not in normalized_input or float(weight) <= 0:
+                continue
+            total_matched += float(weight)
+            hard += category == "硬实力"
+            soft += category == "软实力"
+            matched.append({"skill": skill.strip(), "weight": float(weight), "category": category})
+        if not matched:
+            continue
+        jobs.append({
+            "job_name": job,
+            "match_count": len(matched),
+            "match_percentage": int(round(100 * total_matched / total_all)),
+            "total_weight": total_matched,
+            "matched_skills": matched,
+            "hard_skills_count": hard,
+            "soft_skills_count": soft,
+        })
+    jobs.sort(key=lambda x: (x["match_percentage"], x["total_weight"]), reverse=True)
+    return jobs
+
+
+def _comparable(job):
+    """技能名称按规范化后比较：快照对同名技能只保留首次出现的写法"""
+    job = dict(job)
+    job["matched_skills"] = [
+        {"skill": normalize_skill_name(m["skill"]), "weight": m["weight"], "category": m["category"]}
+        for m in job["matched_skills"]
+    ]
+    return job
+
+
+def test_from_edges_builds_csr_rows():
+    snapshot = SkillJobSnapshot.from_edges([
+        ("a", "Python", 3, "硬实力"),
+        ("b", " python ", 2, "soft"),
+        ("a", "沟通", 1, "软实力"),
+        ("a", "", 5, "硬实力"),
+        ("b", "SQL", "bad", "硬实力"),
+    ])
+    assert snapshot.job_names == ["a", "b"]
+    assert snapshot.skill_names == ["Python", "沟通"]
+    assert snapshot.indptr.tolist() == [0, 2, 3]
+    assert snapshot.indices.tolist() == [0, 1, 0]
+    assert snapshot.categories.tolist() == [CATEGORY_HARD, CATEGORY_SOFT, CATEGORY_SOFT]
+    assert snapshot.job_total_weights.tolist() == [4.0, 2.0]
+    assert snapshot.skill_id("PYTHON ") == 0
+    assert snapshot.job_id(" B ") == 1
+
+
+def test_dedupe_keeps_max_weight_and_first_category():
+    edges = [("a", "Python", 2, "硬实力"), ("a", "python", 4, "软实力"), ("a", "SQL", 1, "硬实力")]
+    raw = SkillJobSnapshot.from_edges(edges)
+    assert raw.has_duplicate_entries()
+
+    snapshot = SkillJobSnapshot.from_edges(edges, dedupe=True)
+    assert not snapshot.has_duplicate_entries()
+    assert snapshot.weights.tolist() == [4.0, 1.0]
+    assert snapshot.categories.tolist() == [CATEGORY_HARD, CATEGORY_HARD]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_match_equals_dense_product(seed):
+    snapshot = SkillJobSnapshot.from_edges(random_edges(seed))
+    dense = np.zeros((snapshot.num_jobs, snapshot.num_skills))
+    np.add.at(dense, (snapshot.entry_rows, snapshot.indices), np.where(snapshot.weights > 0, snapshot.weights, 0))
+
+    rng = np.random.RandomState(seed)
+    query = {int(sid): float(rng.randint(1, 6)) for sid in rng.choice(snapshot.num_skills, 8, replace=False)}
+    vector = np.zeros(snapshot.num_skills)
+    vector[list(query)] = list(query.values())
+
+    result = snapshot.match(query)
+    expected = dense @ vector
+    assert set(result.jobs.tolist()) == set(np.flatnonzero((dense[:, list(query)] > 0).any(axis=1)).tolist())
+    np.testing.assert_allclose(result.scores, expected[result.jobs])
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_scores_match_baseline_formula(seed):
+    edges = random_edges(seed)
+    rng = random.Random(seed)
+    skills = rng.sample([f"skill{i}" for i in range(60)], rng.randint(1, 10)) + ["", "  "]
+
+    snapshot = SkillJobSnapshot.from_edges(edges)
+    jobs, count, _ = match_skills_to_jobs(None, skills, snapshot=snapshot)
+
+    assert count == len([s for s in skills if s.strip()])
+    assert [_comparable(job) for job in jobs] == [_comparable(job) for job in baseline_match(edges, skills)]
+
+
+def test_scores_are_clipped_to_percentage_range():
+    # 负权重使匹配权重和超过全部权重和时，原实现会得到超过 100 的分数
+    snapshot = SkillJobSnapshot.from_edges([("a", "Python", 3, "硬实力"), ("a", "SQL", -1, "硬实力")])
+    jobs, _, _ = match_skills_to_jobs(None, ["python"], snapshot=snapshot)
+    assert jobs[0]["match_percentage"] == 100
+
+
+def test_no_known_skill_returns_empty():
+    snapshot = SkillJobSnapshot.from_edges(random_edges(0))
+    assert match_skills_to_jobs(None, [], snapshot=snapshot) == ([], 0, [])
+    jobs, count, _ = match_skills_to_jobs(None, ["zzzzzz"], snapshot=snapshot)
+    assert jobs == [] and count == 1
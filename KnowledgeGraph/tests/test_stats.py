@@ -0,0 +1,171 @@
+"""
+目录统计（SkillJobSnapshot.catalog_stats 及其分布 / 直方图函数）与 app.py 的 /api/stats：
+统计结果按 (图谱版本号, 快照版本号) 缓存，版本变化前不重复查询 Neo4j、不重复计算分布。
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from abilityToJob.snapshot import SkillJobSnapshot, _distribution, _log2_histogram, _weight_histogram
+
+from test_snapshot import random_edges
+
+
+def test_distribution():
+    assert _distribution(np.array([4, 1, 3, 2])) == {
+        "min": 1, "max": 4, "mean": 2.5, "p50": 2.5, "p90": pytest.approx(3.7), "p99": pytest.approx(3.97),
+    }
+    assert _distribution(np.array([], dtype=np.int64)) == {
+        "min": 0, "max": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0,
+    }
+
+
+def test_log2_histogram():
+    values = np.array([0, 0, 1, 2, 3, 4, 7, 8, 15, 16, 100])
+    assert _log2_histogram(values) == [
+        {"from": 0, "to": 0, "count": 2},
+        {"from": 1, "to": 1, "count": 1},
+        {"from": 2, "to": 3, "count": 2},
+        {"from": 4, "to": 7, "count": 2},
+        {"from": 8, "to": 15, "count": 2},
+        {"from": 16, "to": 31, "count": 1},
+        # 空区间不列出
+        {"from": 64, "to": 127, "count": 1},
+    ]
+    assert _log2_histogram(np.array([], dtype=np.int64)) == []
+    # 每个取值都落在所在区间内
+    rng = np.random.RandomState(0)
+    values = rng.randint(0, 5000, size=500)
+    histogram = _log2_histogram(values)
+    assert sum(bucket["count"] for bucket in histogram) == values.size
+    for bucket in histogram:
+        assert bucket["count"] == np.count_nonzero((values >= bucket["from"]) & (values <= bucket["to"]))
+
+
+def test_weight_histogram():
+    # 取值较少时逐个取值计数
+    assert _weight_histogram(np.array([3.0, 1.0, 1.0, 5.0])) == [
+        {"weight": 1.0, "count": 2}, {"weight": 3.0, "count": 1}, {"weight": 5.0, "count": 1},
+    ]
+    assert _weight_histogram(np.array([])) == []
+    # 取值较多时按等宽区间计数
+    histogram = _weight_histogram(np.linspace(0.0, 1.0, 100))
+    assert len(histogram) == 10
+    assert [bucket["count"] for bucket in histogram] == [10] * 10
+    assert histogram[0]["from"] == 0.0 and histogram[-1]["to"] == 1.0
+    assert all(a["to"] == b["from"] for a, b in zip(histogram, histogram[1:]))
+
+
+def test_catalog_stats():
+    snapshot = SkillJobSnapshot.from_edges([
+        ("A", "Python", 3, "hard"),
+        ("A", "SQL", 1, "hard"),
+        ("A", "沟通", 1, "soft"),
+        ("B", "Python", 5, "hard"),
+        ("C", "Python", 3, "soft"),
+    ])
+    stats = snapshot.catalog_stats()
+    assert (stats["jobs"], stats["skills"], stats["edges"]) == (3, 3, 5)
+    assert (stats["hard_edges"], stats["soft_edges"]) == (3, 2)
+    assert stats["edges_per_job"]["min"] == 1 and stats["edges_per_job"]["max"] == 3
+    assert stats["skill_degree"]["max"] == 3
+    assert stats["skill_degree"]["histogram"] == [
+        {"from": 1, "to": 1, "count": 2}, {"from": 2, "to": 3, "count": 1},
+    ]
+    assert stats["weight_histogram"] == [
+        {"weight": 1.0, "count": 2}, {"weight": 3.0, "count": 2}, {"weight": 5.0, "count": 1},
+    ]
+
+
+class CountingGraph:
+    """记录 STATS_QUERY 执行次数的 py2neo 占位对象"""
+
+    def __init__(self):
+        self.runs = 0
+
+    def run(self, query):
+        import app
+
+        assert query == app.STATS_QUERY
+        self.runs += 1
+        counts = {"total_nodes": 10 + self.runs, "total_relationships": 20,
+                  "domains": 2, "skills": 6}
+        return SimpleNamespace(data=lambda: [counts])
+
+
+@pytest.fixture
+def stats_client(app_client, monkeypatch):
+    """返回 (客户端, 图谱占位对象, 图谱版本号, 快照读取记录, 快照)；版本号可在测试中修改"""
+    import app
+
+    snapshot = SkillJobSnapshot.from_edges(random_edges(4), dedupe=True)
+    client = app_client(snapshot)
+    graph = CountingGraph()
+    versions = SimpleNamespace(graph=1)
+    builds = []
+
+    def get_snapshot():
+        builds.append(1)
+        return snapshot
+
+    monkeypatch.setattr(app, "graph", graph)
+    monkeypatch.setattr(app, "get_snapshot", get_snapshot)
+    monkeypatch.setattr(app, "graph_version", SimpleNamespace(current=lambda: versions.graph))
+    monkeypatch.setattr(app, "snapshot_reloader", SimpleNamespace(version=1))
+    app.stats_cache.clear()
+    yield client, graph, versions, builds, snapshot
+    app.stats_cache.clear()
+
+
+def test_stats_endpoint_is_cached_until_version_changes(stats_client, monkeypatch):
+    import app
+
+    client, graph, versions, builds, snapshot = stats_client
+    body = client.get("/api/stats").get_json()
+    assert body["success"]
+    assert body["stats"] == {"total_nodes": 11, "total_relationships": 20, "domains": 2, "skills": 6}
+    assert body["catalog"] == snapshot.catalog_stats()
+    assert body["graph_version"] == 1
+    assert "schema" in body
+
+    for _ in range(3):
+        assert client.get("/api/stats").get_json()["stats"]["total_nodes"] == 11
+    assert graph.runs == 1 and len(builds) == 1
+
+    # 图谱版本号变化：重新查询
+    versions.graph = 2
+    body = client.get("/api/stats").get_json()
+    assert body["stats"]["total_nodes"] == 12 and body["graph_version"] == 2
+    assert graph.runs == 2
+
+    # 提供服务的快照切换到新一代：同样重新计算
+    monkeypatch.setattr(app, "snapshot_reloader", SimpleNamespace(version=2))
+    client.get("/api/stats")
+    assert graph.runs == 3 and len(builds) == 3
+    client.get("/api/stats")
+    assert graph.runs == 3
+
+
+def test_stats_without_snapshot_skips_catalog(stats_client, monkeypatch):
+    import app
+
+    client, graph, _, _, _ = stats_client
+
+    def get_snapshot():
+        raise RuntimeError("快照不可用")
+
+    monkeypatch.setattr(app, "get_snapshot", get_snapshot)
+    body = client.get("/api/stats").get_json()
+    assert body["success"] and body["catalog"] is None
+    assert body["stats"]["domains"] == 2
+
+
+def test_stats_requires_graph(app_client, monkeypatch):
+    import app
+
+    client = app_client(None)
+    monkeypatch.setattr(app, "graph", None)
+    response = client.get("/api/stats")
+    assert response.status_code == 503
@@ -0,0 +1,92 @@
+"""
+岗位技能查询的 Page.titleKey 索引
+
+查询路径只读：索引未就绪或查不到时回退为全量扫描，从不创建索引或回填；
+创建与回填只由管理接口执行。
+"""
+
+import asyncio
+
+import pytest
+
+import main
+from abilityToJob.snapshot import SkillJobSnapshot
+
+
+@pytest.fixture
+def neo4j_calls(monkeypatch):
+    """记录读 / 写查询，读查询按语句返回预设结果"""
+    calls = {"read": [], "write": []}
+    results = {}
+
+    async def run_query_async(query, parameters=None):
+        calls["read"].append(query)
+        return results.get(query, [])
+
+    async def run_write_async(query, parameters=None):
+        calls["write"].append(query)
+        return [{"updated": 2}] if query == main.PAGE_TITLE_KEY_BACKFILL else []
+
+    monkeypatch.setattr(main, "run_query_async", run_query_async)
+    monkeypatch.setattr(main, "run_write_async", run_write_async)
+    monkeypatch.setattr(main, "KG_ARTIFACT_PATH", "")
+    monkeypatch.setattr(main, "KG_ADMIN_TOKEN", "")
+    monkeypatch.setattr(main, "_title_key_ready", False)
+    calls["results"] = results
+    return calls
+
+
+def _snapshot():
+    return SkillJobSnapshot.from_edges([("Java开发", "Java", 5, "硬实力"), ("Java开发", "沟通", 2, "软实力")])
+
+
+SCAN_RECORDS = [{"skill": "Java", "level": 5, "category_type": "hard"}]
+
+
+def test_scan_fallback_does_not_write(main_client, neo4j_calls):
+    client = main_client(_snapshot())
+    neo4j_calls["results"][main.JOB_SKILLS_BY_TITLE_SCAN] = SCAN_RECORDS
+
+    body = client.post("/api/query-job-skills", json={"job_title": "java开发"}).json()
+    assert body["lookup"] == "scan"
+    assert neo4j_calls["write"] == []
+
+
+def test_index_miss_falls_back_to_scan_without_backfill(main_client, neo4j_calls, monkeypatch):
+    client = main_client(_snapshot())
+    monkeypatch.setattr(main, "_title_key_ready", True)
+    neo4j_calls["results"][main.JOB_SKILLS_BY_TITLE_SCAN] = SCAN_RECORDS
+
+    body = client.post("/api/query-job-skills", json={"job_title": "Java开发"}).json()
+    assert body["lookup"] == "scan"
+    assert neo4j_calls["read"] == [main.JOB_SKILLS_BY_TITLE_KEY, main.JOB_SKILLS_BY_TITLE_SCAN]
+    assert neo4j_calls["write"] == []
+
+
+def test_unknown_title_skips_neo4j(main_client, neo4j_calls):
+    client = main_client(_snapshot())
+    body = client.post("/api/query-job-skills", json={"job_title": "不存在的岗位"}).json()
+    assert body["lookup"] == "not_found"
+    assert neo4j_calls["read"] == [] and neo4j_calls["write"] == []
+
+
+@pytest.mark.parametrize("state, ready", [("ONLINE", True), ("POPULATING", False), (None, False)])
+def test_check_index_is_read_only(neo4j_calls, state, ready):
+    if state:
+        neo4j_calls["results"][main.PAGE_TITLE_KEY_INDEX_STATE] = [{"state": state}]
+    assert asyncio.run(main.check_title_key_index()) is ready
+    assert main._title_key_ready is ready
+    assert neo4j_calls["write"] == []
+
+
+def test_admin_endpoint_creates_index_and_backfills(main_client, neo4j_calls, monkeypatch):
+    client = main_client(_snapshot())
+    monkeypatch.setattr(main, "KG_ADMIN_TOKEN", "secret")
+
+    assert client.post("/api/admin/title-key-index").status_code == 403
+    assert neo4j_calls["write"] == []
+
+    body = client.post("/api/admin/title-key-index", headers={"X-Admin-Token": "secret"}).json()
+    assert body == {"success": True, "updated": 2}
+    assert neo4j_calls["write"] == [main.PAGE_TITLE_KEY_INDEX, main.PAGE_TITLE_KEY_BACKFILL]
+    assert main._title_key_ready
@@ -0,0 +1,63 @@
+"""
+TrigramIndex 的测试：倒排表查找与逐个计算 Jaccard 相似度的结果一致。
+"""
+
+import random
+
+import pytest
+
+from abilityToJob.matcher import match_skills_to_jobs
+from abilityToJob.snapshot import SkillJobSnapshot
+from abilityToJob.trigram import TrigramIndex, trigrams
+
+
+def brute_force(names, query, threshold, limit):
+    grams = set(trigrams(query))
+    scored = []
+    for sid, name in enumerate(names):
+        other = set(trigrams(name))
+        if not grams or not other:
+            continue
+        score = len(grams & other) / len(grams | other)
+        if score >= threshold and grams & other:
+            scored.append((sid, score))
+    scored.sort(key=lambda x: (-x[1], x[0]))
+    return scored[:limit]
+
+
+def test_trigrams_are_padded_and_deduplicated():
+    assert trigrams(" Go ") == ["  g", " go", "go "]
+    assert trigrams("沟通") == ["  沟", " 沟通", "沟通 "]
+    assert trigrams("aaaa") == ["  a", " aa", "aaa", "aa "]
+    assert trigrams("") == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_lookup_equals_brute_force(seed):
+    rng = random.Random(seed)
+    alphabet = "abcdejpsy数据分析"
+    names = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 8))) for _ in range(200)]
+    index = TrigramIndex(names)
+    for _ in range(50):
+        query = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 8)))
+        for threshold, limit in [(0.3, 5), (0.1, 20), (0.6, 3)]:
+            got = index.lookup(query, threshold, limit)
+            expected = brute_force(names, query, threshold, limit)
+            assert [sid for sid, _ in got] == [sid for sid, _ in expected]
+            assert [score for _, score in got] == pytest.approx([score for _, score in expected])
+
+
+def test_matcher_uses_fuzzy_similarity_for_unknown_names():
+    snapshot = SkillJobSnapshot.from_edges([
+        ("数据分析师", "Python", 4, "硬实力"),
+        ("数据分析师", "沟通", 1, "软实力"),
+    ])
+    jobs, _, _ = match_skills_to_jobs(None, ["pyhton"], snapshot=snapshot)
+    assert jobs == []
+
+    jobs, _, _ = match_skills_to_jobs(None, ["pythn"], snapshot=snapshot)
+    [matched] = jobs[0]["matched_skills"]
+    assert matched["skill"] == "Python"
+    assert 0.3 <= matched["similarity"] < 1
+    # m_k = 相似度 × 熟练度，分数按相似度折算
+    assert jobs[0]["match_percentage"] == round(100 * 4 * matched["similarity"] / 5)